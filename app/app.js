@@ -57,15 +57,279 @@ function pickN(pool, n, mustInclude = null) {
   return shuffle(picked);
 }
 
+// Content-hashed file names (tools/publish_assets.py): logical path -> assets/<name>.<hash>.<ext>.
+// A hashed URL never changes content, so it is fetched with normal caching (and kept by sw.js);
+// only manifest.json is revalidated. Without a manifest every path maps to itself.
+let MANIFEST = { files: {} };
+
+async function loadManifest() {
+  try {
+    const res = await fetch('manifest.json', { cache: 'no-cache' });
+    if (res.ok) MANIFEST = await res.json();
+  } catch (e) {
+    console.warn('No asset manifest, using plain paths', e);
+  }
+}
+
+const manifestReady = loadManifest();
+
+function assetUrl(path) {
+  return (MANIFEST.files && MANIFEST.files[path]) || path;
+}
+
+// Responsive <picture> for questions that have build-time variants
+// (images/<service>/variants/<asset>-<width>.<fmt>, see image_variants.py).
+const IMG_SIZES = '(max-width: 960px) 100vw, 900px';
+
+// the jpg at the source's own width is the source file (variants.original)
+function variantSrcset(base, widths, fmt, original, originalSrc) {
+  return widths.map(w => `${fmt === 'jpg' && w === original ? originalSrc : assetUrl(`${base}-${w}.${fmt}`)} ${w}w`).join(', ');
+}
+
+function imgFallback(img) {
+  // a failed variant must not keep winning over src: drop srcset and <source>s, then load
+  // src again (the plain service jpg) before trying data-alt
+  const picture = img.parentNode && img.parentNode.tagName === 'PICTURE' ? img.parentNode : null;
+  if (img.hasAttribute('srcset') || (picture && picture.querySelector('source'))) {
+    img.removeAttribute('srcset');
+    if (picture) picture.querySelectorAll('source').forEach(s => s.remove());
+    img.src = img.getAttribute('src');
+    return;
+  }
+  if (img.dataset.alt && !img.dataset.tried) {
+    img.dataset.tried = '1';
+    img.src = img.dataset.alt;
+  } else {
+    img.onerror = null;
+    img.src = assetUrl('images/missing.jpg');
+  }
+}
+
+// Tiny blurred preview (image_placeholders.py) as the background until the photo has loaded;
+// width/height reserve the box so the layout does not jump.
+function placeholderAttrs(q) {
+  const p = q.lqip;
+  if (!p || !p.src) return '';
+  return `width="${p.width}" height="${p.height}" style="background:url('${p.src}') center / cover no-repeat" onload="this.style.backgroundImage='none'"`;
+}
+
+function renderImage(q) {
+  const imgSrc = assetUrl(q.asset ? `images/${q.asset}.jpg` : 'images/missing.jpg');
+  const imgAltSrc = q.asset ? assetUrl(`images/${state.service}/${q.asset}.jpg`) : null;
+  const v = q.variants;
+  const widths = (q.asset && v && Array.isArray(v.widths)) ? v.widths : [];
+
+  if (!widths.length) {
+    return `<img id="mainImage" class="zoomable" src="${imgSrc}" data-alt="${imgAltSrc || ''}" alt="${q.answer || 'vehicle'}" ${placeholderAttrs(q)} onerror="imgFallback(this)" />`;
+  }
+
+  // variants live next to the service images, so the service jpg is the plain src
+  const base = `images/${state.service}/variants/${q.asset}`;
+  const formats = Array.isArray(v.formats) ? v.formats : ['jpg'];
+  const sources = formats
+    .filter(f => f !== 'jpg')
+    .map(f => `<source type="image/${f}" srcset="${variantSrcset(base, widths, f)}" sizes="${IMG_SIZES}" />`)
+    .join('');
+  const jpgSrcset = formats.includes('jpg')
+    ? `srcset="${variantSrcset(base, widths, 'jpg', v.original, imgAltSrc)}" sizes="${IMG_SIZES}"` : '';
+  return `<picture>${sources}<img id="mainImage" class="zoomable" src="${imgAltSrc}" ${jpgSrcset} alt="${q.answer || 'vehicle'}" ${placeholderAttrs(q)} onerror="imgFallback(this)" /></picture>`;
+}
+
 function serviceLabel(id) {
   return (SERVICES.find(s => s.id === id) || {}).label || id;
 }
 
+function fetchAsset(path) {
+  const url = assetUrl(path);
+  // unhashed paths (no manifest yet) are revalidated instead of trusted from cache
+  return fetch(url, url === path ? { cache: 'no-cache' } : {});
+}
+
+async function fetchJson(path) {
+  const res = await fetchAsset(path);
+  if (!res.ok) throw new Error(`${path}: HTTP ${res.status}`);
+  return res.json();
+}
+
+// Delta updates (tools/publish_deltas.py): the last bundle loaded is kept in the Cache API with
+// its version; deltas/<service>/index.json lists the patches between consecutive versions.
+const DATA_CACHE = 'data-v1';
+
+function datasetKey(serviceId) {
+  return `datasets/${serviceId}.json`;
+}
+
+async function cachedDataset(serviceId) {
+  if (typeof caches === 'undefined') return null;
+  try {
+    const res = await (await caches.open(DATA_CACHE)).match(datasetKey(serviceId));
+    return res ? await res.json() : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+async function storeDataset(serviceId, index, data) {
+  if (typeof caches === 'undefined') return;
+  try {
+    const body = JSON.stringify({ version: index.version, hash: index.hash, data });
+    await (await caches.open(DATA_CACHE)).put(datasetKey(serviceId),
+      new Response(body, { headers: { 'Content-Type': 'application/json' } }));
+  } catch (e) {
+    console.warn('Could not keep the dataset for delta updates', e);
+  }
+}
+
+// JSON-patch add/remove/replace; the same steps as apply_patch() in tools/publish_deltas.py.
+function applyPatch(doc, ops) {
+  for (const op of ops) {
+    const parts = op.path.split('/').slice(1).map(p => p.replace(/~1/g, '/').replace(/~0/g, '~'));
+    if (!parts.length) {
+      doc = op.value;
+      continue;
+    }
+    const last = parts.pop();
+    let parent = doc;
+    for (const p of parts) parent = Array.isArray(parent) ? parent[Number(p)] : parent[p];
+    if (parent === null || typeof parent !== 'object') throw new Error(`Bad patch path ${op.path}`);
+    if (Array.isArray(parent)) {
+      const i = Number(last);
+      if (op.op === 'add') parent.splice(i, 0, op.value);
+      else if (op.op === 'remove') parent.splice(i, 1);
+      else parent[i] = op.value;
+    } else if (op.op === 'remove') {
+      delete parent[last];
+    } else {
+      parent[last] = op.value;
+    }
+  }
+  return doc;
+}
+
+// Patches from the cached version to the current one, or null when one is missing
+// or together they are not smaller than the bundle.
+function deltaChain(index, cached) {
+  const byFrom = new Map((index.deltas || []).map(d => [d.from, d]));
+  const chain = [];
+  let version = cached.version;
+  let hash = cached.hash;
+  let bytes = 0;
+  while (version !== index.version) {
+    const d = byFrom.get(version);
+    if (!d || d.base !== hash) return null;
+    chain.push(d);
+    bytes += d.bytes;
+    version = d.to;
+    hash = d.hash;
+  }
+  return hash === index.hash && bytes < index.bytes ? chain : null;
+}
+
+// Up to date from the cached bundle plus patches, or null when the full bundle has to be fetched.
+async function loadFromDeltas(serviceId, index) {
+  const cached = await cachedDataset(serviceId);
+  if (!cached) return null;
+  if (cached.hash === index.hash) return cached.data;
+  const chain = deltaChain(index, cached);
+  if (!chain) return null;
+  try {
+    let data = cached.data;
+    for (const d of chain) data = applyPatch(data, (await fetchJson(d.file)).ops);
+    await storeDataset(serviceId, index, data);
+    return data;
+  } catch (e) {
+    console.warn('Delta update failed, loading the full dataset', e);
+    return null;
+  }
+}
+
+// One minified bundle per service (tools/publish_bundles.py): questions, classes and theory.
+// A returning client only fetches the patches since its version (see above).
+// Falls back to the plain dataset when the bundles have not been published.
 async function loadService(serviceId) {
-  const url = `data/${serviceId}.json`;
-  const res = await fetch(url, { cache: 'no-store' });
-  if (!res.ok) throw new Error(`Could not load ${url}`);
-  DATA = await res.json();
+  await manifestReady;
+  let index = null;
+  try {
+    index = await fetchJson(`deltas/${serviceId}/index.json`);
+  } catch (e) {
+    // no deltas published: full bundle
+  }
+  if (index) {
+    const data = await loadFromDeltas(serviceId, index);
+    if (data) {
+      DATA = data;
+      return;
+    }
+  }
+  for (const path of [`bundles/${serviceId}.json`, `data/${serviceId}.json`]) {
+    const res = await fetchAsset(path);
+    if (res.ok) {
+      DATA = await res.json();
+      if (index && path === index.file) await storeDataset(serviceId, index, DATA);
+      return;
+    }
+  }
+  throw new Error(`Could not load data for ${serviceId}`);
+}
+
+// Typed or spoken names: trigram index over the normalized aliases (tools/build_answer_index.py),
+// shipped in the bundle as answerIndex and built here when only the plain dataset was loaded.
+// normalizeAnswer/answerTrigrams must stay the same as normalize()/trigrams() there.
+function normalizeAnswer(text) {
+  return String(text).toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '')
+    .replace(/[^a-z0-9]+/g, ' ').trim();
+}
+
+function answerTrigrams(norm) {
+  const p = ` ${norm} `;
+  const out = new Set();
+  for (let i = 0; i + 3 <= p.length; i++) out.add(p.slice(i, i + 3));
+  return out;
+}
+
+function buildAnswerIndex(questions) {
+  const idx = { v: 1, aliases: [], owner: [], size: [], grams: {} };
+  questions.forEach((q, qi) => {
+    const seen = new Set();
+    for (const a of [q.answer || '', ...(q.aliases || []), ...(q.aliasVariants || [])]) {
+      const n = normalizeAnswer(a);
+      if (!n || seen.has(n)) continue;
+      seen.add(n);
+      const ai = idx.aliases.length;
+      idx.aliases.push(n);
+      idx.owner.push(qi);
+      const grams = answerTrigrams(n);
+      idx.size.push(grams.size);
+      for (const g of grams) (idx.grams[g] ||= []).push(ai);
+    }
+  });
+  return idx;
+}
+
+// Best question for a free-text answer by shared trigrams (Dice), or null below minScore.
+function matchAnswer(text, minScore = 0.5) {
+  if (!DATA || !Array.isArray(DATA.questions)) return null;
+  if (!DATA.answerIndex) DATA.answerIndex = buildAnswerIndex(DATA.questions);
+  const idx = DATA.answerIndex;
+  const grams = answerTrigrams(normalizeAnswer(text));
+  // shared-trigram counts per alias in one reused typed array; only touched slots are read and reset
+  const counts = idx.counts || (idx.counts = new Uint16Array(idx.aliases.length));
+  const touched = [];
+  for (const g of grams) {
+    const list = Object.hasOwn(idx.grams, g) ? idx.grams[g] : null;
+    if (!list) continue;
+    for (let i = 0; i < list.length; i++) {
+      if (counts[list[i]]++ === 0) touched.push(list[i]);
+    }
+  }
+  let best = -1, score = 0;
+  for (const a of touched) {
+    const s = 2 * counts[a] / (grams.size + idx.size[a]);
+    counts[a] = 0;
+    if (s > score) { score = s; best = a; }
+  }
+  if (best < 0 || score < minScore) return null;
+  return { question: DATA.questions[idx.owner[best]], alias: idx.aliases[best], score };
 }
 
 function resetRound() {
@@ -80,8 +344,14 @@ function resetRound() {
     return;
   }
 
-  const n = Math.min(DATA.quizLength || 10, DATA.questions.length);
-  state.queue = shuffle(DATA.questions).slice(0, n);
+  const pool = quizPool();
+  const n = Math.min(DATA.quizLength || 10, pool.length);
+  state.queue = shuffle(pool).slice(0, n);
+}
+
+// Near-duplicate photos (tools/find_near_duplicates.py --apply) stay out of the rounds
+function quizPool() {
+  return (DATA && Array.isArray(DATA.questions) ? DATA.questions : []).filter(q => !q.duplicateOf);
 }
 
 function resetStats() {
@@ -92,7 +362,7 @@ function resetStats() {
 }
 
 function topBar() {
-  const total = (DATA && DATA.quizLength) ? Math.min(DATA.quizLength, (DATA.questions || []).length) : 0;
+  const total = (DATA && DATA.quizLength) ? Math.min(DATA.quizLength, quizPool().length) : 0;
   const current = state.queue.length ? Math.min(state.idx, state.queue.length) : 0;
 
   return `
@@ -178,9 +448,6 @@ function renderQuestion() {
   const q = state.queue[state.idx];
   const progress = Math.round((state.idx / state.queue.length) * 100);
 
-  const imgSrc = q.asset ? `images/${q.asset}.jpg` : 'images/missing.jpg';
-  const imgAltSrc = q.asset ? `images/${state.service}/${q.asset}.jpg` : null;
-
   const stepLabel = (state.mode === 'combo')
     ? (state.stage === 'class' ? 'Step: choose the classification.' : 'Step: choose the name.')
     : 'Step: choose the classification.';
@@ -199,7 +466,7 @@ function renderQuestion() {
         </div>
 
         <div class="media">
-          <img id="mainImage" class="zoomable" src="${imgSrc}" data-alt="${imgAltSrc || ''}" alt="${q.answer || 'vehicle'}" onerror="if(this.dataset.alt && !this.dataset.tried){this.dataset.tried='1'; this.src=this.dataset.alt;} else {this.onerror=null; this.src='images/missing.jpg';}" />
+          ${renderImage(q)}
         </div>
 
         <div class="stats">
@@ -232,14 +499,31 @@ function shouldShowNext() {
   return false;
 }
 
+// Hard distractors precomputed per question (tools/build_distractors.py): a short ranked list
+// with a few spare entries, so only that list is shuffled. Random names when it is missing.
+function nameOptions(q, n) {
+  const byId = DATA.byId || (DATA.byId = new Map((DATA.questions || []).map(x => [x.id, x])));
+  const names = [...new Set((q.distractors || []).map(id => byId.get(id)).filter(Boolean)
+    .map(x => x.answer).filter(a => a && a !== q.answer))];
+  if (names.length >= n - 1) return shuffle([...shuffle(names).slice(0, n - 1), q.answer]);
+  // the questions a round can show (no duplicateOf), each name once
+  const poolNames = [...new Set(quizPool().map(x => x.answer).filter(Boolean))];
+  return pickN(poolNames, n, q.answer);
+}
+
 function renderChoices(q) {
   const optionCount = DATA.mcqOptions || 6;
 
   if (state.mode === 'combo' && state.stage === 'name') {
     // Name options
-    const allNames = (DATA.questions || []).map(x => x.answer).filter(Boolean);
-    const options = pickN(allNames, optionCount, q.answer);
+    const options = nameOptions(q, optionCount);
+    const mic = SpeechRecognition ? '<button class="btn" type="button" id="btnSpeak">🎤 Say it</button>' : '';
     return `
+      <form class="field" id="nameForm">
+        <input class="input" id="nameInput" autocomplete="off" placeholder="Type or say the name" />
+        <button class="btn" type="submit">Check</button>
+        ${mic}
+      </form>
       <div class="grid">
         ${options.map(opt => `<button class="btn option" data-name="${escapeHtml(opt)}">${escapeHtml(opt)}</button>`).join('')}
       </div>
@@ -360,10 +644,18 @@ function wireStartScreen() {
 
 function showTheory() {
   if (!DATA) return;
-  const items = (DATA.vehicleClasses || []).map(c => `<li>${escapeHtml(c)}</li>`).join('');
+  const classes = DATA.vehicleClasses || DATA.classes || [];
+  const theory = DATA.theory && DATA.theory.items ? DATA.theory : null;
+  const items = classes.map(c => {
+    const t = theory && theory.items[c];
+    const bullets = t && Array.isArray(t.bullets) ? `<ul>${t.bullets.map(b => `<li>${escapeHtml(b)}</li>`).join('')}</ul>` : '';
+    return `<li>${escapeHtml(c)}${bullets}</li>`;
+  }).join('');
+  const intro = theory && Array.isArray(theory.intro) ? theory.intro.map(p => `<p>${escapeHtml(p)}</p>`).join('') : '';
   elTheoryContent.innerHTML = `
-    <h2>Theory: classifications</h2>
+    <h2>${escapeHtml(theory && theory.title ? theory.title : 'Theory: classifications')}</h2>
     <p>These are the categories you need to know for ${escapeHtml(serviceLabel(state.service))}.</p>
+    ${intro}
     <ul>${items}</ul>
     <p class="muted">Close this window to start practising.</p>
   `;
@@ -382,6 +674,15 @@ function wireQuestion() {
   document.querySelectorAll('[data-name]').forEach(btn => {
     btn.onclick = () => onPickName(btn.getAttribute('data-name'));
   });
+  const nameForm = document.getElementById('nameForm');
+  if (nameForm) {
+    nameForm.onsubmit = (e) => {
+      e.preventDefault();
+      onTypedName(document.getElementById('nameInput').value);
+    };
+  }
+  const btnSpeak = document.getElementById('btnSpeak');
+  if (btnSpeak) btnSpeak.onclick = () => listenForName(btnSpeak);
 
   const btnNext = document.getElementById('btnNext');
   if (btnNext) {
@@ -472,6 +773,32 @@ function onPickName(chosen) {
   }, 750);
 }
 
+// A typed/spoken name counts as the option it matches; anything else is a wrong answer.
+function onTypedName(text) {
+  if (state.locked || !String(text).trim()) return;
+  const m = matchAnswer(text);
+  onPickName(m ? m.question.answer : String(text).trim());
+}
+
+const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition || null;
+
+function listenForName(btn) {
+  const rec = new SpeechRecognition();
+  rec.lang = document.documentElement.lang || 'en';
+  rec.maxAlternatives = 5;
+  btn.disabled = true;
+  rec.onresult = (e) => {
+    // the transcript alternative that matches best
+    const alts = Array.from(e.results[0], r => r.transcript);
+    const scored = alts.map(t => ({ t, m: matchAnswer(t) })).sort((a, b) => (b.m ? b.m.score : 0) - (a.m ? a.m.score : 0));
+    const input = document.getElementById('nameInput');
+    if (input) input.value = scored[0].t;
+    onTypedName(scored[0].t);
+  };
+  rec.onend = () => { btn.disabled = false; };
+  rec.start();
+}
+
 function nextQuestion() {
   state.locked = false;
   state.pendingReveal = '';
@@ -519,3 +846,8 @@ function hideImageModal() {
 // boot
 resetStats();
 render();
+
+// offline support + long-lived cache for hashed assets (needs http(s), not file://)
+if ('serviceWorker' in navigator && location.protocol.startsWith('http')) {
+  navigator.serviceWorker.register('sw.js').catch(e => console.warn('Service worker not registered', e));
+}
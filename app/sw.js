@@ -0,0 +1,115 @@
+/* Service worker for the NL Defence Speaking Trainer
+ * - assets/… (content-hashed, see tools/publish_assets.py): cache-first, never revalidated;
+ *   only files the current manifest.json lists are stored, and entries that drop out of it
+ *   are deleted
+ * - everything else (page shell, manifest.json, images, unhashed fallbacks): network-first,
+ *   the cached copy is used offline
+ * - manifest.json "precache" is stored on install and whenever a new manifest is fetched
+ *   (hashed files in the asset cache, plain paths such as images in the shell cache)
+ * - the data cache of app.js (last bundle per service, for delta updates) is left alone
+ */
+
+const SHELL_CACHE = 'shell-v1';
+const ASSET_CACHE = 'assets-v1';
+const DATA_CACHE = 'data-v1';  // written by app.js
+const SHELL = ['./', 'index.html', 'app.js', 'styles.css', 'manifest.json'];
+
+function abs(url) {
+  return new URL(url, self.registration.scope).href;
+}
+
+function isHashed(url) {
+  return abs(url).startsWith(abs('assets/'));
+}
+
+// absolute URLs of the files in the current manifest; null until first needed
+let manifestFiles = null;
+
+async function currentFiles() {
+  if (!manifestFiles) {
+    const res = await (await caches.open(SHELL_CACHE)).match('manifest.json');
+    const manifest = res ? await res.json().catch(() => ({})) : {};
+    manifestFiles = new Set(Object.values(manifest.files || {}).map(abs));
+  }
+  return manifestFiles;
+}
+
+async function precache(manifest) {
+  const cache = await caches.open(ASSET_CACHE);
+  const wanted = new Set(Object.values(manifest.files || {}).map(abs));
+  manifestFiles = wanted;
+  const have = new Set();
+  for (const req of await cache.keys()) {
+    if (wanted.has(req.url)) have.add(req.url);
+    else await cache.delete(req);
+  }
+  const list = manifest.precache || [];
+  const todo = list.filter(u => isHashed(u) && wanted.has(abs(u)) && !have.has(abs(u)));
+  const shell = await caches.open(SHELL_CACHE);
+  const plain = list.filter(u => !isHashed(u));
+  // one missing file must not fail the rest
+  await Promise.all([
+    ...todo.map(u => cache.add(u).catch(() => {})),
+    ...plain.map(u => shell.match(u).then(hit => hit || shell.add(u)).catch(() => {})),
+  ]);
+}
+
+self.addEventListener('install', (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(SHELL_CACHE);
+    await Promise.all(SHELL.map(u => cache.add(u).catch(() => {})));
+    const res = await cache.match('manifest.json');
+    if (res) await precache(await res.json());
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil((async () => {
+    for (const key of await caches.keys()) {
+      if (key !== SHELL_CACHE && key !== ASSET_CACHE && key !== DATA_CACHE) await caches.delete(key);
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function cacheFirst(req) {
+  const cache = await caches.open(ASSET_CACHE);
+  const hit = await cache.match(req);
+  if (hit) return hit;
+  const res = await fetch(req);
+  // an old hashed name (a page still running an older manifest) is served but not kept
+  if (res.ok && (await currentFiles()).has(req.url)) await cache.put(req, res.clone());
+  return res;
+}
+
+async function networkFirst(event) {
+  const req = event.request;
+  const cache = await caches.open(SHELL_CACHE);
+  try {
+    const res = await fetch(req);
+    if (res.ok) {
+      await cache.put(req, res.clone());
+      if (new URL(req.url).pathname.endsWith('/manifest.json')) {
+        event.waitUntil(res.clone().json().then(precache).catch(() => {}));
+      }
+    }
+    return res;
+  } catch (err) {
+    const hit = await cache.match(req, { ignoreSearch: true });
+    if (hit) return hit;
+    throw err;
+  }
+}
+
+self.addEventListener('fetch', (event) => {
+  const req = event.request;
+  if (req.method !== 'GET') return;
+  const url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+  if (isHashed(url.href)) {
+    event.respondWith(cacheFirst(req));
+  } else {
+    event.respondWith(networkFirst(event));
+  }
+});
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Throughput of the compiled keyword rule engine (tools/classify_rules.py)
+against the old `any(k in t for k in [...])` classifiers, on synthetic titles.
+Also checks that both give identical results.
+
+Run from repo root:
+  python3 bench/bench_classify.py --n 100000
+"""
+import argparse, random, re, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from classify_rules import AIR_CLASS_RULES, NAVY_CLASS_RULES, LAND_CATEGORY_RULES  # noqa: E402
+
+# --- the old implementations, verbatim --------------------------------------
+
+def norm(s):
+    return re.sub(r"\s+", " ", (s or "")).strip().lower()
+
+def old_classify_air(answer, source_page=""):
+    t = norm(answer)
+    u = norm(source_page)
+    if any(k in t for k in ["drone", "onbemand", "onbemande", "uav", "uas", "mq-9", "mq9", "reaper"]):
+        return "Uncrewed Aerial System (UAS)"
+    if any(k in t for k in ["helikopter", "helicopter", "apache", "chinook", "nh90", "cougar"]):
+        return "Helicopter"
+    if any(k in t for k in ["lesvliegtuig", "trainer", "training", "pc-7", "pc7", "pilatus"]):
+        return "Trainer Aircraft"
+    if any(k in t for k in ["jachtvliegtuig", "fighter", "f-35", "f35", "f-16", "f16"]):
+        return "Fighter Aircraft"
+    if any(k in t for k in ["transport", "transportvliegtuig", "tanker", "tankvliegtuig", "kdc-10", "kdc10", "a330", "mrt", "mrt t", "c-130", "c130", "hercules", "gulfstream"]):
+        return "Transport Aircraft"
+    if any(k in u for k in ["f-35", "f-16"]):
+        return "Fighter Aircraft"
+    if any(k in u for k in ["apache", "chinook", "nh90", "helikopter"]):
+        return "Helicopter"
+    return "Other"
+
+def old_classify_ship(answer, source_page=""):
+    t = norm(answer)
+    u = norm(source_page)
+    if any(k in t for k in ["onderzeeboot", "submarine", "walrusklasse", "walrus-klasse", "walrus"]):
+        return "Submarine"
+    if any(k in t for k in ["fregat", "frigate", "zeven provinci", "zevenprovincien", "zeven provinciën", "lcf", "luchtverdedigings- en commandofregat", "m-fregat", "multipurpose fregat"]):
+        return "Frigate"
+    if any(k in t for k in ["patrouille", "patrol", "opv", "hollandklasse", "holland-klasse", "offshore patrol"]):
+        return "Patrol Vessel"
+    if any(k in t for k in ["amfib", "amphib", "landingsschip", "landing platform", "rotterdam", "johan de witt", "johan-de-witt"]):
+        return "Amphibious Ship"
+    if any(k in t for k in ["mijnenjager", "mijnenbestr", "mine counter", "mcm", "alkmaar", "alkmaarklasse", "alkmaar-klasse"]):
+        return "Mine Countermeasures Vessel"
+    if any(k in t for k in ["bevoorrad", "support", "ondersteun", "tanker", "logistiek", "karel doorman", "doorman", "combat support", "hydrograf", "sleepboot", "hulpvaartuig"]):
+        return "Support Vessel"
+    if "onderzeeboot" in u:
+        return "Submarine"
+    if "fregat" in u or "lcf" in u:
+        return "Frigate"
+    if "opv" in u or "patrouille" in u:
+        return "Patrol Vessel"
+    if "mijnen" in u:
+        return "Mine Countermeasures Vessel"
+    return "Other"
+
+LAND_ARMOURED = {"tank", "ifv", "afv", "armoured", "armored", "tracked", "mbt"}
+LAND_TROOP = {"apc", "troop", "infantry", "carrier", "transport", "personnel"}
+
+def get_str_list(item, keys):
+    for k in keys:
+        if k in item and item[k] is not None:
+            v = item[k]
+            if isinstance(v, list):
+                return [str(x) for x in v]
+            if isinstance(v, str):
+                return [s.strip() for s in v.split(",") if s.strip()]
+    return []
+
+def get_str(item, keys):
+    for k in keys:
+        if k in item and isinstance(item[k], str):
+            return item[k]
+    return ""
+
+def normalize_tokens(*parts):
+    tokens = []
+    for p in parts:
+        for s in p:
+            tokens.append(str(s).lower().strip())
+    return tokens
+
+def old_infer_land(item):
+    type_str = get_str(item, ["type", "vehicleType", "platformType", "class"])
+    roles = get_str_list(item, ["roles", "nato_roles", "natoRoles", "role"])
+    tags  = get_str_list(item, ["tags", "keywords"])
+    blob = " ".join(normalize_tokens([type_str], roles, tags))
+    if any(k in blob for k in LAND_ARMOURED):
+        return ("Combat vehicle", "high")
+    if any(k in blob for k in LAND_TROOP):
+        return ("Infantry / Troop transport", "high")
+    return ("Support vehicle", "low")
+
+# --- synthetic data -----------------------------------------------------------
+
+WORDS = ("f-35 lightning jachtvliegtuig chinook transporthelikopter pilatus pc-7 mq-9 reaper "
+         "hercules c-130 gulfstream walrusklasse onderzeeboot zeven provinciën fregat holland-klasse "
+         "patrouilleschip karel doorman combat support ship alkmaarklasse mijnenjager rotterdam amfibisch "
+         "tank armoured carrier troop boxer fennek bushmaster daf scania vrachtwagen terreinwagen "
+         "nieuw oud groot klein zwaar licht type serie ii iii nl koninklijke").split()
+
+def synthetic_titles(n, seed=1):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        words = rnd.sample(WORDS, rnd.randint(2, 6))
+        if rnd.random() < 0.3:
+            words.append(f"{rnd.choice('abcdxyz')}{rnd.randint(1, 999)}")
+        page = f"https://www.defensie.nl/onderwerpen/materieel/{rnd.choice(['schepen', 'vliegtuigen-en-helikopters'])}/{'-'.join(rnd.sample(WORDS, 2))}"
+        out.append({"answer": " ".join(words).title(), "source_page": page, "class": " ".join(words)})
+    return out
+
+def bench(label, fn, records):
+    t0 = time.perf_counter()
+    res = fn(records)
+    dt = time.perf_counter() - t0
+    print(f"  {label:<9}{len(records) / dt:>12,.0f} titles/s  ({dt:.3f}s)")
+    return res
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+    records = synthetic_titles(args.n)
+
+    cases = [
+        ("air class", lambda rs: [old_classify_air(r["answer"], r["source_page"]) for r in rs], AIR_CLASS_RULES.classify_many),
+        ("navy class", lambda rs: [old_classify_ship(r["answer"], r["source_page"]) for r in rs], NAVY_CLASS_RULES.classify_many),
+        ("land category", lambda rs: [old_infer_land(r) for r in rs], LAND_CATEGORY_RULES.classify_many),
+    ]
+    ok = True
+    for name, old, new in cases:
+        print(f"{name} ({args.n:,} titles)")
+        a = bench("old", old, records)
+        b = bench("compiled", new, records)
+        if a != b:
+            ok = False
+            bad = next(i for i, (x, y) in enumerate(zip(a, b)) if x != y)
+            print(f"  MISMATCH at {bad}: {records[bad]} old={a[bad]} new={b[bad]}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
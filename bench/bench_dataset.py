@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Memory and load time of tools/dataset.py records against the plain dicts the
+tools used to hold (json.loads), on a synthetic dataset cloned from the
+questions in app/data/*.json. Memory is what stays allocated after loading
+(tracemalloc), per 100k questions. Also checks that records -> jsonio.dumps
+gives back the exact input bytes.
+
+The lqip placeholders (a ~1 KiB data URI per question) are the same strings
+in every representation, so they are measured with and without them.
+
+Run from repo root:
+  python3 bench/bench_dataset.py --n 100000
+"""
+import argparse, gc, json, sys, time, tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+import dataset  # noqa: E402
+from jsonio import dumps  # noqa: E402
+
+def templates():
+    out = []
+    for s in dataset.SERVICES:
+        p = ROOT / "app" / "data" / f"{s}.json"
+        if p.exists():
+            out += json.loads(p.read_text(encoding="utf-8")).get("questions", [])
+    return out
+
+def synthetic(n: int, lqip: bool) -> bytes:
+    base = templates()
+    questions = []
+    for i in range(n):
+        t = base[i % len(base)]
+        q = {}
+        for k, v in t.items():
+            if k == "lqip" and not lqip:
+                continue
+            if k in ("id", "asset", "answer"):
+                v = f"{v}-{i}"
+            elif k == "aliases":
+                v = [f"{a} {i}" for a in v]
+            elif k == "distractors":
+                v = [f"{base[m % len(base)]['id']}-{m}" for m in ((i + j + 1) % n for j in range(len(v)))]
+            q[k] = v
+        questions.append(q)
+    classes = sorted({q.get("class") for q in questions if q.get("class")})
+    return dumps({"quizLength": 20, "mcqOptions": 6, "classes": classes, "questions": questions}).encode("utf-8")
+
+def measure(fn, raw: bytes):
+    """(object, retained bytes, peak bytes, seconds)"""
+    gc.collect()
+    t = time.perf_counter()
+    fn(raw)
+    seconds = time.perf_counter() - t
+    gc.collect()
+    tracemalloc.start()
+    obj = fn(raw)
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, cur, peak, seconds
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    args = ap.parse_args()
+
+    ways = [("dicts (json.loads)", json.loads)]
+    if dataset.orjson is not None:
+        ways.append(("dicts (orjson.loads)", dataset.orjson.loads))
+    ways.append((f"records ({dataset.BACKEND})", dataset.loads))
+
+    per = 100_000 / args.n
+    ok = True
+    for lqip in (True, False):
+        raw = synthetic(args.n, lqip)
+        print(f"\n{args.n} questions, {'with' if lqip else 'without'} lqip, {len(raw) / 2**20:.1f} MiB of JSON")
+        print(f"{'':<24}{'MiB/100k':>10}{'peak MiB':>10}{'load s':>9}")
+        base = None
+        for name, fn in ways:
+            obj, cur, peak, seconds = measure(fn, raw)
+            base = base or cur
+            rel = "" if cur == base else f"  ({cur / base:.0%} of json dicts)"
+            print(f"{name:<24}{cur * per / 2**20:>10.1f}{peak * per / 2**20:>10.1f}{seconds:>9.2f}{rel}")
+            if isinstance(obj, dataset.Dataset):
+                t = time.perf_counter()
+                same = obj.dumps().encode("utf-8") == raw
+                print(f"{'dumps':<24}{'':>20}{time.perf_counter() - t:>9.2f}  byte-identical: {same}")
+                ok &= same
+            del obj
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Delta updates (tools/publish_deltas.py) on a history of typical edits, and a
+check that the patch chain reproduces the bundle exactly.
+
+A copy of one service's dataset and theory goes through a series of edits
+(reclassifications, a new question, a dropped question, a renamed answer, a
+new field, a theory change, ...). After each one the bundle is published, a
+version recorded and the assets hashed, as build_data.py does. Printed per version: the bundle
+size against the patch a client on the previous version fetches instead
+(raw and gzip).
+
+Then, for every version still linked to the latest one, its bundle is taken
+and the chain of patches is applied:
+- with apply_patch() from the tool: the result must be the latest bundle,
+  byte for byte
+- with applyPatch() from app/app.js, under node when it is installed: the
+  result must be the same JSON
+Any difference, or a history in which no patch was written at all, fails the
+run with exit code 1, so it serves as the check for tools/publish_deltas.py.
+
+Run from repo root:
+  python3 bench/bench_deltas.py [--service marine] [--versions 30] [--keep 20]
+"""
+import argparse, copy, gzip, json, random, re, shutil, subprocess, sys, tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+import publish_assets  # noqa: E402
+import publish_bundles  # noqa: E402
+import publish_deltas  # noqa: E402
+from jsonio import dumps, write_if_changed  # noqa: E402
+
+# --- edits --------------------------------------------------------------------------
+
+def reclassify(data, rnd, n=1):
+    classes = data.get("vehicleClasses") or data.get("classes") or ["Other"]
+    for q in rnd.sample(data["questions"], min(n, len(data["questions"]))):
+        q["class"] = rnd.choice([c for c in classes if c != q.get("class")] or classes)
+
+def add_question(data, rnd):
+    qs = data["questions"]
+    q = copy.deepcopy(rnd.choice(qs))
+    n = rnd.randrange(10**6)
+    q["id"], q["asset"], q["answer"] = f"{q['id']}-new{n}", f"{q['asset']}-new{n}", f"{q.get('answer', '')} Mk {n}"
+    q["aliases"] = [q["answer"].lower()]
+    qs.insert(rnd.randrange(len(qs) + 1), q)
+
+def drop_question(data, rnd):
+    data["questions"].pop(rnd.randrange(len(data["questions"])))
+
+def rename_answer(data, rnd):
+    q = rnd.choice(data["questions"])
+    q["answer"] = f"{q.get('answer', '')} (NL)"
+    q["aliases"] = sorted(set(q.get("aliases", [])) | {q["answer"].lower()})
+
+def new_field(data, rnd):
+    a, b = rnd.sample(data["questions"], 2)
+    a["duplicateOf"] = b["id"]
+
+def move_key(data, rnd):
+    q = rnd.choice(data["questions"])
+    keys = list(q)
+    rnd.shuffle(keys)
+    moved = {k: q[k] for k in keys}
+    q.clear()
+    q.update(moved)
+
+def move_question(data, rnd):
+    qs = data["questions"]
+    qs.append(qs.pop(rnd.randrange(len(qs))))
+
+EDITS = {
+    "reclassify 1": reclassify,
+    "reclassify 5": lambda d, r: reclassify(d, r, 5),
+    "new question": add_question,
+    "drop question": drop_question,
+    "rename answer": rename_answer,
+    "new field": new_field,
+    "key order": move_key,
+    "move question": move_question,
+    "theory": None,  # handled in edit()
+}
+
+def edit(app: Path, service: str, kind: str, rnd: random.Random) -> None:
+    if kind == "theory":
+        p = app / "theory" / f"{service}.json"
+        theory = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {"title": "Theory", "items": {}}
+        theory.setdefault("intro", []).append(f"Note {rnd.randrange(1000)}.")
+        write_if_changed(p, dumps(theory))
+        return
+    p = app / "data" / f"{service}.json"
+    data = json.loads(p.read_text(encoding="utf-8"))
+    EDITS[kind](data, rnd)
+    write_if_changed(p, dumps(data))
+
+# --- checks -------------------------------------------------------------------------
+
+def chain(index: dict, version: int):
+    by_from = {d["from"]: d for d in index["deltas"]}
+    out = []
+    while version != index["version"]:
+        if version not in by_from:
+            return None
+        out.append(by_from[version])
+        version = by_from[version]["to"]
+    return out
+
+def js_apply_patch() -> str:
+    src = (ROOT / "app" / "app.js").read_text(encoding="utf-8")
+    m = re.search(r"^function applyPatch\(.*?^}\n", src, re.S | re.M)
+    if not m:
+        raise SystemExit("applyPatch() not found in app/app.js")
+    return m.group(0)
+
+def node_apply(fn_src: str, doc, patches):
+    script = fn_src + """
+let input = '';
+process.stdin.on('data', c => input += c).on('end', () => {
+  const { doc, patches } = JSON.parse(input);
+  process.stdout.write(JSON.stringify(patches.reduce((d, ops) => applyPatch(d, ops), doc)));
+});
+"""
+    r = subprocess.run(["node", "-e", script], input=json.dumps({"doc": doc, "patches": patches}),
+                       capture_output=True, text=True, check=True)
+    return json.loads(r.stdout)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder to copy the dataset from")
+    ap.add_argument("--service", default="marine", choices=publish_deltas.SERVICES)
+    ap.add_argument("--versions", type=int, default=30, help="Edits after the first version")
+    ap.add_argument("--keep", type=int, default=publish_deltas.KEEP)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    rnd = random.Random(args.seed)
+    src, s = Path(args.app), args.service
+    node = shutil.which("node")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Path(tmp) / "app"
+        (app / "data").mkdir(parents=True)
+        (app / "theory").mkdir()
+        shutil.copy2(src / "data" / f"{s}.json", app / "data")
+        for p in (src / "theory").glob(f"{s}*.json"):
+            shutil.copy2(p, app / "theory")
+
+        bundles = {}
+        kinds = list(EDITS)
+        plan = [None] + kinds + [rnd.choice(kinds) for _ in range(max(0, args.versions - len(kinds)))]
+        print(f"{'edit':<16}{'version':>8}{'bundle':>10}{'gz':>9}{'patch':>9}{'gz':>8}{'ops':>6}")
+        for kind in plan[:args.versions + 1]:
+            if kind:
+                edit(app, s, kind, rnd)
+            publish_bundles.publish(app, s)
+            r = publish_deltas.publish(app, s, args.keep)
+            publish_assets.publish(app)  # the hashed bundle copy is the base of the next patch
+            raw = (app / "bundles" / f"{s}.json").read_bytes()
+            bundles[r["version"]] = raw
+            d = r["delta"]
+            patch = (app / d["file"]).read_bytes() if d else b""
+            print(f"{kind or 'first':<16}{r['version']:>8}{len(raw):>10}{len(gzip.compress(raw, mtime=0)):>9}"
+                  f"{len(patch) if d else '-':>9}{len(gzip.compress(patch, mtime=0)) if d else '-':>8}"
+                  f"{len(json.loads(patch)['ops']) if d else '-':>6}")
+
+        index = publish_deltas.load_index(app, s)
+        latest = bundles[index["version"]]
+        fn_src = js_apply_patch() if node else None
+        ok, checked = True, 0
+        for v in sorted(bundles):
+            steps = chain(index, v)
+            if steps is None:
+                continue
+            patches = [json.loads((app / d["file"]).read_bytes())["ops"] for d in steps]
+            doc = json.loads(bundles[v])
+            for ops in copy.deepcopy(patches):  # applied values become part of doc, and later patches edit them
+                doc = publish_deltas.apply_patch(doc, ops)
+            same = publish_deltas.minify(doc) == latest
+            js_same = node_apply(fn_src, json.loads(bundles[v]), patches) == json.loads(latest) if node else True
+            if not (same and js_same):
+                print(f"❌ version {v} + {len(steps)} patch(es): python {'ok' if same else 'differs'}, "
+                      f"app.js {'ok' if js_same else 'differs'}")
+            ok &= same and js_same
+            checked += 1
+        print(f"\nchains checked: {checked} of {len(bundles)} versions reach version {index['version']} "
+              f"({len(index['deltas'])} patches kept); byte-identical: {ok}"
+              + ("" if node else "  (node not found: app.js applyPatch not checked)"))
+        if len(bundles) > 1 and not index["deltas"]:
+            print("❌ no patch was written for any version")
+            ok = False
+    print("✅ delta chains reproduce the bundle" if ok else "❌ delta check failed")
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
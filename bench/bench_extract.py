@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the scraper page extraction, with a parity check.
+
+Compares, per page:
+- before: the BeautifulSoup(html, "html.parser") extractors the scrapers used
+          (a full soup per page, then a walk over every tag's attributes, then
+          the regex over the raw page the original scrapers used)
+- after:  page_extract.extract() with html.parser, and with lxml when it is
+          installed (one pass that stops once the title and image are found)
+
+Two jobs are timed: the item job (h1 title + first /binaries/large/ image, on
+every page) and the links job (links below --link-prefix, on every page).
+Every backend must give the exact results of "before" on every page; pages
+that differ are listed and the run exits with status 1.
+
+Pages are read from --pages: a folder of saved .html pages, or an HTTP cache
+folder of the scrapers (.cache/http, where <key>.body sits next to <key>.json
+with the URL). Without --pages, defensie.nl-like item and topic pages are
+generated (same page chrome, menus and footer), plus small pages with the
+markup corner cases the extractors have to agree on.
+
+Run from repo root:
+  python3 bench/bench_extract.py
+  python3 bench/bench_extract.py --pages .cache/http --rounds 5
+"""
+import argparse, json, random, re, sys, time
+from pathlib import Path
+from typing import List
+from urllib.parse import urljoin
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import page_extract  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+BASE = "https://www.defensie.nl"
+PREFIX = "/onderwerpen/materieel/"
+
+# --- before: the BeautifulSoup extractors ----------------------------------------
+
+def old_parse_item(html: str, base: str = BASE):
+    soup = BeautifulSoup(html, "html.parser")
+    h1 = soup.find("h1")
+    title = re.sub(r"\s+", " ", h1.get_text()).strip() if h1 else None
+    for tag in soup.find_all(True):
+        for v in tag.attrs.values():
+            m = page_extract.LARGE_IMAGE_RE.search(" ".join(v) if isinstance(v, list) else v)
+            if m:
+                return title or None, urljoin(base, m.group(1))
+    m = page_extract.LARGE_IMAGE_RE.search(html)
+    return title or None, urljoin(base, m.group(1)) if m else None
+
+def old_topic_links(html: str, link_prefix: str, base: str = BASE) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    seen = set(); pages = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"].split("#")[0].split("?")[0]
+        if href.startswith(link_prefix):
+            u = urljoin(base, href)
+            if u not in seen:
+                seen.add(u); pages.append(u)
+    return pages
+
+# --- pages ----------------------------------------------------------------------
+
+WORDS = ("fregat patrouille transport helikopter pantser radar sensor bemanning missie marine "
+         "luchtmacht landmacht oefening inzet onderhoud snelheid bereik bewapening").split()
+
+def text(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def chrome(rnd: random.Random, title: str, main: str) -> str:
+    """defensie.nl-style page around `main`: head, mega menu, breadcrumb, footer, scripts."""
+    metas = "".join(f'<meta property="og:{k}" content="{text(rnd, 6)}">' for k in ("title", "description", "type", "site_name"))
+    css = "".join(f'<link rel="stylesheet" href="/static/css/{i}.css">' for i in range(6))
+    menu = "".join(
+        f'<li class="menu__item"><a class="menu__link" href="/onderwerpen/{rnd.choice(WORDS)}-{i}">{text(rnd, 3)}</a>'
+        f'<ul>{"".join(f"<li><a href=/onderwerpen/{rnd.choice(WORDS)}/{j}>{text(rnd, 2)}</a></li>" for j in range(8))}</ul></li>'
+        for i in range(18))
+    footer = "".join(f'<li><a href="/organisatie/{rnd.choice(WORDS)}-{i}" title="{text(rnd, 4)}">{text(rnd, 3)}</a></li>'
+                     for i in range(80))
+    return (f'<!DOCTYPE html><html lang="nl"><head><meta charset="utf-8"><title>{title} | Defensie.nl</title>'
+            f'{metas}{css}<script>window.dataLayer=window.dataLayer||[];dataLayer.push({{"page":"{title}"}});</script>'
+            f'<style>.hero{{background:#154273}} .menu__item>a{{color:#fff}}</style></head>'
+            f'<body class="page"><a class="skiplink" href="#content">Naar de inhoud</a>'
+            f'<header class="header"><nav class="menu" aria-label="Hoofdmenu"><ul>{menu}</ul></nav>'
+            f'<form class="search" action="/zoeken"><input type="search" name="q"></form></header>'
+            f'<div class="breadcrumb"><a href="/">Home</a> &gt; <a href="/onderwerpen">Onderwerpen</a> &gt; '
+            f'<a href="/onderwerpen/materieel">Materieel</a></div>'
+            f'<main id="content">{main}</main>'
+            f'<footer class="footer"><ul>{footer}</ul><p>&copy; Ministerie van Defensie</p></footer>'
+            f'{"".join(f"<script src=/static/js/{i}.js defer></script>" for i in range(5))}</body></html>')
+
+def item_page(rnd: random.Random, i: int) -> str:
+    title = f"{text(rnd, 2)[:-1]} ({rnd.choice(['F-35', 'NH90', 'Boxer', 'LCF'])}) {i}"
+    specs = "".join(f"<tr><th>{text(rnd, 1)}</th><td>{rnd.randint(1, 9999)} {rnd.choice(['km', 'kg', 'm'])}</td></tr>"
+                    for _ in range(12))
+    related = "".join(f'<li><a href="{PREFIX}schepen/{rnd.choice(WORDS)}-{j}">{text(rnd, 3)}</a></li>' for j in range(12))
+    main = (f'<article><header class="hero"><h1 class="hero__title">{title}</h1>'
+            f'<p class="intro">{text(rnd, 30)}</p></header>'
+            f'<figure><picture><source media="(max-width: 600px)" srcset="/binaries/medium/content/gallery/{i}.jpg">'
+            f'<img src="/binaries/large/content/gallery/materieel/{i}.jpg" alt="{title}" loading="lazy"></picture>'
+            f'<figcaption>{text(rnd, 10)}</figcaption></figure>'
+            f'{"".join(f"<p>{text(rnd, 60)}</p>" for _ in range(8))}'
+            f'<table class="specs">{specs}</table>'
+            f'<section class="related"><h2>Zie ook</h2><ul>{related}</ul></section></article>')
+    return chrome(rnd, title, main)
+
+def topic_page(rnd: random.Random, n: int) -> str:
+    cards = "".join(
+        f'<li class="card"><a class="card__image" href="{PREFIX}schepen/item-{j}?ref=overzicht">'
+        f'<img src="/binaries/small/content/gallery/{j}.jpg" alt=""></a>'
+        f'<h3><a href="{PREFIX}schepen/item-{j}">{text(rnd, 3)}</a></h3><p>{text(rnd, 12)}</p></li>'
+        for j in range(n))
+    return chrome(rnd, "Schepen", f'<h1>Schepen</h1><p>{text(rnd, 40)}</p><ul class="cards">{cards}</ul>')
+
+# markup the extractors must agree on
+CORNER_CASES = {
+    "entities": '<h1>Zr.Ms. Karel Doorman &amp; co&nbsp;&#8217;s</h1><img src="/binaries/large/a&amp;b.jpg">',
+    "nested-h1-markup": '<h1><span class="x">F-35</span>\n  <small>Lightning&nbsp;II</small></h1><img src="/binaries/large/f35.jpg">',
+    "no-h1": '<h2>Not a title</h2><img src="/binaries/large/x.jpg">',
+    "empty-first-h1": '<h1> </h1><h1>Second</h1><img src="/binaries/large/x.jpg">',
+    "image-before-h1": '<div data-src="/binaries/large/lazy.jpg"></div><h1>Title</h1><img src="/binaries/large/later.jpg">',
+    "srcset": '<h1>T</h1><img srcset="/binaries/large/a.jpg 2x, /binaries/large/b.jpg 3x">',
+    "image-in-class": '<h1>T</h1><div class="bg  /binaries/large/c.jpg  wide"></div>',
+    "image-link": '<a href="/binaries/large/doc.pdf?x=1">pdf</a><h1>T</h1>',
+    "script-in-h1": '<h1>Pat<script>var s = "</h1><h1>x";</script>rol<!-- c --> boat</h1>',
+    "style-in-h1": '<h1><style>.a{}</style>Styled</h1>',
+    "uppercase": '<H1 CLASS="t">Upper <B>Case</B></H1><IMG SRC="/binaries/large/UP.JPG">',
+    "unclosed-h1": '<div><h1>Runs on</div><p>after</p><img src="/binaries/large/x.jpg">',
+    "h1-never-closed": '<h1>To the end <b>of</b> the page',
+    "nested-h1": '<h1>a<h1>b</h1>c</h1><img src="/binaries/large/x.jpg">',
+    "comment": '<!-- <h1>Fake</h1> <img src="/binaries/large/fake.jpg"> --><h1>Real</h1>',
+    "self-closing": '<h1/>x<img src="/binaries/large/x.jpg"/>',
+    "no-image": '<h1>Only a title</h1><img src="/binaries/small/x.jpg">',
+    "image-in-script": '<h1>T</h1><script>window.hero = {"src": "/binaries/large/hero.jpg"};</script>',
+    "image-in-json": ('<script type="application/ld+json">{"image": "https://www.defensie.nl/binaries/large/ld.jpg"}'
+                      '</script><h1>T</h1><img src="/binaries/small/x.jpg">'),
+    "script-then-attribute": '<script>var a = "/binaries/large/s.jpg";</script><h1>T</h1><img src="/binaries/large/a.jpg">',
+    "valueless": '<h1 hidden>T</h1><input disabled><a href>empty</a><img src="/binaries/large/x.jpg">',
+    "links": (f'<a href="{PREFIX}a#top">a</a><a href="{PREFIX}a?x=1">a again</a><a href="{BASE}{PREFIX}abs">abs</a>'
+              f'<a href="{PREFIX}b">b</a><a name="{PREFIX}c">no href</a><A HREF="{PREFIX}d">d</A>'),
+}
+
+def load_pages(folder: Path):
+    """(name, html) of saved pages: *.html, or *.body files of an HTTP cache that look like HTML."""
+    pages = []
+    for p in sorted(folder.glob("*.htm*")):
+        pages.append((p.name, p.read_text(encoding="utf-8", errors="replace")))
+    for p in sorted(folder.glob("*.body")):
+        meta = p.with_suffix(".json")
+        info = json.loads(meta.read_text(encoding="utf-8")) if meta.exists() else {}
+        raw = p.read_bytes()
+        if b"<html" in raw[:2048].lower():
+            pages.append((info.get("url", p.name), str(raw, info.get("encoding") or "utf-8", errors="replace")))
+    return pages
+
+def synthetic_pages(n: int, seed: int):
+    rnd = random.Random(seed)
+    pages = [(f"item-{i}", item_page(rnd, i)) for i in range(n)]
+    pages.append(("topic", topic_page(rnd, 60)))
+    pages += [(f"case:{k}", f"<html><body>{v}</body></html>") for k, v in CORNER_CASES.items()]
+    return pages
+
+# --- run --------------------------------------------------------------------------
+
+def ways(link_prefix: str):
+    """name -> (item job, links job)"""
+    out = {"before (BeautifulSoup)": (old_parse_item, lambda h: old_topic_links(h, link_prefix))}
+    backends = ["html.parser"] + (["lxml"] if page_extract.etree is not None else [])
+    for b in backends:
+        out[f"after ({b})"] = (
+            lambda h, b=b: (lambda p: (p.title, p.image))(page_extract.extract(h, BASE, backend=b)),
+            lambda h, b=b: page_extract.extract(h, BASE, title=False, image=False, link_prefix=link_prefix, backend=b).links,
+        )
+    return out
+
+def best_of(fn, pages, rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        t = time.perf_counter()
+        for _name, html in pages:
+            fn(html)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=Path, default=None, help="Saved pages: .html files or an HTTP cache folder")
+    ap.add_argument("--n", type=int, default=200, help="Generated item pages (without --pages)")
+    ap.add_argument("--link-prefix", default=PREFIX)
+    ap.add_argument("--rounds", type=int, default=3, help="Timed rounds; the best one counts")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    pages = load_pages(args.pages) if args.pages else synthetic_pages(args.n, args.seed)
+    if not pages:
+        raise SystemExit(f"No pages in {args.pages}")
+    kib = sum(len(h) for _n, h in pages) / 1024
+    print(f"{len(pages)} pages, {kib:.0f} KiB of HTML ({'saved' if args.pages else 'generated'})")
+
+    jobs = ways(args.link_prefix)
+    before_item, before_links = jobs["before (BeautifulSoup)"]
+    expected = [(before_item(h), before_links(h)) for _n, h in pages]
+
+    ok = True
+    print(f"\n{'':<24}{'item ms/page':>14}{'links ms/page':>15}{'item x':>8}{'links x':>9}  parity")
+    base_item = base_links = None
+    for name, (item, links) in jobs.items():
+        bad = [(n, exp, (item(h), links(h))) for (n, h), exp in zip(pages, expected) if (item(h), links(h)) != exp]
+        t_item = best_of(item, pages, args.rounds) / len(pages) * 1000
+        t_links = best_of(links, pages, args.rounds) / len(pages) * 1000
+        base_item, base_links = base_item or t_item, base_links or t_links
+        print(f"{name:<24}{t_item:>14.3f}{t_links:>15.3f}{base_item / t_item:>8.1f}{base_links / t_links:>9.1f}  "
+              f"{'ok' if not bad else f'{len(bad)} page(s) differ'}")
+        for n, exp, got in bad[:5]:
+            print(f"    {n}: expected {exp[0]} / {len(exp[1])} links, got {got[0]} / {len(got[1])} links")
+        ok &= not bad
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
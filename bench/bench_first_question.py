@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+First-question latency of the web app on a throttled connection: the time
+from picking a service until the data is parsed and the first question's
+image has arrived.
+
+Compares:
+- before: data/<service>.json (pretty-printed), compressed on the fly when
+          --gzip is given (as GitHub Pages does)
+- after:  bundles/<service>.json (tools/publish_bundles.py); the precompressed
+          .gz sibling is sent when the client accepts gzip
+
+app/ is served from a local stand-in server that adds a round trip per
+request and caps the bandwidth (DevTools-like profiles). Page shell
+(index.html, app.js, styles.css) is the same for both and not counted.
+
+Run from repo root (publish the bundles first):
+  python3 tools/publish_bundles.py
+  python3 bench/bench_first_question.py --profile slow-3g fast-3g --gzip
+"""
+import argparse, gzip, http.client, json, threading, time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# (bytes per second, round trip seconds), roughly the Chrome DevTools presets
+PROFILES = {
+    "slow-3g": (400_000 / 8, 2.0),
+    "fast-3g": (1_600_000 / 8, 0.56),
+    "4g": (9_000_000 / 8, 0.17),
+}
+
+def make_handler(app_dir: Path, bps: float, rtt: float, gzip_on_the_fly: bool):
+    class Throttled(SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def __init__(self, *a, **kw):
+            super().__init__(*a, directory=str(app_dir), **kw)
+
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            time.sleep(rtt)
+            path = Path(self.translate_path(self.path))
+            if not path.is_file():
+                self.send_error(404)
+                return
+            body = path.read_bytes()
+            encoding = None
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                sibling = path.with_name(path.name + ".gz")
+                if sibling.is_file():
+                    body, encoding = sibling.read_bytes(), "gzip"
+                elif gzip_on_the_fly and path.suffix in (".json", ".js", ".css", ".html"):
+                    body, encoding = gzip.compress(body, 6), "gzip"
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(str(path)))
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            chunk = 1460
+            for i in range(0, len(body), chunk):
+                self.wfile.write(body[i:i + chunk])
+                time.sleep(chunk / bps)
+    return Throttled
+
+def get(port: int, path: str) -> tuple:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+    r = conn.getresponse()
+    body = r.read()
+    conn.close()
+    if r.status != 200:
+        raise RuntimeError(f"{path}: HTTP {r.status}")
+    wire = len(body)
+    if r.getheader("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return body, wire
+
+def first_question(port: int, data_url: str, service: str) -> dict:
+    t0 = time.perf_counter()
+    body, wire = get(port, data_url)
+    data = json.loads(body)
+    t_data = time.perf_counter() - t0
+    asset = data["questions"][0]["asset"]
+    _img, img_wire = get(port, f"/images/{service}/{asset}.jpg")
+    return {
+        "data_bytes": wire,
+        "data_s": round(t_data, 3),
+        "image_bytes": img_wire,
+        "first_question_s": round(time.perf_counter() - t0, 3),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default=str(ROOT / "app"))
+    ap.add_argument("--services", nargs="+", default=["landmacht", "luchtmacht", "marine"])
+    ap.add_argument("--profile", nargs="+", choices=sorted(PROFILES), default=["fast-3g"])
+    ap.add_argument("--gzip", action="store_true", help="Server compresses plain JSON on the fly (before)")
+    ap.add_argument("--json", default=None, help="Write the results here")
+    args = ap.parse_args()
+    app = Path(args.app)
+
+    results = []
+    for profile in args.profile:
+        bps, rtt = PROFILES[profile]
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(app, bps, rtt, args.gzip))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        try:
+            for service in args.services:
+                for mode, url in (("before", f"/data/{service}.json"), ("after", f"/bundles/{service}.json")):
+                    if not (app / url.lstrip("/")).exists():
+                        print(f"⚠️ Missing {url} (run tools/publish_bundles.py)")
+                        continue
+                    r = first_question(port, url, service)
+                    r.update(profile=profile, service=service, mode=mode)
+                    results.append(r)
+        finally:
+            server.shutdown()
+
+    print(f"{'profile':<9}{'service':<12}{'mode':<8}{'data KiB':>10}{'data s':>9}{'first q s':>11}")
+    for r in results:
+        print(f"{r['profile']:<9}{r['service']:<12}{r['mode']:<8}{r['data_bytes'] / 1024:>10.1f}"
+              f"{r['data_s']:>9}{r['first_question_s']:>11}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Checks that the committed outputs are what the build graph makes of the
+committed inputs: a fresh clone (no .cache, so every node runs) is built with
+build_data.py and must leave `git status` clean afterwards.
+
+Anything the build changes, adds or deletes is printed, with the diff stat,
+and the run exits with 1. Prints the wall time of the fresh build too.
+
+--working-tree checks the working tree instead of HEAD (tracked and untracked
+files, .gitignore respected), e.g. before committing regenerated outputs.
+
+Run from repo root:
+  python3 bench/bench_fresh_build.py
+  python3 bench/bench_fresh_build.py --working-tree
+"""
+import argparse, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+GIT_ID = ["-c", "user.name=bench", "-c", "user.email=bench@localhost"]
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+def snapshot(dst: Path, working_tree: bool) -> None:
+    subprocess.run(["git", "clone", "-q", "--no-hardlinks", str(ROOT), str(dst)], check=True)
+    if not working_tree:
+        return
+    wanted = set(git(ROOT, "ls-files", "-z", "-co", "--exclude-standard").split("\0")) - {""}
+    for name in set(git(dst, "ls-files", "-z").split("\0")) - {""} - wanted:
+        (dst / name).unlink()
+    for name in wanted:
+        src = ROOT / name
+        if src.is_file():
+            (dst / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst / name)
+        elif (dst / name).exists():  # tracked, but deleted in the working tree
+            (dst / name).unlink()
+    git(dst, "add", "-A")
+    git(dst, *GIT_ID, "commit", "-q", "--allow-empty", "-m", "working tree")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--working-tree", action="store_true", help="Check the working tree instead of HEAD")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        snapshot(repo, args.working_tree)
+        t = time.perf_counter()
+        r = subprocess.run([sys.executable, "build_data.py"], cwd=repo, capture_output=True, text=True)
+        wall = time.perf_counter() - t
+        if r.returncode:
+            print(r.stdout[-2000:], r.stderr[-2000:], sep="\n")
+            print(f"❌ build_data.py failed (exit {r.returncode})")
+            raise SystemExit(1)
+        print(r.stdout.strip().splitlines()[-1])
+        status = git(repo, "status", "--porcelain", "--untracked-files=all")
+        if not status:
+            print(f"✅ fresh build in {wall:.1f}s leaves the tree clean")
+            return
+        print(status.rstrip())
+        print(git(repo, "diff", "--stat").rstrip())
+        print(f"❌ fresh build in {wall:.1f}s changed {len(status.splitlines())} path(s): "
+              "commit the build output, or fix the node that writes them")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
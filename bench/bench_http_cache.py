@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Checks http_cache.HttpCache against a local HTTP stand-in (http.server):
+
+- revalidation: a first GET stores the body (200), the next one sends
+  If-None-Match (ETag) or If-Modified-Since (Last-Modified) and reuses the
+  stored body on a 304; a changed page comes back as a 200 with the new body
+- lazy body: a 304 does not read the stored body until .content is used
+- eviction: with a small max_bytes the least recently used entries go first
+- a body evicted after the 304 (before .content, or between reading the
+  metadata and the answer) counts as a miss: the page is fetched again
+  without conditional headers and the right bytes come back
+- encoding: an image is stored without running charset detection on its
+  body; another body without a declared charset is detected only when .text
+  is read
+
+Printed per check: ✔ or ❌ with what differed. Any failure exits with 1.
+
+Run from repo root:
+  python3 bench/bench_http_cache.py
+"""
+import json, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from http_cache import HttpCache, url_key  # noqa: E402
+
+DETECTED = []  # bodies charset detection ran on
+
+def _counting_apparent_encoding(self):
+    DETECTED.append(self.url)
+    return _apparent_encoding(self)
+
+_apparent_encoding = requests.Response.apparent_encoding.fget
+requests.Response.apparent_encoding = property(_counting_apparent_encoding)
+
+LAST_MODIFIED = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+class StandIn(BaseHTTPRequestHandler):
+    """/etag/<name> validates by ETag, /lm/<name> by Last-Modified, /plain/<name> not at all."""
+    protocol_version = "HTTP/1.1"
+    pages = {}     # path -> body; a new body is a new version
+    requests = []  # (path, If-None-Match, If-Modified-Since) per request
+
+    def log_message(self, *a):
+        pass
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        if body is None:
+            return self.send_error(404)
+        inm, ims = self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")
+        self.requests.append((self.path, inm, ims))
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+        lm = LAST_MODIFIED if body.startswith(b"v1") else "Thu, 02 Oct 2025 10:00:00 GMT"
+        if (self.path.startswith("/etag/") and inm == etag) or (self.path.startswith("/lm/") and ims == lm):
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path.endswith(".jpg"):
+            self.send_header("Content-Type", "image/jpeg")
+        elif self.path.endswith(".xml"):
+            self.send_header("Content-Type", "application/xml")
+        else:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path.startswith("/etag/"):
+            self.send_header("ETag", etag)
+        elif self.path.startswith("/lm/"):
+            self.send_header("Last-Modified", lm)
+        self.end_headers()
+        self.wfile.write(body)
+
+class EvictingSession:
+    """A session that removes the stored body while the request is in flight."""
+    def __init__(self, cache: HttpCache, url: str):
+        self.cache, self.url, self.armed = cache, url, True
+
+    def get(self, url, **kw):
+        if self.armed and url == self.url:
+            self.armed = False
+            (self.cache.dir / f"{url_key(url)}.body").unlink()
+        return requests.get(url, **kw)
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    pages, seen = StandIn.pages, StandIn.requests
+    failures = []
+
+    def check(name, ok, detail=""):
+        print(("✔ " if ok else "❌ ") + name + ("" if ok else f": {detail}"))
+        if not ok:
+            failures.append(name)
+
+    def last():
+        return seen[-1][1:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # --- revalidation ---------------------------------------------------
+        cache = HttpCache(Path(tmp) / "reval")
+        for kind, header in (("etag", 0), ("lm", 1)):
+            path = f"/{kind}/page"
+            pages[path] = b"v1 " + kind.encode() * 100
+            url = base + path
+            r1 = cache.get(url)
+            check(f"{kind}: first GET is a 200 without conditional headers",
+                  r1.status == 200 and not r1.not_modified and last() == (None, None) and r1.content == pages[path],
+                  f"status {r1.status}, headers {last()}")
+            r2 = cache.get(url)
+            check(f"{kind}: second GET is a 304 after {'If-None-Match' if header == 0 else 'If-Modified-Since'}",
+                  r2.status == 304 and r2.not_modified and last()[header] is not None,
+                  f"status {r2.status}, headers {last()}")
+            check(f"{kind}: 304 reads the stored body only when asked",
+                  r2._content is None and r2.content == pages[path] and r2.text == pages[path].decode())
+            pages[path] = b"v2 " + kind.encode() * 120
+            r3 = cache.get(url)
+            check(f"{kind}: changed page comes back as a 200 with the new body",
+                  r3.status == 200 and not r3.not_modified and r3.content == pages[path], f"status {r3.status}")
+            r4 = cache.get(url)
+            check(f"{kind}: the new body is what a following 304 gives",
+                  r4.not_modified and r4.content == pages[path], f"status {r4.status}")
+
+        pages["/plain/page"] = b"no validators"
+        cache.get(base + "/plain/page")
+        r = cache.get(base + "/plain/page")
+        check("no ETag/Last-Modified: nothing stored, always a 200",
+              r.status == 200 and last() == (None, None) and not (cache.dir / f"{url_key(base + '/plain/page')}.json").exists())
+
+        # --- body evicted after the 304 ----------------------------------------
+        url = base + "/etag/page"
+        r = cache.get(url)
+        (cache.dir / f"{url_key(url)}.body").unlink()
+        n = len(seen)
+        body = r.content
+        check("body evicted before .content: fetched again without conditional headers",
+              body == pages["/etag/page"] and len(seen) == n + 1 and last() == (None, None),
+              f"{len(seen) - n} request(s), headers {last()}")
+        check("…and stored again", cache.get(url).not_modified and last()[0] is not None)
+
+        n = len(seen)
+        r = cache.get(url, session=EvictingSession(cache, url))
+        check("body evicted while revalidating: 304 is treated as a miss",
+              r.status == 200 and r.content == pages["/etag/page"] and len(seen) == n + 2 and last() == (None, None),
+              f"status {r.status}, {len(seen) - n} request(s), headers {last()}")
+
+        # --- encoding -------------------------------------------------------------
+        pages["/etag/photo.jpg"] = b"v1\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+        url = base + "/etag/photo.jpg"
+        DETECTED.clear()
+        r = cache.get(url)
+        meta = json.loads((cache.dir / f"{url_key(url)}.json").read_text(encoding="utf-8"))
+        check("image: no charset detection on the body, stored without an encoding",
+              not DETECTED and r.encoding is None and meta["encoding"] is None and r.content == pages["/etag/photo.jpg"],
+              f"{len(DETECTED)} detection(s), encoding {r.encoding!r}, stored {meta['encoding']!r}")
+        pages["/etag/feed.xml"] = "v1 <t>café crème brûlée, déjà vu à la carte</t>".encode("utf-8") * 20
+        r = cache.get(base + "/etag/feed.xml")
+        before = r.encoding
+        check("no charset declared: detected only when .text is read",
+              before is None and r.text == pages["/etag/feed.xml"].decode() and r.encoding is not None,
+              f"encoding {before!r} before .text, {r.encoding!r} after")
+
+        # --- LRU eviction -------------------------------------------------------
+        size = 2000
+        for name in "abcd":
+            pages[f"/etag/{name}"] = b"v1" + name.encode() * size
+        probe = HttpCache(Path(tmp) / "probe")
+        probe.get(base + "/etag/a")
+        entry = probe.total_bytes()
+        cache = HttpCache(Path(tmp) / "lru", max_bytes=3 * entry)
+        for name in "abc":
+            cache.get(f"{base}/etag/{name}")
+            time.sleep(0.01)
+        cache.get(f"{base}/etag/a")  # a is now more recent than b
+        time.sleep(0.01)
+        cache.get(f"{base}/etag/d")  # over the limit: b goes
+        stored = {name for name in "abcd" if (cache.dir / f"{url_key(f'{base}/etag/{name}')}.body").exists()}
+        check("LRU: least recently used entry evicted, cache within max_bytes",
+              stored == {"a", "c", "d"} and cache.total_bytes() <= cache.max_bytes,
+              f"kept {sorted(stored)}, {cache.total_bytes()} of {cache.max_bytes} bytes")
+        r = cache.get(f"{base}/etag/b")
+        check("LRU: an evicted URL is a plain GET again", r.status == 200 and last() == (None, None))
+
+        cache.max_bytes = entry
+        removed = cache.evict()
+        check("LRU: a lowered max_bytes applies on evict()",
+              removed >= 2 and cache.total_bytes() <= entry, f"{removed} removed, {cache.total_bytes()} bytes left")
+
+    server.shutdown()
+    print(f"\n{len(failures)} check(s) failed" if failures else "\nall checks passed")
+    if failures:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
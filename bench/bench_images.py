@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scraper image stage on a folder of real-size photos.
+
+Compares:
+- before: full decode + ImageOps.fit on the main thread (the old resize_to)
+- after:  image_proc.fit_jpeg (JPEG draft-mode decode) in a process pool
+
+Each mode runs in its own subprocess so peak RSS is measured cleanly.
+
+Run from repo root:
+  python3 bench/bench_images.py --folder ~/photos --size 900x600
+"""
+import argparse, json, os, resource, subprocess, sys, time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+def old_resize_to(jpg_bytes: bytes, size):
+    from PIL import Image, ImageOps
+    im = Image.open(BytesIO(jpg_bytes)).convert("RGB")
+    im = ImageOps.exif_transpose(im)
+    im = ImageOps.fit(im, size, method=Image.Resampling.LANCZOS, centering=(0.5,0.5))
+    out = BytesIO()
+    im.save(out, "JPEG", quality=88, optimize=True, progressive=True)
+    return out.getvalue()
+
+def peak_rss_mb(who) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    kb = resource.getrusage(who).ru_maxrss
+    return round((kb / 1024 if sys.platform != "darwin" else kb / 1024 / 1024), 1)
+
+def run_mode(mode: str, files, size, workers: int) -> dict:
+    blobs = [p.read_bytes() for p in files]
+    t0 = time.perf_counter()
+    if mode == "before":
+        for b in blobs:
+            old_resize_to(b, size)
+    else:
+        from image_proc import fit_jpeg, image_pool
+        with image_pool(workers) as pool:
+            list(pool.map(fit_jpeg, blobs, [size] * len(blobs)))
+    dt = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "images": len(blobs),
+        "seconds": round(dt, 3),
+        "images_per_s": round(len(blobs) / dt, 2) if dt else None,
+        "peak_rss_mb_main": peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_rss_mb_worker": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folder", required=True, help="Folder with source JPEGs")
+    ap.add_argument("--size", default="900x600")
+    ap.add_argument("--workers", type=int, default=0, help="Pool size for 'after' (0 = one per core)")
+    ap.add_argument("--mode", choices=["before", "after"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    size = tuple(map(int, args.size.lower().split("x")))
+    files = sorted(p for p in Path(args.folder).rglob("*") if p.suffix.lower() in (".jpg", ".jpeg"))
+    if not files:
+        raise SystemExit(f"No JPEGs in {args.folder}")
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, files, size, args.workers)))
+        return
+
+    rows = []
+    for mode in ("before", "after"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--folder", args.folder, "--size", args.size,
+             "--workers", str(args.workers), "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(out))
+
+    print(f"{len(files)} images, output {args.size}, {os.cpu_count()} cores")
+    print(f"{'mode':<8}{'img/s':>10}{'seconds':>10}{'RSS main MB':>14}{'RSS worker MB':>16}")
+    for r in rows:
+        print(f"{r['mode']:<8}{r['images_per_s']:>10}{r['seconds']:>10}{r['peak_rss_mb_main']:>14}{r['peak_rss_mb_worker']:>16}")
+
+if __name__ == "__main__":
+    main()
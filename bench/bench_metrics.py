@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Checks scrape_metrics.percentile() against the nearest-rank definition: the
+smallest value with at least p% of the values at or below it. Covers the
+cases where p/100 * n is a whole number (p50 of an even count, p95 of 20, ...),
+which a round-half-to-even rank gets one position too high.
+
+Printed per check: ✔ or ❌ with what differed. Any failure exits with 1.
+
+Run from repo root:
+  python3 bench/bench_metrics.py
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scrape_metrics import percentile  # noqa: E402
+
+def nearest_rank(values, p: float):
+    n = len(values)
+    return next(v for i, v in enumerate(values, 1) if i * 100 >= p * n)
+
+def main():
+    failures = []
+
+    def check(name, got, want):
+        ok = got == want
+        print(("✔ " if ok else "❌ ") + name + ("" if ok else f": got {got}, want {want}"))
+        if not ok:
+            failures.append(name)
+
+    check("p50 of [1, 2]", percentile([1, 2], 50), 1)
+    check("p50 of 1..6", percentile(list(range(1, 7)), 50), 3)
+    check("p50 of 1..10", percentile(list(range(1, 11)), 50), 5)
+    check("p95 of 1..20", percentile(list(range(1, 21)), 95), 19)
+    check("p100 of 1..7", percentile(list(range(1, 8)), 100), 7)
+    check("p0 of 1..7", percentile(list(range(1, 8)), 0), 1)
+    check("empty list", percentile([], 50), 0.0)
+    wrong = [(n, p) for n in range(1, 101) for p in (1, 5, 10, 25, 50, 75, 90, 95, 99, 100)
+             if percentile(list(range(1, n + 1)), p) != nearest_rank(list(range(1, n + 1)), p)]
+    check("n = 1..100, p in 1..100: same as the definition", wrong[:5], [])
+
+    print(f"\n{len(failures)} check(s) failed" if failures else "\nall checks passed")
+    if failures:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Scaling of the near-duplicate search in tools/find_near_duplicates.py on
+synthetic 64-bit hashes: random hashes plus planted pairs a few bits apart.
+Checks that every planted pair is found.
+
+Run from repo root:
+  python3 bench/bench_near_duplicates.py --n 10000 50000 100000
+"""
+import argparse, resource, sys, time
+from pathlib import Path
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from find_near_duplicates import near_pairs  # noqa: E402
+
+def synthetic(n: int, planted: int, bits: int, rng) -> tuple:
+    h = rng.integers(0, 2**63, size=n, dtype=np.uint64) * 2 + rng.integers(0, 2, size=n, dtype=np.uint64)
+    src = rng.choice(n, size=planted, replace=False)
+    dst = (src + n // 2) % n
+    for s, d in zip(src, dst):
+        flip = rng.choice(64, size=bits, replace=False)
+        h[d] = h[s] ^ np.uint64(sum(1 << int(b) for b in flip))
+    return h, {(min(a, b), max(a, b)) for a, b in zip(src.tolist(), dst.tolist())}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, nargs="+", default=[10000, 50000, 100000])
+    ap.add_argument("--threshold", type=int, default=10)
+    ap.add_argument("--planted", type=int, default=100)
+    args = ap.parse_args()
+    rng = np.random.default_rng(1)
+
+    print(f"{'images':>8}{'seconds':>10}{'pairs/s (M)':>14}{'found':>8}{'planted':>9}")
+    for n in args.n:
+        h, planted = synthetic(n, args.planted, args.threshold // 2, rng)
+        t0 = time.perf_counter()
+        ii, jj, _dd = near_pairs(h, args.threshold)
+        dt = time.perf_counter() - t0
+        found = set(zip(ii.tolist(), jj.tolist()))
+        hit = len(planted & found)
+        print(f"{n:>8}{dt:>10.2f}{n * (n - 1) / 2 / dt / 1e6:>14.0f}{hit:>8}{len(planted):>9}")
+        if hit != len(planted):
+            sys.exit("❌ planted pairs missed")
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data tools on synthetic datasets of growing size.
+
+Per size (questions per service) a scratch tree is generated: app/data/*.json
+with synthetic names, one tiny JPEG per landmacht question, a classification
+workbook with one row per landmacht question, and a copy of the repo's
+scripts (apply_step1_categories.py finds its data relative to itself). Each
+tool then runs in its own process on that tree, in pipeline order:
+
+  sync        tools/sync_datajson_from_images.py --services landmacht
+  classify    tools/apply_classifications.py --xlsx bench.xlsx
+  step1       tools/apply_step1_categories.py                   (all three services)
+  reclassify  tools/reclassify_nato_air_navy_and_make_theory.py (luchtmacht + marine)
+  scrape-air  build_luchtmacht_offline.py --base <stand-in>
+  scrape-navy build_marine_offline.py --base <stand-in>
+
+The scrapers crawl a local HTTP stand-in that serves fake defensie.nl topic
+pages, item pages and photos (at most --scrape-max items, no HTTP cache, no
+variants). Recorded per tool: wall time, peak RSS of the tool's main
+process (VmHWM) and items per second. Results go to bench/results/suite-<commit>.json;
+--compare prints the change against an earlier file.
+
+--jobs 1 2 4 runs step1 and reclassify once per worker count (their --jobs),
+each time on the same input (app/data, app/theory and .cache are restored in
+between), and checks that every run writes the same bytes as the first.
+
+Run from repo root:
+  python3 bench/bench_suite.py --sizes 1k 100k 1M
+  python3 bench/bench_suite.py --sizes 1k --tools sync step1 --compare bench/results/suite-abc1234.json
+  python3 bench/bench_suite.py --sizes 100k --tools step1 reclassify --jobs 1 2 4
+"""
+import argparse, hashlib, io, json, os, platform, random, shutil, subprocess, sys, tempfile, threading, time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from openpyxl import Workbook
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scrape_engine import SERVICES as SCRAPE_SERVICES  # noqa: E402
+
+PY = sys.executable
+TOOLS = ("sync", "classify", "step1", "reclassify", "scrape-air", "scrape-navy")
+SERVICES = ("landmacht", "luchtmacht", "marine")
+JOBS_TOOLS = ("step1", "reclassify")   # tools with a --jobs option
+STATE_DIRS = ("app/data", "app/theory", ".cache")
+
+# words the classifiers react to, so the rule engines do real work
+WORDS = {
+    "landmacht": ["Leopard 2 gevechtstank", "Boxer pantserwielvoertuig", "Fennek verkenningsvoertuig",
+                  "CV90 infanteriegevechtsvoertuig", "DAF vrachtwagen", "Pantserhouwitser", "Scania transportvoertuig",
+                  "Bushmaster", "Mercedes terreinwagen", "Explosievenrobot"],
+    "luchtmacht": ["F-35 jachtvliegtuig", "Apache gevechtshelikopter", "Chinook transporthelikopter",
+                   "C-130 Hercules transportvliegtuig", "MQ-9 Reaper", "Pilatus PC-7 trainer", "Raven onbemand systeem"],
+    "marine": ["Luchtverdedigingsfregat", "Onderzeeboot", "Patrouilleschip", "Amfibisch transportschip",
+               "Mijnenjager", "Combat Support Ship", "Sleepboot", "Hydrografisch vaartuig"],
+}
+
+def parse_size(s: str) -> int:
+    s = s.lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1], 1)
+    return int(float(s.rstrip("km")) * mult)
+
+def jpeg_bytes(size, quality=80) -> bytes:
+    im = Image.linear_gradient("L").resize(size).convert("RGB")
+    out = io.BytesIO()
+    im.save(out, "JPEG", quality=quality)
+    return out.getvalue()
+
+def synthetic_name(service: str, i: int, rnd: random.Random) -> str:
+    return f"{rnd.choice(WORDS[service])} {i}"
+
+def slug(s: str) -> str:
+    return "".join(c if c.isalnum() else "-" for c in s.lower()).strip("-")
+
+# --- scratch tree -------------------------------------------------------------
+
+def stage_scripts(work: Path) -> None:
+    for p in list(ROOT.glob("*.py")) + list((ROOT / "tools").glob("*.py")):
+        dst = work / p.relative_to(ROOT)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(p, dst)
+
+def generate(work: Path, n: int, seed: int = 1) -> None:
+    rnd = random.Random(seed)
+    data_dir = work / "app" / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(ROOT / "app" / "data" / "classification_options.json", data_dir)
+    for service in SERVICES:
+        template = json.loads((ROOT / "app" / "data" / f"{service}.json").read_text(encoding="utf-8"))
+        prefix = {"landmacht": "lm", "luchtmacht": "af", "marine": "nav"}[service]
+        questions = []
+        for i in range(n):
+            name = synthetic_name(service, i, rnd)
+            asset = slug(name)
+            questions.append({"id": f"{prefix}_{asset}_{i + 1}", "asset": asset, "class": "UNKNOWN",
+                              "answer": name, "aliases": [name.lower()]})
+        template["questions"] = questions
+        (data_dir / f"{service}.json").write_text(json.dumps(template, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # landmacht photos (sync) and the workbook (classify)
+    img_dir = work / "app" / "images" / "landmacht"
+    img_dir.mkdir(parents=True, exist_ok=True)
+    blob = jpeg_bytes((32, 24))
+    data = json.loads((data_dir / "landmacht.json").read_text(encoding="utf-8"))
+    for q in data["questions"]:
+        (img_dir / f"{q['asset']}.jpg").write_bytes(blob)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("landmacht")
+    ws.append(["asset", "answer", "class"])
+    classes = data.get("vehicleClasses") or ["Unarmoured Vehicle"]
+    for q in data["questions"]:
+        ws.append([q["asset"], q["answer"], rnd.choice(classes)])
+    wb.save(work / "bench.xlsx")
+
+# --- defensie.nl stand-in -----------------------------------------------------
+
+def make_handler(n_items: int, photo: bytes):
+    routes = {cfg.topic: cfg for cfg in SCRAPE_SERVICES.values()}
+    prefixes = {cfg.link_prefix: cfg for cfg in SCRAPE_SERVICES.values()}
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def send(self, body: bytes, ctype: str):
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path.startswith("/binaries/large/"):
+                return self.send(photo, "image/jpeg")
+            if path in routes:
+                cfg = routes[path]
+                links = "".join(f'<li><a href="{cfg.link_prefix}item-{i}">Item {i}</a></li>' for i in range(n_items))
+                return self.send(f"<html><body><nav><a href='/'>Home</a></nav><ul>{links}</ul></body></html>".encode(), "text/html")
+            for prefix, cfg in prefixes.items():
+                if path.startswith(prefix):
+                    i = int(path.rsplit("-", 1)[-1])
+                    name = synthetic_name(cfg.service, i, random.Random(i))
+                    body = (f"<html><head><title>{name}</title></head><body><header><nav>Defensie</nav></header>"
+                            f"<main><h1>{name}</h1><p>{'Lorem ipsum dolor sit amet. ' * 40}</p>"
+                            f'<img src="/binaries/large/{cfg.service}/{i}.jpg" alt=""></main>'
+                            f"<footer>{'<a href=/x>link</a>' * 50}</footer></body></html>")
+                    return self.send(body.encode(), "text/html")
+            self.send_error(404)
+
+    return StandIn
+
+# --- runs ---------------------------------------------------------------------
+
+def commands(n: int, base: str, n_scrape: int) -> dict:
+    scrape = ["--base", base, "--no-cache", "--no-variants"]
+    return {
+        "sync": ([PY, "tools/sync_datajson_from_images.py", "--services", "landmacht"], n),
+        "classify": ([PY, "tools/apply_classifications.py", "--xlsx", "bench.xlsx"], n),
+        "step1": ([PY, "tools/apply_step1_categories.py"], 3 * n),
+        "reclassify": ([PY, "tools/reclassify_nato_air_navy_and_make_theory.py"], 2 * n),
+        "scrape-air": ([PY, "build_luchtmacht_offline.py", *scrape], n_scrape),
+        "scrape-navy": ([PY, "build_marine_offline.py", *scrape], n_scrape),
+    }
+
+# Runs the tool script in-process and writes its peak RSS to argv[1]. ru_maxrss from wait4 would
+# not do: it keeps the RSS the forked child had before exec, i.e. this (much larger) process.
+PEAK_RUNNER = """
+import os, runpy, sys
+out, script = sys.argv[1], sys.argv[2]
+sys.argv = sys.argv[2:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+def peak_kib():
+    try:
+        with open("/proc/self/status") as f:
+            return int(next(l for l in f if l.startswith("VmHWM:")).split()[1])
+    except OSError:
+        import resource
+        r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return r // 1024 if sys.platform == "darwin" else r
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    with open(out, "w") as f:
+        f.write(str(peak_kib()))
+"""
+
+def run(cmd, cwd: Path, log) -> dict:
+    """cmd is [python, script, *args]; peak RSS is the tool's main process (not its pool workers)."""
+    peak_file = cwd / ".peak"
+    peak_file.unlink(missing_ok=True)
+    t0 = time.perf_counter()
+    rc = subprocess.call([cmd[0], "-c", PEAK_RUNNER, str(peak_file), *cmd[1:]], cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+    wall = time.perf_counter() - t0
+    peak = int(peak_file.read_text()) / 1024 if peak_file.exists() else None
+    return {"wall_s": round(wall, 3), "peak_rss_mb": peak and round(peak, 1), "returncode": rc}
+
+def snapshot(work: Path, dst: Path) -> None:
+    shutil.rmtree(dst, ignore_errors=True)
+    for d in STATE_DIRS:
+        if (work / d).exists():
+            shutil.copytree(work / d, dst / d)
+
+def restore(work: Path, src: Path) -> None:
+    for d in STATE_DIRS:
+        shutil.rmtree(work / d, ignore_errors=True)
+        if (src / d).exists():
+            shutil.copytree(src / d, work / d)
+
+def outputs_digest(work: Path) -> str:
+    h = hashlib.sha1()
+    for d in ("app/data", "app/theory"):
+        for p in sorted((work / d).glob("*.json")):
+            h.update(p.name.encode("utf-8") + b"\0" + p.read_bytes())
+    return h.hexdigest()[:12]
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=ROOT).returncode != 0
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, old_path: Path) -> None:
+    old = {(r["tool"], r["size"], r.get("jobs", 1)): r
+           for r in json.loads(old_path.read_text(encoding="utf-8"))["results"]}
+    print(f"\nvs {old_path}:")
+    print(f"{'tool':<12}{'size':>9}{'jobs':>5}{'wall s':>10}{'was':>10}{'Δ':>8}{'peak MB':>10}{'was':>10}")
+    for r in results:
+        o = old.get((r["tool"], r["size"], r.get("jobs", 1)))
+        if not o:
+            continue
+        delta = (r["wall_s"] / o["wall_s"] - 1) * 100 if o["wall_s"] else 0
+        print(f"{r['tool']:<12}{r['size']:>9}{r.get('jobs', 1):>5}{r['wall_s']:>10}{o['wall_s']:>10}{delta:>+7.0f}%"
+              f"{r['peak_rss_mb']:>10}{o['peak_rss_mb']:>10}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", nargs="+", default=["1k", "100k", "1M"], help="Questions per service (1k, 100k, 1M, ...)")
+    ap.add_argument("--tools", nargs="+", choices=TOOLS, default=list(TOOLS))
+    ap.add_argument("--scrape-max", type=int, default=2000, help="Cap on items served to the scrapers")
+    ap.add_argument("--workdir", default=None, help="Where the scratch trees go (default: system temp)")
+    ap.add_argument("--keep", action="store_true", help="Keep the scratch trees")
+    ap.add_argument("--out", default=None, help="Results JSON (default: bench/results/suite-<commit>.json)")
+    ap.add_argument("--compare", default=None, help="Earlier results JSON to compare with")
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1], help="Worker counts for step1/reclassify (0 = one per core)")
+    args = ap.parse_args()
+
+    commit = git_commit()
+    out = Path(args.out or ROOT / "bench" / "results" / f"suite-{commit}.json")
+    photo = jpeg_bytes((1200, 800))
+    results = []
+    if args.workdir:
+        Path(args.workdir).mkdir(parents=True, exist_ok=True)
+    for size in map(parse_size, args.sizes):
+        work = Path(tempfile.mkdtemp(prefix=f"bench-suite-{size}-", dir=args.workdir))
+        n_scrape = min(size, args.scrape_max)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(n_scrape, photo))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            t0 = time.perf_counter()
+            stage_scripts(work)
+            generate(work, size)
+            print(f"[{size}] scratch tree in {time.perf_counter() - t0:.1f}s: {work}")
+            cmds = commands(size, f"http://127.0.0.1:{server.server_address[1]}", n_scrape)
+            with open(work / "bench.log", "w", encoding="utf-8") as log:
+                for tool in args.tools:
+                    cmd, items = cmds[tool]
+                    jobs = args.jobs if tool in JOBS_TOOLS else [None]
+                    if len(jobs) > 1:
+                        snapshot(work, work.parent / f"{work.name}.before")
+                    first = None
+                    for j in jobs:
+                        if first is not None:
+                            restore(work, work.parent / f"{work.name}.before")
+                        run_cmd = cmd + (["--jobs", str(j)] if j is not None else [])
+                        log.write(f"\n$ {' '.join(run_cmd)}\n")
+                        log.flush()
+                        r = run(run_cmd, work, log)
+                        r.update(tool=tool, size=size, items=items,
+                                 items_per_s=round(items / r["wall_s"], 1) if r["wall_s"] else None)
+                        label = tool
+                        if j is not None:
+                            r.update(jobs=j, outputs=outputs_digest(work))
+                            first = first or r
+                            r["speedup"] = round(first["wall_s"] / r["wall_s"], 2) if r["wall_s"] else None
+                            r["same_output"] = r["outputs"] == first["outputs"]
+                            label = f"{tool} -j{j}"
+                        results.append(r)
+                        flag = "" if r["returncode"] == 0 else f"  ❌ exit {r['returncode']} (see {work / 'bench.log'})"
+                        if j is not None and not r["same_output"]:
+                            flag += "  ❌ output differs from the first run"
+                        extra = f"  x{r['speedup']:.2f}" if j is not None and len(jobs) > 1 else ""
+                        print(f"[{size}] {label:<16}{r['wall_s']:>9.2f}s {r['peak_rss_mb'] or 0:>8.1f} MB "
+                              f"{r['items_per_s'] or 0:>12.0f} items/s{extra}{flag}")
+                    if len(jobs) > 1:
+                        shutil.rmtree(work.parent / f"{work.name}.before", ignore_errors=True)
+        finally:
+            server.shutdown()
+            if not args.keep and all(r["returncode"] == 0 for r in results if r["size"] == size):
+                shutil.rmtree(work, ignore_errors=True)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpu",
+        "results": results,
+    }, indent=2), encoding="utf-8")
+    print("Results ->", out)
+    if args.compare:
+        compare(results, Path(args.compare))
+
+if __name__ == "__main__":
+    main()
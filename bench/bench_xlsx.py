@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Memory and time of the spreadsheet import in tools/apply_classifications.py
+on a generated master workbook (one sheet per service).
+
+Compares:
+- before: the old load_xlsx, a full load_workbook() per service run
+          (reading that service's sheet instead of the active one)
+- after:  apply_classifications.load_xlsx, one read-only pass over all sheets
+
+Each mode runs in its own subprocess so peak RSS is measured cleanly. Both
+must return the same mappings.
+
+Run from repo root:
+  python3 bench/bench_xlsx.py --rows 100000
+"""
+import argparse, hashlib, json, resource, subprocess, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+
+def make_workbook(path: Path, rows: int) -> None:
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    per_sheet = rows // len(SERVICES)
+    for service in SERVICES:
+        ws = wb.create_sheet(service)
+        ws.append(["asset", "answer", "class"])
+        for i in range(per_sheet):
+            ws.append([f"{service}-asset-{i}", f"{service.title()} item {i}", f"Class {i % 7}"])
+    wb.save(path)
+
+def old_load_sheet(path: Path, title: str):
+    # the old load_xlsx, verbatim apart from wb[title] instead of wb.active
+    from openpyxl import load_workbook
+    wb = load_workbook(path)
+    ws = wb[title]
+    headers = [c.value for c in ws[1]]
+    idx = {h:i for i,h in enumerate(headers)}
+    rows = []
+    for r in ws.iter_rows(min_row=2, values_only=True):
+        asset = (r[idx["asset"]] or "").strip()
+        if not asset:
+            continue
+        answer = (r[idx["answer"]] or "").strip()
+        klass = (r[idx["class"]] or "").strip()
+        rows.append((asset, answer, klass))
+    return rows
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((kb / 1024 if sys.platform != "darwin" else kb / 1024 / 1024), 1)
+
+def digest(sheets: dict) -> str:
+    return hashlib.sha1(json.dumps(sheets, sort_keys=True).encode()).hexdigest()[:12]
+
+def run_mode(mode: str, path: Path) -> dict:
+    t0 = time.perf_counter()
+    if mode == "before":
+        sheets = {s: {a: [ans, k] for a, ans, k in old_load_sheet(path, s)} for s in SERVICES}
+    else:
+        from apply_classifications import load_xlsx
+        sheets = {s: {a: list(v) for a, v in m.items()} for s, m in load_xlsx(path).items()}
+    dt = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "rows": sum(len(m) for m in sheets.values()),
+        "seconds": round(dt, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "digest": digest(sheets),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100000, help="Total rows over all sheets")
+    ap.add_argument("--xlsx", default=None, help="Use/keep the generated workbook here")
+    ap.add_argument("--mode", choices=["before", "after"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, Path(args.xlsx))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.xlsx or Path(tmp) / "master.xlsx")
+        if not path.exists():
+            t0 = time.perf_counter()
+            make_workbook(path, args.rows)
+            print(f"Generated {path} ({path.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - t0:.1f}s")
+
+        rows = []
+        for mode in ("before", "after"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--xlsx", str(path), "--mode", mode],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            rows.append(json.loads(out))
+
+    print(f"{'mode':<8}{'rows':>10}{'seconds':>10}{'peak RSS MB':>14}")
+    for r in rows:
+        print(f"{r['mode']:<8}{r['rows']:>10}{r['seconds']:>10}{r['peak_rss_mb']:>14}")
+    if rows[0]["digest"] != rows[1]["digest"]:
+        print("❌ before/after mappings differ")
+        sys.exit(1)
+    print("✅ identical mappings")
+
+if __name__ == "__main__":
+    main()
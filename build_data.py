@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Build the app datasets as one dependency-tracked graph (see build_graph.py)
+instead of running the tools by hand in sequence.
+
+Per service, in this order, on app/data/<service>.json:
+  scrape      scrape_engine.py                        (luchtmacht, marine; only with --scrape)
+  sync        tools/sync_datajson_from_images.py      (landmacht: app/images/landmacht/*.jpg, stops on invalid images)
+  classify    tools/apply_classifications.py          (when the workbook has a sheet for it)
+  step1       tools/apply_step1_categories.py
+  reclassify  tools/reclassify_nato_air_navy_and_make_theory.py (luchtmacht, marine)
+  aliases     tools/build_answer_index.py             (alias variants for typed/spoken answers)
+  distractors tools/build_distractors.py              (ranked look-alike names for the naming step)
+  variants    image_variants.py                       (smaller widths as AVIF/WebP/JPEG for <picture> srcset)
+  lqip        image_placeholders.py                   (tiny base64 previews on the questions)
+  publish     tools/publish_bundles.py                 (app/bundles/<service>.json + .gz/.br)
+  deltas      tools/publish_deltas.py                  (new bundle version + patch from the last one)
+then one step1-report node that merges the per-service step-1 reports into
+tools/apply_step1_categories_report.json, and one assets node
+(tools/publish_assets.py) that content-hashes every JSON file into
+app/assets/ and writes app/manifest.json.
+
+Only stale nodes run; the three services run in parallel. State is kept in
+.cache/build/state.json.
+
+Run from repo root:
+  python3 build_data.py                 # rebuild what changed
+  python3 build_data.py --dry-run       # list stale nodes
+  python3 build_data.py --scrape        # also re-scrape luchtmacht + marine
+  python3 build_data.py --services marine --force
+  python3 bench/bench_fresh_build.py    # a fresh build reproduces the committed outputs
+"""
+import argparse, json, sys, time
+from pathlib import Path
+from openpyxl import load_workbook
+
+from build_graph import BuildGraph, Node, exit_code, print_report
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from jsonio import dumps, write_if_changed  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent
+SERVICES = ("landmacht", "luchtmacht", "marine")
+SCRAPED = ("luchtmacht", "marine")
+RECLASSIFIED = ("luchtmacht", "marine")
+XLSX = "spreadsheets/vehicle_classification_template_filled.xlsx"
+STATE = ".cache/build/state.json"
+STEP1_REPORT = "tools/apply_step1_categories_report.json"
+PY = sys.executable
+
+SCRAPER_SOURCES = ["scrape_engine.py", "scrape_pipeline.py", "scrape_journal.py", "scrape_metrics.py",
+                   "page_extract.py", "http_cache.py", "image_proc.py", "image_store.py", "image_variants.py"]
+
+def step1_report_path(service: str) -> str:
+    return f".cache/build/step1/{service}.json"
+
+def merge_step1_reports() -> None:
+    """Concatenate the per-service reports in service order, as one full run would write them."""
+    report = {"updated": [], "already_ok": [], "invalid_fixed": [], "low_confidence": []}
+    for service in SERVICES:
+        p = ROOT / step1_report_path(service)
+        if not p.exists():
+            continue
+        part = json.loads(p.read_text(encoding="utf-8"))
+        for k in report:
+            report[k] += part.get(k, [])
+    write_if_changed(ROOT / STEP1_REPORT, dumps(report))
+
+def sheet_for(xlsx: str):
+    """service -> sheet title; a workbook without service sheets is the landmacht template."""
+    path = ROOT / xlsx
+    if not path.exists():
+        return {}
+    wb = load_workbook(path, read_only=True)
+    try:
+        by_name = {t.strip().lower(): t for t in wb.sheetnames}
+        found = {s: by_name[s] for s in SERVICES if s in by_name}
+        return found or {"landmacht": wb.active.title}
+    finally:
+        wb.close()
+
+def pipeline(services, xlsx: str = XLSX, scrape: bool = False):
+    nodes = []
+    sheets = sheet_for(xlsx)
+    for s in services:
+        data = f"app/data/{s}.json"
+        images = f"app/images/{s}/*.jpg"
+
+        if scrape and s in SCRAPED:
+            nodes.append(Node(
+                f"scrape:{s}",
+                [PY, "scrape_engine.py", "--services", s],
+                inputs=SCRAPER_SOURCES,
+                outputs=[data, images],
+                always=True,  # the remote site is an input we cannot hash
+            ))
+
+        if s == "landmacht":
+            nodes.append(Node(
+                f"sync:{s}",
+                [PY, "tools/sync_datajson_from_images.py", "--services", s, "--strict"],
+                inputs=["tools/sync_datajson_from_images.py", "tools/image_index.py", "tools/dataset.py", "tools/jsonio.py",
+                        images, data],
+                outputs=[data],
+            ))
+
+        if s in sheets:
+            nodes.append(Node(
+                f"classify:{s}",
+                [PY, "tools/apply_classifications.py", "--xlsx", xlsx, "--data", data],
+                inputs=["tools/apply_classifications.py", "tools/dataset.py", "tools/jsonio.py", xlsx, data],
+                outputs=[data],
+            ))
+
+        nodes.append(Node(
+            f"step1:{s}",
+            [PY, "tools/apply_step1_categories.py", "--services", s, "--report", step1_report_path(s)],
+            inputs=["tools/apply_step1_categories.py", "tools/classify_rules.py", "tools/dataset.py",
+                    "tools/json_stream.py", "tools/jsonio.py", "app/data/classification_options.json", data],
+            outputs=[data, step1_report_path(s)],
+        ))
+
+        if s in RECLASSIFIED:
+            nodes.append(Node(
+                f"reclassify:{s}",
+                [PY, "tools/reclassify_nato_air_navy_and_make_theory.py", "--services", s,
+                 "--state", f".cache/build/reclassify/{s}.json"],
+                inputs=["tools/reclassify_nato_air_navy_and_make_theory.py", "tools/classify_rules.py",
+                        "tools/dataset.py", "tools/jsonio.py", data],
+                outputs=[data, f"app/theory/{s}.json"],
+            ))
+
+        nodes.append(Node(
+            f"aliases:{s}",
+            [PY, "tools/build_answer_index.py", "--services", s],
+            inputs=["tools/build_answer_index.py", "tools/dataset.py", "tools/jsonio.py", data],
+            outputs=[data],
+        ))
+
+        nodes.append(Node(
+            f"distractors:{s}",
+            [PY, "tools/build_distractors.py", "--services", s],
+            inputs=["tools/build_distractors.py", "tools/build_answer_index.py", "tools/dataset.py",
+                    "tools/jsonio.py", data],
+            outputs=[data],
+        ))
+
+        nodes.append(Node(
+            f"variants:{s}",
+            [PY, "image_variants.py", "--services", s],  # pinned formats: image_variants.FORMATS
+            inputs=["image_variants.py", "image_proc.py", "tools/dataset.py", "tools/jsonio.py", images, data],
+            outputs=[data, f"app/images/{s}/variants/*"],
+        ))
+
+        nodes.append(Node(
+            f"lqip:{s}",
+            [PY, "image_placeholders.py", "--services", s],
+            inputs=["image_placeholders.py", "image_proc.py", "tools/dataset.py", "tools/jsonio.py", images, data],
+            outputs=[data],
+        ))
+
+        nodes.append(Node(
+            f"publish:{s}",
+            [PY, "tools/publish_bundles.py", "--services", s],
+            inputs=["tools/publish_bundles.py", "tools/build_answer_index.py", "tools/dataset.py", "tools/jsonio.py", data,
+                    f"app/theory/{s}.json", f"app/theory/{s}_step1_what.json"],
+            outputs=[f"app/bundles/{s}.json*"],
+        ))
+
+        nodes.append(Node(
+            f"deltas:{s}",
+            [PY, "tools/publish_deltas.py", "--services", s],
+            inputs=["tools/publish_deltas.py", "tools/publish_assets.py", "tools/jsonio.py", f"app/bundles/{s}.json*"],
+            outputs=[f"app/deltas/{s}/*"],
+        ))
+
+    nodes.append(Node(
+        "step1-report",
+        merge_step1_reports,
+        inputs=[step1_report_path(s) for s in SERVICES],
+        outputs=[STEP1_REPORT],
+    ))
+
+    nodes.append(Node(
+        "assets",
+        [PY, "tools/publish_assets.py"],
+        # the per-service paths tie this node to the service nodes; the globs catch the rest
+        inputs=["tools/publish_assets.py", "tools/jsonio.py"]
+               + [p for s in services for p in (f"app/data/{s}.json", f"app/bundles/{s}.json*", f"app/deltas/{s}/*")]
+               + ["app/data/*.json", "app/theory/*.json"],
+        outputs=["app/manifest.json", "app/assets/**/*"],
+    ))
+    return nodes
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--xlsx", default=XLSX, help="Classification workbook (one sheet per service, or the landmacht template)")
+    ap.add_argument("--scrape", action="store_true", help="Re-scrape luchtmacht + marine first (network)")
+    ap.add_argument("--jobs", type=int, default=0, help="Nodes run at the same time (0 = one per core)")
+    ap.add_argument("--force", action="store_true", help="Rebuild every node")
+    ap.add_argument("--dry-run", action="store_true", help="Only list the nodes that would run")
+    ap.add_argument("--report", default=None, help="Write per-node status and timing as JSON here")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Print each tool's output")
+    args = ap.parse_args()
+
+    nodes = pipeline(args.services, args.xlsx, args.scrape)
+    graph = BuildGraph(nodes, ROOT, ROOT / STATE, jobs=args.jobs, verbose=args.verbose)
+    t0 = time.perf_counter()
+    results = graph.run(force=args.force, dry_run=args.dry_run)
+    wall = time.perf_counter() - t0
+    print_report(results, wall)
+
+    if args.report:
+        Path(args.report).write_text(json.dumps({
+            "wall_seconds": round(wall, 3),
+            "nodes": [{"name": r.name, "status": r.status, "seconds": round(r.seconds, 3), "reason": r.reason}
+                      for r in results],
+        }, indent=2), encoding="utf-8")
+    sys.exit(exit_code(results))
+
+if __name__ == "__main__":
+    main()
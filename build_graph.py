@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+A small make-like build graph: nodes with declared inputs and outputs,
+content hashes instead of timestamps, only stale nodes rerun, independent
+nodes run in parallel.
+
+A Node is an argv (run as a subprocess from the root) or a Python callable.
+Inputs/outputs are paths relative to the root; an entry with * or ? is a glob
+and hashes all files it matches. Dependencies follow from the paths, in
+declaration order: a node that reads a path waits for the last node declared
+before it that writes it; a node that writes a path waits for everything
+declared before it that touched it. So steps that rewrite the same file in
+place (app/data/<service>.json) run in the order they are declared.
+
+A node reruns when
+- its key changed: its command and the hash of every input, where an input
+  written by an earlier node counts as that node's output hash (so a node
+  that reruns but writes identical bytes does not wake up its dependents),
+- one of its outputs was changed or deleted outside the build,
+- it is marked always=True (e.g. a network scrape), or force is set.
+
+Hashes, keys and a stat cache (size, mtime) live in one JSON state file, so
+unchanged files are not re-read. See build_data.py for the data pipeline.
+"""
+import glob, hashlib, json, os, subprocess, threading, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+@dataclass
+class Node:
+    name: str
+    run: Union[Sequence[str], Callable[[], None]]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    always: bool = False
+
+    def describe(self) -> str:
+        if callable(self.run):
+            return f"{self.run.__module__}.{self.run.__qualname__}"
+        return " ".join(self.run)
+
+@dataclass
+class Result:
+    name: str
+    status: str            # "ran", "fresh", "failed", "blocked", "stale" (dry run)
+    seconds: float = 0.0
+    reason: str = ""
+    output: str = ""
+
+def _is_glob(entry: str) -> bool:
+    return any(c in entry for c in "*?[")
+
+class _Hasher:
+    """sha1 per file, cached on (size, mtime_ns) across builds."""
+    def __init__(self, root: Path, cache: Dict[str, list]):
+        self.root = root
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def file(self, rel: str) -> Optional[str]:
+        p = self.root / rel
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            return None
+        sig = [st.st_size, st.st_mtime_ns]
+        with self.lock:
+            hit = self.cache.get(rel)
+        if hit and hit[:2] == sig:
+            return hit[2]
+        h = hashlib.sha1()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self.lock:
+            self.cache[rel] = sig + [digest]
+        return digest
+
+    def entry(self, entry: str) -> Optional[str]:
+        if not _is_glob(entry):
+            return self.file(entry)
+        h = hashlib.sha1()
+        for p in sorted(glob.glob(str(self.root / entry), recursive=True)):
+            if os.path.isfile(p):
+                rel = os.path.relpath(p, self.root)
+                h.update(f"{rel}\0{self.file(rel)}\n".encode())
+        return h.hexdigest()
+
+class BuildGraph:
+    def __init__(self, nodes: List[Node], root: Path, state_path: Path, jobs: int = 0, verbose: bool = False):
+        names = [n.name for n in nodes]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate node names")
+        self.nodes = nodes
+        self.root = Path(root)
+        self.state_path = Path(state_path)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.verbose = verbose
+        self.print_lock = threading.Lock()
+
+        # deps[name] = earlier nodes it must wait for; producer[(name, path)] = node whose output it reads
+        self.deps: Dict[str, set] = {n.name: set() for n in nodes}
+        self.producer: Dict[tuple, str] = {}
+        writer: Dict[str, str] = {}
+        readers: Dict[str, List[str]] = {}
+        for n in nodes:
+            for p in n.inputs:
+                if p in writer:
+                    self.deps[n.name].add(writer[p])
+                    self.producer[(n.name, p)] = writer[p]
+            for p in n.outputs:
+                if p in writer:
+                    self.deps[n.name].add(writer[p])
+                self.deps[n.name].update(r for r in readers.get(p, []) if r != n.name)
+            for p in n.inputs:
+                readers.setdefault(p, []).append(n.name)
+            for p in n.outputs:
+                writer[p] = n.name
+                readers[p] = []
+
+    def _log(self, msg: str) -> None:
+        with self.print_lock:
+            print(msg, flush=True)
+
+    def _load_state(self) -> dict:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            state = {}
+        for k in ("nodes", "files", "tokens", "stat"):
+            state.setdefault(k, {})
+        return state
+
+    def _execute(self, node: Node) -> str:
+        if callable(node.run):
+            node.run()
+            return ""
+        p = subprocess.run(list(node.run), cwd=self.root, capture_output=True, text=True)
+        out = (p.stdout + p.stderr).rstrip()
+        if p.returncode != 0:
+            raise RuntimeError(f"exit {p.returncode}\n{out}")
+        return out
+
+    def run(self, force: bool = False, dry_run: bool = False) -> List[Result]:
+        state = self._load_state()
+        hasher = _Hasher(self.root, state["stat"])
+        paths = sorted({p for n in self.nodes for p in n.inputs + n.outputs})
+
+        # what is on disk now vs what the last build left behind
+        disk = {p: hasher.entry(p) for p in paths}
+        dirty = {p for p in paths if p in state["files"] and disk[p] != state["files"][p]}
+        # token of a path nobody earlier in the graph writes: its disk hash, except that a
+        # file the build itself last wrote in place keeps the token it came in with
+        tokens = {p: (state["tokens"].get(p, disk[p]) if p in state["files"] and p not in dirty else disk[p])
+                  for p in paths}
+
+        current: Dict[tuple, Optional[str]] = {}  # (node, path) -> hash of that output after the node
+        results: Dict[str, Result] = {}
+        done = set()
+        pending = {n.name: n for n in self.nodes}
+
+        def key_of(node: Node) -> str:
+            ins = []
+            for p in node.inputs:
+                prod = self.producer.get((node.name, p))
+                ins.append([p, current.get((prod, p)) if prod else tokens[p]])
+            spec = [node.name, node.describe(), ins, sorted(node.outputs)]
+            return hashlib.sha1(json.dumps(spec).encode()).hexdigest()
+
+        def why_stale(node: Node, key: str) -> str:
+            prev = state["nodes"].get(node.name)
+            if force:
+                return "forced"
+            if node.always:
+                return "always"
+            if prev is None:
+                return "never built"
+            if prev["key"] != key:
+                return "inputs changed"
+            for p in node.outputs:
+                if disk[p] is None and not _is_glob(p):
+                    return f"missing {p}"
+                if p in dirty:
+                    return f"{p} changed outside the build"
+            return ""
+
+        def finish(node: Node, key: str, outs: Dict[str, Optional[str]]) -> None:
+            for p, h in outs.items():
+                current[(node.name, p)] = h
+            state["nodes"][node.name] = {"key": key, "outputs": outs}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            running = {}
+            while pending or running:
+                # settle every ready node: fresh ones finish at once, stale ones are submitted
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        node = pending[name]
+                        deps = self.deps[name]
+                        if not deps <= done:
+                            continue
+                        del pending[name]
+                        progressed = True
+                        bad = [d for d in deps if results[d].status in ("failed", "blocked")]
+                        if bad:
+                            results[name] = Result(name, "blocked", reason=f"after {bad[0]}")
+                            done.add(name)
+                            continue
+                        key = key_of(node)
+                        reason = why_stale(node, key)
+                        if not reason:
+                            finish(node, key, dict(state["nodes"][name]["outputs"]))
+                            results[name] = Result(name, "fresh")
+                            done.add(name)
+                            continue
+                        if dry_run:
+                            # downstream sees a new output, so it is stale too
+                            finish(node, key, {p: f"pending:{name}" for p in node.outputs})
+                            results[name] = Result(name, "stale", reason=reason)
+                            done.add(name)
+                            continue
+                        running[pool.submit(self._timed, node, reason)] = (node, key, reason)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    node, key, reason = running.pop(fut)
+                    seconds, output, err = fut.result()
+                    if err is not None:
+                        state["nodes"].pop(node.name, None)
+                        results[node.name] = Result(node.name, "failed", seconds, reason, str(err))
+                        self._log(f"❌ {node.name} failed after {seconds:.2f}s: {err}")
+                    else:
+                        outs = {p: hasher.entry(p) for p in node.outputs}
+                        finish(node, key, outs)
+                        results[node.name] = Result(node.name, "ran", seconds, reason, output)
+                        self._log(f"✅ {node.name} {seconds:.2f}s" + (f"\n{output}" if self.verbose and output else ""))
+                    done.add(node.name)
+
+        if not dry_run:
+            for p in paths:
+                if any(p in n.inputs + n.outputs for n in self.nodes if results[n.name].status in ("failed", "blocked")):
+                    state["files"].pop(p, None)  # unknown state: recheck everything next time
+                    continue
+                state["files"][p] = hasher.entry(p)
+                state["tokens"][p] = tokens[p]
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            self.state_path.write_text(json.dumps(state, indent=1, sort_keys=True), encoding="utf-8")
+
+        return [results[n.name] for n in self.nodes]
+
+    def _timed(self, node: Node, reason: str):
+        self._log(f"▶ {node.name} ({reason})")
+        t0 = time.perf_counter()
+        try:
+            out = self._execute(node)
+            return time.perf_counter() - t0, out, None
+        except Exception as e:  # noqa: BLE001 - reported per node, the build goes on
+            return time.perf_counter() - t0, "", e
+
+def print_report(results: List[Result], wall: float) -> None:
+    print(f"\n{'node':<28}{'status':<10}{'seconds':>9}  reason")
+    for r in results:
+        secs = f"{r.seconds:.2f}" if r.status in ("ran", "failed") else "-"
+        print(f"{r.name:<28}{r.status:<10}{secs:>9}  {r.reason}")
+    ran = sum(r.seconds for r in results if r.status in ("ran", "failed"))
+    counts = {s: sum(r.status == s for r in results) for s in ("ran", "fresh", "stale", "failed", "blocked")}
+    summary = ", ".join(f"{n} {s}" for s, n in counts.items() if n)
+    print(f"{summary}; {ran:.2f}s of work in {wall:.2f}s wall")
+
+def exit_code(results: List[Result]) -> int:
+    return 1 if any(r.status in ("failed", "blocked") for r in results) else 0
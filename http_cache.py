@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP cache for the scrapers, keyed by URL.
+
+- Stores the body plus ETag / Last-Modified next to it on disk.
+- On a rerun it sends If-None-Match / If-Modified-Since; a 304 reuses the
+  stored body (read lazily, so callers that only need "unchanged?" never
+  touch it). A body that is gone by then (evicted by another thread or
+  process) counts as a miss: the URL is fetched again without the
+  conditional headers.
+- Keeps the cache below max_bytes by evicting the least recently used entries.
+
+Layout of cache_dir:
+    <sha256(url)>.body   raw response body
+    <sha256(url)>.json   {"url", "etag", "last_modified", "encoding", "size"}
+"encoding" is only detected from the body for text and JSON responses;
+for images it stays None unless the server declares a charset.
+The mtime of the .json file is the "last used" time for LRU eviction.
+"""
+import hashlib, json, os, threading, time
+from pathlib import Path
+import requests
+from requests.compat import chardet
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def response_encoding(r):
+    """The declared charset; detected from the body only for text and JSON, None for images and other binaries."""
+    ctype = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if ctype.startswith("text/") or ctype == "application/json" or ctype.endswith("+json"):
+        return r.encoding or r.apparent_encoding
+    return r.encoding
+
+class CachedResponse:
+    def __init__(self, url: str, status: int, not_modified: bool, encoding=None,
+                 content: bytes = None, body_path: Path = None, refetch=None):
+        self.url = url
+        self.status = status
+        self.not_modified = not_modified
+        self.encoding = encoding
+        self._content = content
+        self._body_path = body_path
+        self._refetch = refetch  # () -> CachedResponse, for a body evicted after the 304
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            try:
+                self._content = self._body_path.read_bytes()
+            except FileNotFoundError:
+                if self._refetch is None:
+                    raise
+                fresh = self._refetch()
+                self.encoding = fresh.encoding
+                self._content = fresh.content
+        return self._content
+
+    @property
+    def text(self) -> str:
+        if self.encoding is None and chardet is not None:
+            self.encoding = chardet.detect(self.content)["encoding"]
+        return str(self.content, self.encoding or "utf-8", errors="replace")
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class HttpCache:
+    def __init__(self, cache_dir, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = None  # key -> [last_used, size]
+
+    # --- index / LRU ------------------------------------------------------
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            index = {}
+            for meta_path in self.dir.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                try:
+                    st = meta_path.stat()
+                    size = body_path.stat().st_size + st.st_size
+                except FileNotFoundError:
+                    continue
+                index[meta_path.stem] = [st.st_mtime, size]
+            self._index = index
+        return self._index
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        try:
+            os.utime(self.dir / f"{key}.json", (now, now))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry:
+                entry[0] = now
+
+    def _remove(self, key: str) -> None:
+        for suffix in (".json", ".body"):
+            try:
+                (self.dir / f"{key}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits max_bytes. Returns entries removed."""
+        removed = 0
+        with self._lock:
+            index = self._load_index()
+            total = sum(size for _, size in index.values())
+            if total <= self.max_bytes:
+                return 0
+            for key, (_, size) in sorted(index.items(), key=lambda kv: kv[1][0]):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                del index[key]
+                total -= size
+                removed += 1
+        return removed
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(size for _, size in self._load_index().values())
+
+    # --- entries ------------------------------------------------------------
+
+    def _read_meta(self, key: str):
+        meta_path = self.dir / f"{key}.json"
+        if not meta_path.exists() or not (self.dir / f"{key}.body").exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, url: str, r, encoding) -> None:
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return  # nothing to revalidate with
+        body = r.content
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": encoding,
+            "size": len(body),
+        }
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        _atomic_write(self.dir / f"{key}.body", body)
+        _atomic_write(self.dir / f"{key}.json", meta_bytes)
+        with self._lock:
+            self._load_index()[key] = [time.time(), len(body) + len(meta_bytes)]
+        self.evict()
+
+    def get(self, url: str, headers=None, timeout: float = 60, session=None, revalidate: bool = True) -> CachedResponse:
+        key = url_key(url)
+        meta = self._read_meta(key) if revalidate else None
+        h = dict(headers or {})
+        if meta:
+            if meta.get("etag"):
+                h["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                h["If-Modified-Since"] = meta["last_modified"]
+
+        r = (session or requests).get(url, headers=h, timeout=timeout)
+        if r.status_code == 304 and meta:
+            body_path = self.dir / f"{key}.body"
+            if not body_path.exists():  # evicted since _read_meta
+                return self.get(url, headers, timeout, session, revalidate=False)
+            self._touch(key)
+            return CachedResponse(url, 304, True, meta.get("encoding"), body_path=body_path,
+                                  refetch=lambda: self.get(url, headers, timeout, session, revalidate=False))
+        r.raise_for_status()
+        encoding = response_encoding(r)
+        self._store(key, url, r, encoding)
+        return CachedResponse(url, r.status_code, False, encoding, content=r.content)
+
+def add_cache_args(ap) -> None:
+    ap.add_argument("--cache-dir", default=".cache/http", help="HTTP cache folder (ETag/Last-Modified revalidation)")
+    ap.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="LRU size limit of the cache")
+    ap.add_argument("--no-cache", action="store_true", help="Always download everything")
+
+def cache_from_args(args):
+    if args.no_cache:
+        return None
+    cache = HttpCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    cache.evict()  # a lowered --cache-max-mb applies right away
+    return cache
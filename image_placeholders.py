@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders (LQIP) embedded in the datasets.
+
+For every app/images/<service>/<asset>.jpg this renders a tiny (~32px)
+JPEG as a base64 data URI and stores it on the question, together with the
+full image size so the app can reserve the box before the photo arrives:
+
+    "lqip": {"src": "data:image/jpeg;base64,...", "width": 900, "height": 600}
+
+renderImage() paints it as the <img> background, so the next question shows
+a blurred preview at once instead of an empty box.
+
+Decoding uses JPEG draft mode (libjpeg scales by 1/8 while decoding), the
+images are spread over a process pool in chunks, and results are cached per
+service in .cache/lqip/<service>.json on (size, mtime), so only new or
+changed images are rendered again. The datasets are read and written with
+tools/dataset.py and the cache with tools/jsonio.py (only when the bytes
+change, through a temporary file).
+
+The scraper engine runs this after the variants; run it by hand for
+landmacht or after editing images:
+  python3 image_placeholders.py --services landmacht luchtmacht marine
+"""
+import argparse, base64, json, os, sys
+from io import BytesIO
+from pathlib import Path
+from PIL import Image, ImageFilter
+
+from image_proc import image_pool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from dataset import load as load_dataset  # noqa: E402
+from jsonio import write_if_changed  # noqa: E402
+
+SIZE = 32
+QUALITY = 60
+VERSION = 1          # bump when the output for the same image changes
+CACHE_DIR = Path(".cache/lqip")
+
+def render_placeholder(jpg_path: str) -> dict:
+    """Runs in a worker process."""
+    with Image.open(jpg_path) as im:
+        width, height = im.size
+        im.draft("RGB", (SIZE, SIZE))
+        im = im.convert("RGB")
+        im.thumbnail((SIZE, SIZE), Image.Resampling.BILINEAR)
+        # a light blur hides the blockiness when the browser scales it up
+        im = im.filter(ImageFilter.GaussianBlur(0.6))
+        out = BytesIO()
+        im.save(out, "JPEG", quality=QUALITY, optimize=True)
+    src = "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+    return {"src": src, "width": width, "height": height}
+
+def _stat_key(p: Path) -> list:
+    st = p.stat()
+    return [VERSION, st.st_size, st.st_mtime_ns]
+
+def build_placeholders(img_dir, assets, pool, workers: int = 1, cache_path=None) -> dict:
+    """Returns {asset: placeholder} for every asset that has a jpg; only uncached ones are rendered."""
+    img_dir = Path(img_dir)
+    cache_path = Path(cache_path) if cache_path else CACHE_DIR / f"{img_dir.name}.json"
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        cache = {}
+
+    out, todo = {}, []
+    for asset in assets:
+        p = img_dir / f"{asset}.jpg"
+        if not p.exists():
+            continue
+        key = _stat_key(p)
+        hit = cache.get(asset)
+        if hit and hit[0] == key:
+            out[asset] = hit[1]
+        else:
+            todo.append((asset, p, key))
+
+    if todo:
+        # a few chunks per worker: tiny tasks, so batching beats per-image round trips
+        chunk = max(1, len(todo) // (workers * 4))
+        for (asset, _p, key), lqip in zip(todo, pool.map(render_placeholder, [str(p) for _a, p, _k in todo], chunksize=chunk)):
+            out[asset] = lqip
+            cache[asset] = [key, lqip]
+
+    cache = {a: v for a, v in cache.items() if a in out}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(cache_path, json.dumps(cache, separators=(",", ":")))
+    return out
+
+def attach_placeholders(questions, results: dict) -> bool:
+    """Set/clear q["lqip"]; returns True when a record changed."""
+    changed = False
+    for q in questions:
+        v = results.get(q.get("asset"))
+        if q.get("lqip") != v:
+            if v:
+                q["lqip"] = v
+            else:
+                q.pop("lqip", None)
+            changed = True
+    return changed
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", default=["landmacht", "luchtmacht", "marine"])
+    ap.add_argument("--workers", type=int, default=0, help="Image processes (0 = one per core)")
+    args = ap.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    with image_pool(workers) as pool:
+        for service in args.services:
+            data_path = Path(args.app) / "data" / f"{service}.json"
+            img_dir = Path(args.app) / "images" / service
+            if not data_path.exists():
+                print("⚠️ Missing:", data_path)
+                continue
+            data = load_dataset(data_path)
+            questions = data.questions
+            results = build_placeholders(img_dir, [q.get("asset") for q in questions if q.get("asset")], pool, workers)
+            if attach_placeholders(questions, results) and data.save():
+                print("✅ Updated:", data_path)
+            else:
+                print("✔ Unchanged:", data_path)
+            kib = sum(len(r["src"]) for r in results.values()) / 1024
+            print(f"[{service}] {len(results)} placeholders, {kib:.1f} KiB of data URIs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Image processing for the scrapers, meant to run in a process pool.
+
+JPEG sources are opened in draft mode: libjpeg decodes them at 1/2, 1/4 or
+1/8 scale straight away, as long as the result is still at least as large as
+the requested output. A 5000px press photo that ends up as 900x600 is never
+fully decoded.
+
+Both functions take and return encoded bytes, so they can be sent to worker
+processes cheaply and the caller decides where the file is written. Given a
+timings dict they fill in seconds spent in "decode", "resize" and "encode";
+timed_encode() returns that dict from the worker together with the bytes.
+"""
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image, ImageOps
+
+# Bump when the output of fit_jpeg/thumbnail_jpeg changes for the same input,
+# so image-manifest.json entries get re-encoded.
+ENCODER_VERSION = 2
+
+# EXIF orientations that swap width and height
+_TRANSPOSED = {5, 6, 7, 8}
+
+def _open_reduced(jpg_bytes: bytes, size, exif_transpose: bool = False):
+    im = Image.open(BytesIO(jpg_bytes))
+    if im.format == "JPEG":
+        w, h = size
+        if exif_transpose and im.getexif().get(0x0112) in _TRANSPOSED:
+            w, h = h, w
+        im.draft("RGB", (w, h))
+    return im
+
+def _lap(timings, key: str, t: float) -> float:
+    now = time.perf_counter()
+    if timings is not None:
+        timings[key] = now - t
+    return now
+
+def fit_jpeg(jpg_bytes: bytes, size, quality: int = 88, timings=None) -> bytes:
+    """Crop-to-fill to exactly `size` (luchtmacht style)."""
+    t = time.perf_counter()
+    im = _open_reduced(jpg_bytes, size, exif_transpose=True)
+    im.load()
+    t = _lap(timings, "decode", t)
+    im = ImageOps.exif_transpose(im).convert("RGB")
+    im = ImageOps.fit(im, size, method=Image.Resampling.LANCZOS, centering=(0.5,0.5))
+    t = _lap(timings, "resize", t)
+    out = BytesIO()
+    im.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    _lap(timings, "encode", t)
+    return out.getvalue()
+
+def thumbnail_jpeg(jpg_bytes: bytes, max_size, quality: int = 85, timings=None) -> bytes:
+    """Shrink to fit inside `max_size`, keeping the aspect ratio (marine style)."""
+    t = time.perf_counter()
+    im = _open_reduced(jpg_bytes, max_size)
+    im.load()
+    t = _lap(timings, "decode", t)
+    im = im.convert("RGB")
+    im.thumbnail(max_size)
+    t = _lap(timings, "resize", t)
+    out = BytesIO()
+    im.save(out, "JPEG", quality=quality)
+    _lap(timings, "encode", t)
+    return out.getvalue()
+
+def timed_encode(encoder, jpg_bytes: bytes, size, quality: int):
+    """Runs in a worker process: (encoded bytes, {"decode": s, "resize": s, "encode": s})."""
+    timings = {}
+    return encoder(jpg_bytes, size, quality, timings=timings), timings
+
+def image_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """Process pool for image work; workers=0 means one per core."""
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Content-addressed bookkeeping for scraped images.
+
+Every service image folder gets an image-manifest.json:
+
+    {
+      "<asset>": {
+        "source_url": "https://www.defensie.nl/binaries/large/...",
+        "source_sha256": "...",
+        "params": {"op": "fit", "size": [900, 600], "quality": 88, "encoder": 2},
+        "output_sha256": "..."
+      }
+    }
+
+An asset is re-encoded only when its source hash or resize parameters
+change, or when the jpg on disk no longer matches output_sha256, and it
+is rewritten only when the new bytes differ. Within one run every source URL
+is downloaded once and every (source hash, params) pair is encoded once, so
+pages that share a binary share the work.
+
+save() drops the entries whose jpg is gone, or whose asset the run no longer
+has, and writes the manifest through tools/jsonio.py: atomically, and only
+when its bytes change.
+"""
+import hashlib, json, os, sys, threading
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from jsonio import dumps, write_if_changed  # noqa: E402
+
+MANIFEST_NAME = "image-manifest.json"
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def file_sha256(path: Path):
+    try:
+        return sha256(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+class Source:
+    """A downloaded (or 304-revalidated) source binary."""
+    def __init__(self, url: str, sha: str, res):
+        self.url = url
+        self.sha256 = sha
+        self._res = res
+
+    @property
+    def content(self) -> bytes:
+        return self._res.content
+
+    def release(self) -> None:
+        self._res = None
+
+class ImageStore:
+    def __init__(self, img_dir, params: dict):
+        self.dir = Path(img_dir)
+        self.params = params
+        self.manifest_path = self.dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._sources = {}   # url -> Future[Source]
+        self._encoded = {}   # source sha -> Future[bytes]
+        self._dirty = False
+        self.stats = {"downloaded": 0, "not_modified": 0, "reused": 0, "encoded": 0, "written": 0, "unchanged": 0}
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        else:
+            self.manifest = {}
+        self._sha_by_url = {e["source_url"]: e["source_sha256"] for e in self.manifest.values()}
+
+    def _once(self, table: dict, key, fn):
+        with self._lock:
+            fut = table.get(key)
+            owner = fut is None
+            if owner:
+                fut = table[key] = Future()
+        if owner:
+            try:
+                fut.set_result(fn())
+            except BaseException as e:
+                fut.set_exception(e)
+        return fut
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def source(self, url: str, fetch) -> Source:
+        """fetch(url) -> response with .content and .not_modified. Runs once per URL."""
+        def load():
+            res = fetch(url)
+            self._count("not_modified" if res.not_modified else "downloaded")
+            known = self._sha_by_url.get(url) if res.not_modified else None
+            return Source(url, known or sha256(res.content), res)
+        return self._once(self._sources, url, load).result()
+
+    def is_current(self, asset: str, src: Source) -> bool:
+        e = self.manifest.get(asset)
+        return bool(
+            e
+            and e["source_sha256"] == src.sha256
+            and e["params"] == self.params
+            and file_sha256(self.dir / f"{asset}.jpg") == e["output_sha256"]
+        )
+
+    def encode(self, asset: str, src: Source, submit):
+        """
+        submit(content) -> Future[bytes]. Returns None when the asset on disk is
+        already current, else a Future with the encoded jpg (shared between
+        assets with the same source binary).
+        """
+        if self.is_current(asset, src):
+            self._count("unchanged")
+            self._record(asset, src, self.manifest[asset]["output_sha256"])
+            return None
+        with self._lock:
+            fut = self._encoded.get(src.sha256)
+            if fut is None:
+                fut = self._encoded[src.sha256] = submit(src.content)
+                self.stats["encoded"] += 1
+            else:
+                self.stats["reused"] += 1
+        src.release()
+        return fut
+
+    def write(self, asset: str, src: Source, data: bytes) -> bool:
+        """Write <asset>.jpg only if its bytes changed; record the manifest entry."""
+        path = self.dir / f"{asset}.jpg"
+        out_sha = sha256(data)
+        changed = file_sha256(path) != out_sha
+        if changed:
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        self._count("written" if changed else "unchanged")
+        self._record(asset, src, out_sha)
+        return changed
+
+    def adopt(self, asset: str, entry: dict) -> None:
+        """Takes over a manifest entry recorded elsewhere (the scrape journal of a resumed run)."""
+        with self._lock:
+            if self.manifest.get(asset) != entry:
+                self.manifest[asset] = entry
+                self._sha_by_url[entry["source_url"]] = entry["source_sha256"]
+                self._dirty = True
+
+    def _record(self, asset: str, src: Source, out_sha: str) -> None:
+        entry = {
+            "source_url": src.url,
+            "source_sha256": src.sha256,
+            "params": self.params,
+            "output_sha256": out_sha,
+        }
+        with self._lock:
+            if self.manifest.get(asset) != entry:
+                self.manifest[asset] = entry
+                self._sha_by_url[src.url] = src.sha256
+                self._dirty = True
+
+    def save(self, assets=None) -> bool:
+        """
+        Writes the manifest; returns True when the file changed. Entries whose
+        jpg is gone are dropped, and with assets (those of this run) also the
+        ones not among them.
+        """
+        with self._lock:
+            for asset in list(self.manifest):
+                if (assets is not None and asset not in assets) or not (self.dir / f"{asset}.jpg").exists():
+                    del self.manifest[asset]
+                    self._dirty = True
+            if not self._dirty and self.manifest_path.exists():
+                return False
+            self._dirty = False
+            return write_if_changed(self.manifest_path, dumps(dict(sorted(self.manifest.items()))))
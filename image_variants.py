@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Responsive image derivatives for the web app.
+
+For every app/images/<service>/<asset>.jpg this writes smaller widths in
+AVIF, WebP and JPEG to
+
+    app/images/<service>/variants/<asset>-<width>.<ext>
+
+and records what exists on the question as
+
+    "variants": {"widths": [480, 720, 900], "formats": ["avif", "webp", "jpg"], "original": 900}
+
+so renderImage() can build a <picture> with srcset. "original" is the width
+of the source jpg when it is one of the widths: the jpg srcset points at the
+source file for it, as a re-encode at the same size would only lose quality.
+
+variants/ is a build output (gitignored); build_data.py makes it again. What
+each asset's variants were made from is kept in variants/index.json (a hash
+of the source jpg bytes and of the settings: widths, formats, quality), so
+variants are only regenerated when the image or the settings change,
+whatever the file times say. Files the current settings no longer
+make (a width or format dropped, an asset gone) are removed. A byte-budget
+report per service compares the full jpgs with what a phone (smallest width,
+best format) downloads.
+
+The formats are pinned (FORMATS, the default of --formats and of
+build_variants()), so the output does not depend on what this Pillow happens
+to support: an image that needs a format it cannot encode stops the run
+instead of dropping that format from every question. build_data.py runs this
+per service and the scraper engine after the resize stage; run it by hand
+after editing images:
+  python3 image_variants.py --services landmacht luchtmacht marine [--formats avif,webp,jpg]
+"""
+import argparse, hashlib, json, os, re, sys
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+
+from image_proc import image_pool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from dataset import load as load_dataset  # noqa: E402
+from jsonio import dumps, write_if_changed  # noqa: E402
+
+WIDTHS = (480, 720, 900, 1200)
+FORMATS = ("avif", "webp", "jpg")  # best first, jpg last as the <img> fallback
+QUALITY = {"jpg": 82, "webp": 78, "avif": 55}
+PIL_FORMAT = {"jpg": "JPEG", "webp": "WEBP", "avif": "AVIF"}
+VARIANTS_DIR = "variants"
+INDEX = "index.json"
+VERSION = 2  # bump when the output for the same image and settings changes
+VARIANT_RE = re.compile(r"(.+)-(\d+)\.(" + "|".join(PIL_FORMAT) + r")")
+
+def supported_formats():
+    """What this Pillow can encode, best first; jpg always last."""
+    try:
+        import pillow_avif  # noqa: F401  (registers AVIF on older Pillow)
+    except ImportError:
+        pass
+    Image.init()
+    fmts = ["avif"] if "AVIF" in Image.SAVE else []
+    if "WEBP" in Image.SAVE:
+        fmts.append("webp")
+    return fmts + ["jpg"]
+
+def variant_path(img_dir: Path, asset: str, width: int, fmt: str) -> Path:
+    return img_dir / VARIANTS_DIR / f"{asset}-{width}.{fmt}"
+
+def settings_hash(widths, formats) -> str:
+    key = json.dumps([VERSION, sorted(widths), list(formats), {f: QUALITY[f] for f in formats}])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def render_variants(jpg_path: str, widths, formats, entry=None) -> dict:
+    """
+    Runs in a worker process. entry: what index.json says the asset's variants
+    were made from. Returns {"widths": [...], "original": width or None,
+    "bytes": {fmt: {width: size}}, "entry": {...}}; nothing is decoded when
+    entry still matches.
+    """
+    src = Path(jpg_path)
+    img_dir, asset = src.parent, src.stem
+    raw = src.read_bytes()
+    want = {"source": hashlib.sha256(raw).hexdigest()[:16], "settings": settings_hash(widths, formats)}
+    if entry and all(entry.get(k) == v for k, v in want.items()):
+        original = entry.get("original")
+        paths = {(w, fmt): src if (w, fmt) == (original, "jpg") else variant_path(img_dir, asset, w, fmt)
+                 for w in entry["widths"] for fmt in formats}
+        if all(p.exists() for p in paths.values()):
+            sizes = {fmt: {w: paths[w, fmt].stat().st_size for w in entry["widths"]} for fmt in formats}
+            return {"widths": entry["widths"], "original": original, "bytes": sizes, "entry": entry}
+
+    missing = [fmt for fmt in formats if fmt not in supported_formats()]
+    if missing:
+        raise ValueError(f"{src}: this Pillow cannot encode {', '.join(missing)} (pip install pillow-avif-plugin)")
+    with Image.open(BytesIO(raw)) as im:
+        im = im.convert("RGB")
+        # never upscale: widths above the source are dropped, the source width itself is kept
+        use = sorted({w for w in widths if w < im.width} | {min(im.width, max(widths))})
+        original = im.width if im.width in use else None
+        sizes = {fmt: {} for fmt in formats}
+        for w in use:
+            h = round(im.height * w / im.width)
+            scaled = im if w == im.width else im.resize((w, h), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                if (w, fmt) == (original, "jpg"):  # the source itself
+                    sizes[fmt][w] = len(raw)
+                    continue
+                out = variant_path(img_dir, asset, w, fmt)
+                out.parent.mkdir(exist_ok=True)
+                tmp = out.with_name(f".{out.name}.tmp")
+                opts = {"quality": QUALITY[fmt]}
+                if fmt == "jpg":
+                    opts.update(optimize=True, progressive=True)
+                scaled.save(tmp, PIL_FORMAT[fmt], **opts)
+                os.replace(tmp, out)
+                sizes[fmt][w] = out.stat().st_size
+    return {"widths": use, "original": original, "bytes": sizes, "entry": dict(want, widths=use, original=original)}
+
+def prune_variants(img_dir: Path, results: dict, formats) -> int:
+    """Removes variant files the current results do not list (old widths/formats, gone assets)."""
+    keep = {variant_path(img_dir, a, w, fmt).name for a, r in results.items() for w in r["widths"] for fmt in formats
+            if (w, fmt) != (r["original"], "jpg")}
+    removed = 0
+    for p in (img_dir / VARIANTS_DIR).glob("*"):
+        if p.name not in keep and (VARIANT_RE.fullmatch(p.name) or p.name.endswith(".tmp")):
+            p.unlink()
+            removed += 1
+    return removed
+
+def build_variants(img_dir, assets, pool, widths=WIDTHS, formats=None) -> dict:
+    """
+    Returns {asset: render_variants result} for every asset that has a jpg;
+    updates variants/index.json and removes the variants nothing uses any more.
+    """
+    img_dir = Path(img_dir)
+    formats = formats or FORMATS
+    index_path = img_dir / VARIANTS_DIR / INDEX
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        index = {}
+    futs = {}
+    for asset in assets:
+        p = img_dir / f"{asset}.jpg"
+        if p.exists():
+            futs[asset] = pool.submit(render_variants, str(p), tuple(widths), tuple(formats), index.get(asset))
+    results = {asset: fut.result() for asset, fut in futs.items()}
+    prune_variants(img_dir, results, formats)
+    if results or index_path.exists():
+        index_path.parent.mkdir(exist_ok=True)
+        write_if_changed(index_path, dumps({a: results[a]["entry"] for a in sorted(results)}))
+    return results
+
+def attach_variants(questions, results: dict, formats) -> bool:
+    """Set/clear q["variants"]; returns True when a record changed."""
+    changed = False
+    for q in questions:
+        r = results.get(q.get("asset"))
+        v = {"widths": r["widths"], "formats": list(formats)} if r else None
+        if r and r["original"]:
+            v["original"] = r["original"]
+        if q.get("variants") != v:
+            if v:
+                q["variants"] = v
+            else:
+                q.pop("variants", None)
+            changed = True
+    return changed
+
+def budget(img_dir, results: dict, formats) -> dict:
+    img_dir = Path(img_dir)
+    full = sum((img_dir / f"{a}.jpg").stat().st_size for a in results)
+    best = formats[0]
+    phone = sum(r["bytes"][best][r["widths"][0]] for r in results.values())
+    per_format = {
+        fmt: sum(r["bytes"][fmt][r["widths"][-1]] for r in results.values())
+        for fmt in formats
+    }
+    return {
+        "assets": len(results),
+        "full_jpg_bytes": full,
+        "phone_bytes": phone,
+        "phone_format": best,
+        "largest_width_bytes": per_format,
+    }
+
+def print_budget(service: str, b: dict) -> None:
+    saved = 100 - round(100 * b["phone_bytes"] / b["full_jpg_bytes"]) if b["full_jpg_bytes"] else 0
+    print(f"[{service}] {b['assets']} assets: full jpg {b['full_jpg_bytes'] / 1024:.0f} KiB, "
+          f"phone ({b['phone_format']}, smallest width) {b['phone_bytes'] / 1024:.0f} KiB (-{saved}%)")
+    for fmt, n in b["largest_width_bytes"].items():
+        print(f"    largest width as {fmt}: {n / 1024:.0f} KiB")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", default=["landmacht", "luchtmacht", "marine"])
+    ap.add_argument("--widths", default=",".join(map(str, WIDTHS)), help="e.g. 480,720,900")
+    ap.add_argument("--formats", default=",".join(FORMATS),
+                    help=f"Best first, jpg last (this Pillow encodes {','.join(supported_formats())})")
+    ap.add_argument("--workers", type=int, default=0, help="Image processes (0 = one per core)")
+    ap.add_argument("--report", default=None, help="Write the byte-budget report as JSON here")
+    args = ap.parse_args()
+    widths = tuple(int(w) for w in args.widths.split(","))
+    formats = tuple(args.formats.split(","))
+    if not set(formats) <= set(PIL_FORMAT) or formats[-1] != "jpg":
+        ap.error(f"--formats: a list of {', '.join(PIL_FORMAT)} ending in jpg")
+
+    report = {}
+    with image_pool(args.workers) as pool:
+        for service in args.services:
+            data_path = Path(args.app) / "data" / f"{service}.json"
+            img_dir = Path(args.app) / "images" / service
+            if not data_path.exists():
+                print("⚠️ Missing:", data_path)
+                continue
+            data = load_dataset(data_path)
+            questions = data.questions
+            results = build_variants(img_dir, [q.get("asset") for q in questions if q.get("asset")], pool, widths, formats)
+            if attach_variants(questions, results, formats) and data.save():
+                print("✅ Updated:", data_path)
+            else:
+                print("✔ Unchanged:", data_path)
+            report[service] = budget(img_dir, results, formats)
+            print_budget(service, report[service])
+
+    if args.report:
+        write_if_changed(Path(args.report), dumps(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+One-pass extraction of what the scrapers read from a defensie.nl page: the
+<h1> title, the first /binaries/large/ image URL and the links below a topic
+path.
+
+extract() streams the page through a tag-level parser, without building a
+soup, and stops as soon as it has everything asked for. On an item page that
+is the end of the first <h1> once an image attribute has been seen, usually
+well before the related links and the footer. Links need the whole page, so
+they are only collected when a link_prefix is given (the topic page).
+
+The parser is lxml's HTMLPullParser (fed in chunks) when lxml is installed,
+else the stdlib html.parser, which is what BeautifulSoup used here minus the
+tree. The results are those of the BeautifulSoup extractors they replace
+(bench/bench_extract.py checks that on saved pages):
+- title: the text of the first <h1>, script/style text left out and
+  whitespace collapsed; None when that h1 is empty or there is none
+- image: the first attribute value, in document order, that contains
+  /binaries/large/..., joined to the site root; when no attribute has one,
+  the first /binaries/large/ URL anywhere in the raw page (inline JSON, a
+  <script>, a comment), which is where the original per-service scrapers
+  looked (a regex over the whole HTML), so pages that only carry the photo
+  in script data keep their image
+- links: <a href> below link_prefix, without #fragment and ?query, in page
+  order, without duplicates
+
+On badly broken markup libxml2 may nest elements differently from
+html.parser; pass backend="html.parser" to get exactly the old behaviour.
+
+Usage:
+    page = extract(html, base)                                               # item page
+    page = extract(html, base, title=False, image=False, link_prefix="/...")  # topic page
+    page.title, page.image, page.links
+"""
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+except ImportError:  # optional: html.parser gives the same results, slower
+    etree = None
+
+BACKEND = "lxml" if etree is not None else "html.parser"
+CHUNK = 8192  # lxml is fed this many characters at a time, so it can stop early
+
+LARGE_IMAGE_RE = re.compile(r'(/binaries/large/[^"\'>\s]+)')
+LARGE_IMAGE = "/binaries/large/"
+# elements whose text BeautifulSoup leaves out of get_text()
+HIDDEN_TEXT = frozenset(("script", "style", "template", "rt", "rp"))
+# elements that never hold content (no end tag to wait for)
+VOID = frozenset(("area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr",
+                  "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid",
+                  "param", "source", "spacer", "track", "wbr"))
+
+@dataclass
+class Page:
+    title: Optional[str] = None
+    image: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+
+class _Done(Exception):
+    pass
+
+class _Extract:
+    """What has been found so far; shared by both backends."""
+    def __init__(self, base: str, title: bool, image: bool, link_prefix):
+        self.base, self.link_prefix = base, link_prefix
+        self.page = Page()
+        self.title_done, self.image_done = not title, not image
+        self.seen = set()
+
+    @property
+    def done(self) -> bool:
+        return self.title_done and self.image_done and self.link_prefix is None
+
+    def attrs(self, values) -> None:
+        if not self.image_done:
+            for v in values:
+                if v and LARGE_IMAGE in v:
+                    m = LARGE_IMAGE_RE.search(v)
+                    if m:
+                        self.page.image = urljoin(self.base, m.group(1))
+                        self.image_done = True
+                        break
+
+    def link(self, href) -> None:
+        if href:
+            href = href.split("#")[0].split("?")[0]
+            if href.startswith(self.link_prefix):
+                u = urljoin(self.base, href)
+                if u not in self.seen:
+                    self.seen.add(u)
+                    self.page.links.append(u)
+
+    def title(self, text: str) -> None:
+        self.page.title = re.sub(r"\s+", " ", text).strip() or None
+        self.title_done = True
+
+class _Scanner(HTMLParser):
+    """html.parser backend: keeps only the open-element stack, the way the soup would nest it."""
+    def __init__(self, ex: _Extract):
+        super().__init__(convert_charrefs=True)
+        self.ex = ex
+        self.stack = []
+        self.h1 = None      # stack depth of the first <h1> while its text is read
+        self.parts = []
+        self.hidden = 0     # open script/style/... elements
+
+    def handle_starttag(self, tag, attrs):
+        ex = self.ex
+        if not ex.image_done or (tag == "a" and ex.link_prefix is not None):
+            d = {k: ("" if v is None else v) for k, v in attrs}  # a repeated attribute: last wins
+            ex.attrs(d.values())
+            if tag == "a" and ex.link_prefix is not None:
+                ex.link(d.get("href"))
+        if tag not in VOID:
+            if tag == "h1" and self.h1 is None and not ex.title_done:
+                self.h1 = len(self.stack)
+            elif tag in HIDDEN_TEXT:
+                self.hidden += 1
+            self.stack.append(tag)
+        if ex.done:
+            raise _Done
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return  # stray end tag: the soup ignores it too
+        at = len(self.stack) - 1 - self.stack[::-1].index(tag)
+        if self.hidden:
+            self.hidden -= sum(t in HIDDEN_TEXT for t in self.stack[at:])
+        if self.h1 is not None and at <= self.h1:
+            self.ex.title("".join(self.parts))
+            self.h1 = None
+        del self.stack[at:]
+        if self.ex.done:
+            raise _Done
+
+    def handle_data(self, data):
+        if self.h1 is not None and not self.hidden:
+            self.parts.append(data)
+
+    def finish(self):
+        if self.h1 is not None:  # never closed: it runs to the end of the page
+            self.ex.title("".join(self.parts))
+
+def _html_parser(html: str, ex: _Extract) -> None:
+    p = _Scanner(ex)
+    try:
+        p.feed(html)
+        p.close()
+    except _Done:
+        return
+    p.finish()
+
+def _lxml(html: str, ex: _Extract) -> None:
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    h1 = None
+
+    def handle():
+        nonlocal h1
+        for event, el in parser.read_events():
+            tag = el.tag
+            if not isinstance(tag, str):
+                continue
+            if event == "start":
+                ex.attrs(el.attrib.values())
+                if tag == "a" and ex.link_prefix is not None:
+                    ex.link(el.get("href"))
+                if tag == "h1" and h1 is None and not ex.title_done:
+                    h1 = el
+            elif el is h1:
+                ex.title("".join(el.xpath(".//text()[not(ancestor::script or ancestor::style or ancestor::template"
+                                          " or ancestor::rt or ancestor::rp)]")))
+            if ex.done:
+                return True
+        return False
+
+    for at in range(0, len(html), CHUNK):
+        parser.feed(html[at:at + CHUNK])
+        if handle():
+            return
+    parser.close()
+    handle()
+
+def extract(html: str, base: str, title: bool = True, image: bool = True, link_prefix: Optional[str] = None,
+            backend: Optional[str] = None) -> Page:
+    """See the module docstring. backend: "lxml" or "html.parser" (default: the fastest installed)."""
+    ex = _Extract(base, title, image, link_prefix)
+    if (backend or BACKEND) == "lxml":
+        if etree is None:
+            raise ImportError("lxml is not installed")
+        _lxml(html, ex)
+    else:
+        _html_parser(html, ex)
+    if not ex.image_done:  # the whole page was read: fall back to the raw text
+        m = LARGE_IMAGE_RE.search(html)
+        if m:
+            ex.page.image = urljoin(base, m.group(1))
+    return ex.page
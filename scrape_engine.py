@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Shared crawler engine for the defensie.nl scrapers.
+
+One Crawler holds a pooled requests.Session (keep-alive, connection reuse),
+the HTTP cache, the per-host limiter and the image process pool; a
+ServiceConfig per service says where to crawl and how to shape the dataset.
+Several services can be built in one run over the same connection pool.
+
+Every finished page goes into an append-only journal (scrape_journal.py) and
+the dataset is put together from it, so an interrupted or failed run can be
+continued with --resume: pages already journaled (with their jpg intact) are
+not fetched again. A service that fails does not stop the next one.
+
+With --metrics the run records per-stage timings (p50/p95), bytes and
+retry/error counts per URL (scrape_metrics.py); --profile adds a cProfile dump.
+
+Run from repo root:
+  python3 scrape_engine.py --services luchtmacht marine
+  python3 scrape_engine.py --services marine --metrics metrics.json --profile scrape.prof
+  python3 scrape_engine.py --services luchtmacht --resume      # after a crash / Ctrl-C
+"""
+import argparse, json, os, re, time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import add_cache_args, cache_from_args
+from image_proc import ENCODER_VERSION, fit_jpeg, image_pool, thumbnail_jpeg, timed_encode
+from image_placeholders import attach_placeholders, build_placeholders
+from image_store import ImageStore, file_sha256
+from image_variants import FORMATS, attach_variants, budget, build_variants, print_budget
+from page_extract import extract
+from scrape_journal import JOURNAL_DIR, Journal
+from scrape_metrics import Metrics, print_summary
+from scrape_pipeline import HostLimiter, Stage, run_pipeline
+
+BASE = "https://www.defensie.nl"
+UA = {"User-Agent":"Mozilla/5.0 (speaking trainer scraper)"}
+
+RETRY_BACKOFF = 0.5  # seconds before the first retry, doubled after each
+
+@dataclass
+class ServiceConfig:
+    service: str                          # app/data/<service>.json, app/images/<service>/
+    topic: str                            # topic page path
+    link_prefix: str                      # only item links below this path
+    id_format: str                        # e.g. "af_{asset}_{i}"
+    classes: List[str]
+    default_class: str
+    fallback_title: Optional[str] = None  # e.g. "Luchtmacht item {i}"; None skips pages without <h1>
+    image_op: str = "fit"                 # "fit": crop to size, "thumbnail": fit inside size
+    size: Tuple[int, int] = (900, 600)
+    quality: int = 88
+    quiz_length: int = 10
+    mcq_options: int = 6
+
+LUCHTMACHT = ServiceConfig(
+    service="luchtmacht",
+    topic="/onderwerpen/materieel/vliegtuigen-en-helikopters",
+    link_prefix="/onderwerpen/materieel/vliegtuigen-en-helikopters/",
+    id_format="af_{asset}_{i}",
+    classes=[
+        "Fighter Aircraft",
+        "Transport Aircraft",
+        "Helicopter",
+        "Trainer Aircraft",
+        "Uncrewed Aerial System (UAS)",
+        "Other"
+    ],
+    default_class="UNKNOWN",  # later classificeren (Fighter/Transport/Helicopter/UAS/etc.)
+    fallback_title="Luchtmacht item {i}",
+)
+
+MARINE = ServiceConfig(
+    service="marine",
+    topic="/onderwerpen/materieel/schepen",
+    link_prefix="/onderwerpen/materieel/schepen/",
+    id_format="nav_{asset}",
+    classes=[
+        "Frigate",
+        "Destroyer",
+        "Patrol Vessel",
+        "Amphibious Ship",
+        "Submarine",
+        "Support Vessel"
+    ],
+    default_class="Naval Vessel",
+    image_op="thumbnail",
+    size=(1200, 800),
+    quality=85,
+)
+
+SERVICES = {c.service: c for c in (LUCHTMACHT, MARINE)}
+
+# --- page helpers -----------------------------------------------------------
+
+def slug(s:str)->str:
+    s = s.lower()
+    s = re.sub(r"[’'\"`]", "", s)
+    s = re.sub(r"[^a-z0-9]+","-", s).strip("-")
+    return (s[:70] or "item")
+
+def aliases(title:str):
+    t = re.sub(r"\s+"," ", title.lower()).strip()
+    a = {t}
+    # korte alias: alles vóór haakjes
+    a.add(re.sub(r"\s*\(.*?\)\s*", " ", t).strip())
+    return sorted(x for x in a if x)
+
+def parse_item(html:str, base:str = BASE):
+    """One early-exit pass per item page -> (title or None, first /binaries/large/ url or None)."""
+    page = extract(html, base)
+    return page.title, page.image
+
+def topic_links(html:str, link_prefix:str, base:str = BASE) -> List[str]:
+    # Alleen links binnen dit onderwerp, in paginavolgorde, zonder dubbelen
+    return extract(html, base, title=False, image=False, link_prefix=link_prefix).links
+
+def question(cfg:ServiceConfig, i:int, rec:dict) -> dict:
+    """The dataset entry of a journaled page (i: its position on the topic page)."""
+    return {
+        "id": cfg.id_format.format(asset=rec["asset"], i=i),
+        "asset": rec["asset"],
+        "class": cfg.default_class,
+        "answer": rec["title"],
+        "aliases": aliases(rec["title"]),
+        "source_page": rec["page"]
+    }
+
+def retryable(e:Exception) -> bool:
+    """Connection problems, timeouts, 429 and 5xx are worth another try; other 4xx are not."""
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+# --- engine -------------------------------------------------------------------
+
+def make_session(pool_size:int = 8) -> requests.Session:
+    s = requests.Session()
+    s.headers.update(UA)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+class Crawler:
+    def __init__(self, out_dir="app", session=None, cache=None, limiter=None, image_workers:int = 0,
+                 fetch_workers:int = 4, download_workers:int = 4, queue_size:int = 16, base:str = BASE,
+                 variants:bool = True, metrics:Optional[Metrics] = None, retries:int = 0,
+                 journal_dir:str = JOURNAL_DIR, resume:bool = False):
+        self.out_dir = out_dir
+        self.limiter = limiter or HostLimiter()
+        self.session = session or make_session(max(self.limiter.per_host, fetch_workers, download_workers))
+        self.cache = cache
+        self.image_workers = image_workers or os.cpu_count() or 1
+        self.pool = image_pool(self.image_workers)
+        self.fetch_workers = fetch_workers
+        self.download_workers = download_workers
+        self.queue_size = queue_size
+        self.base = base
+        self.variants = variants
+        self.metrics = metrics
+        self.retries = max(0, retries)
+        self.journal_dir = journal_dir
+        self.resume = resume
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get_once(self, url:str, timeout:float):
+        with self.limiter.slot(url):
+            if self.cache:
+                return self.cache.get(url, timeout=timeout, session=self.session)
+            r = self.session.get(url, timeout=timeout)
+            r.raise_for_status()
+            r.not_modified = False
+            return r
+
+    def get(self, url:str, timeout:float = 60, kind:str = "page"):
+        """Response with .content/.text and .not_modified (True on a 304 from the cache)."""
+        for attempt in range(self.retries + 1):
+            t = time.perf_counter()
+            try:
+                r = self._get_once(url, timeout)
+            except requests.RequestException as e:
+                retry = attempt < self.retries and retryable(e)
+                if self.metrics:
+                    self.metrics.failure(url, kind, e, retry)
+                if not retry:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            if self.metrics:
+                status = getattr(r, "status", None) or getattr(r, "status_code", None)
+                self.metrics.request(url, kind, status, 0 if r.not_modified else len(r.content), time.perf_counter() - t)
+            return r
+
+    def fetch(self, url:str, kind:str = "page") -> str:
+        return self.get(url, kind=kind).text
+
+    def item_pages(self, cfg:ServiceConfig) -> List[str]:
+        topic = urljoin(self.base, cfg.topic)
+        print("Fetching:", topic)
+        with self._timer("topic"):
+            return topic_links(self.fetch(topic, kind="topic"), cfg.link_prefix, self.base)
+
+    def _timer(self, stage:str):
+        return self.metrics.timer(stage) if self.metrics else nullcontext()
+
+    def _stage(self, name:str, fn, workers:int) -> Stage:
+        return Stage(name, self.metrics.stage(name, fn) if self.metrics else fn, workers)
+
+    def _submit_encode(self, encoder, data:bytes, size, quality:int):
+        if not self.metrics:
+            return self.pool.submit(encoder, data, size, quality)
+        # decode/resize/encode are timed in the worker; record them once per encode
+        fut = self.pool.submit(timed_encode, encoder, data, size, quality)
+        fut.add_done_callback(self._record_encode)
+        return fut
+
+    def _record_encode(self, fut) -> None:
+        if fut.exception() is None:
+            for stage, seconds in fut.result()[1].items():
+                self.metrics.add(stage, seconds)
+
+    def crawl(self, cfg:ServiceConfig, size=None) -> dict:
+        """page fetch -> parse -> image download -> resize/encode -> write; returns the dataset."""
+        w, h = size or cfg.size
+        img_dir = os.path.join(self.out_dir, "images", cfg.service)
+        os.makedirs(img_dir, exist_ok=True)
+        encoder = fit_jpeg if cfg.image_op == "fit" else thumbnail_jpeg
+        store = ImageStore(img_dir, {"op": cfg.image_op, "size": [w, h], "quality": cfg.quality, "encoder": ENCODER_VERSION})
+
+        pages = self.item_pages(cfg)
+        print("Items found:", len(pages))
+
+        journal = Journal(os.path.join(self.journal_dir, f"{cfg.service}.jsonl"),
+                          {"service": cfg.service, "base": self.base, "params": store.params}, self.resume)
+        # journaled pages are done when their jpg is still the one that was written
+        done = set()
+        for page, rec in journal.done.items():
+            image = rec["image"]
+            if image is None or file_sha256(Path(img_dir) / f"{rec['asset']}.jpg") == image["output_sha256"]:
+                done.add(page)
+                if image is not None:
+                    store.adopt(rec["asset"], image)
+        if journal.resumed:
+            print(f"Resuming: {sum(p in done for p in pages)} of {len(pages)} pages from {journal.path}")
+
+        def fetch_page(job):
+            job["html"] = self.fetch(job["page"])
+            return job
+
+        def parse(job):
+            title, job["img_url"] = parse_item(job.pop("html"), self.base)
+            if title is None:
+                if cfg.fallback_title is None:
+                    raise ValueError("no <h1>")
+                title = cfg.fallback_title.format(i=job["i"])
+            job["title"] = title
+            job["asset"] = slug(title)
+            return job
+
+        def download(job):
+            if job["img_url"]:
+                # once per binary, even when several pages share it
+                job["src"] = store.source(job["img_url"], lambda u: self.get(u, timeout=90, kind="image"))
+            return job
+
+        def resize(job):
+            src = job.get("src")
+            if src is None:
+                return job
+            fut = store.encode(job["asset"], src, lambda b: self._submit_encode(encoder, b, (w,h), cfg.quality))
+            if fut is not None:  # None: the jpg on disk is already current
+                job["jpg"] = fut.result()[0] if self.metrics else fut.result()
+            return job
+
+        def write(job):
+            i, page, title, asset = job["i"], job["page"], job["title"], job["asset"]
+            jpg = job.pop("jpg", None)
+            if jpg is not None:
+                store.write(asset, job["src"], jpg)
+            image = store.manifest.get(asset) if job.get("src") is not None else None
+            journal.add(page, title, asset, image)
+            print(f"[{i}/{len(pages)}] OK:", title)
+            return job
+
+        def skip(_idx, job, stage, e):
+            print(f"[{job['i']}/{len(pages)}] SKIP ({stage}):", job["page"], e)
+            if self.metrics:
+                self.metrics.skip(cfg.service, job, stage, e)
+
+        # "resize" only waits for the worker; its decode/resize/encode are recorded separately
+        stages = [
+            self._stage("fetch", fetch_page, self.fetch_workers),
+            self._stage("parse", parse, 1),
+            self._stage("download", download, self.download_workers),
+            Stage("resize", resize, self.image_workers),
+            self._stage("write", write, 1),
+        ]
+        jobs = [{"i": i, "page": page} for i, page in enumerate(pages, 1) if page not in done]
+        with journal:
+            run_pipeline(jobs, stages, maxsize=self.queue_size, on_error=skip)
+        # from the journal, in page order: ids and question order match a sequential, uninterrupted run
+        questions = [question(cfg, i, journal.done[page]) for i, page in enumerate(pages, 1) if page in journal.done]
+        store.save({q["asset"] for q in questions})
+        print("Images in:", img_dir, store.stats)
+        if self.variants:
+            with self._timer("variants"):
+                rendered = build_variants(img_dir, [q["asset"] for q in questions], self.pool, formats=FORMATS)
+            attach_variants(questions, rendered, FORMATS)
+            print_budget(cfg.service, budget(img_dir, rendered, FORMATS))
+        with self._timer("placeholders"):
+            placeholders = build_placeholders(img_dir, [q["asset"] for q in questions], self.pool, self.image_workers)
+        attach_placeholders(questions, placeholders)
+
+        return {
+            "quizLength": cfg.quiz_length,
+            "mcqOptions": cfg.mcq_options,
+            "classes": cfg.classes,
+            "questions": questions
+        }
+
+    def build(self, cfg:ServiceConfig, size=None) -> str:
+        dataset = self.crawl(cfg, size)
+        data_dir = os.path.join(self.out_dir, "data")
+        os.makedirs(data_dir, exist_ok=True)
+        out_json = os.path.join(data_dir, f"{cfg.service}.json")
+        with open(out_json, "w", encoding="utf-8") as f:
+            json.dump(dataset, f, indent=2, ensure_ascii=False)
+        print("DONE:", out_json, "questions:", len(dataset["questions"]))
+        return out_json
+
+# --- CLI ----------------------------------------------------------------------
+
+def main(default_services=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--services", nargs="+", choices=sorted(SERVICES), default=default_services or sorted(SERVICES))
+    ap.add_argument("--out", default="app", help="App folder")
+    ap.add_argument("--size", default=None, help="e.g. 900x600 (default: per service)")
+    ap.add_argument("--delay", type=float, default=0.0, help="Min seconds between requests to the same host")
+    ap.add_argument("--per-host", type=int, default=4, help="Max concurrent requests per host")
+    ap.add_argument("--fetch-workers", type=int, default=4)
+    ap.add_argument("--download-workers", type=int, default=4)
+    ap.add_argument("--image-workers", type=int, default=0, help="Image processes (0 = one per core)")
+    ap.add_argument("--queue-size", type=int, default=16, help="Bound of each inter-stage queue")
+    ap.add_argument("--no-variants", action="store_true", help="Skip responsive srcset/WebP/AVIF variants")
+    ap.add_argument("--base", default=BASE, help="Site root (a mirror or local stand-in server)")
+    ap.add_argument("--retries", type=int, default=0, help="Retries per URL on connection errors, timeouts, 429 and 5xx")
+    ap.add_argument("--metrics", default=None, help="Write per-stage timings and per-URL counts here (.json or .csv)")
+    ap.add_argument("--profile", default=None, help="Write a cProfile dump of the run here (e.g. scrape.prof)")
+    ap.add_argument("--resume", action="store_true", help="Skip the pages already in the journal of an earlier run")
+    ap.add_argument("--journal-dir", default=JOURNAL_DIR, help="Where the per-service page journals go")
+    add_cache_args(ap)
+    args = ap.parse_args()
+    size = tuple(map(int, args.size.lower().split("x"))) if args.size else None
+    metrics = Metrics(profile=bool(args.profile)) if (args.metrics or args.profile) else None
+
+    crawler = Crawler(
+        out_dir=args.out,
+        cache=cache_from_args(args),
+        limiter=HostLimiter(args.per_host, args.delay),
+        image_workers=args.image_workers,
+        fetch_workers=args.fetch_workers,
+        download_workers=args.download_workers,
+        queue_size=args.queue_size,
+        variants=not args.no_variants,
+        base=args.base.rstrip("/"),
+        metrics=metrics,
+        retries=args.retries,
+        journal_dir=args.journal_dir,
+        resume=args.resume,
+    )
+    failed = []
+    with crawler:
+        for name in args.services:
+            try:
+                crawler.build(SERVICES[name], size)
+            except Exception as e:
+                # the pages finished so far are journaled; carry on with the next service
+                print(f"❌ {name} failed: {type(e).__name__}: {e} (rerun with --resume to continue)")
+                failed.append(name)
+    if metrics:
+        if args.profile:
+            metrics.dump_profile(args.profile)
+            print("Profile:", args.profile, f"(python3 -m pstats {args.profile})")
+        if args.metrics:
+            print_summary(metrics.write(args.metrics))
+            print("Metrics:", args.metrics)
+    if failed:
+        raise SystemExit(f"Failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
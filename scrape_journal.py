@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Append-only checkpoint journal of a scrape, one per service
+(.cache/scrape/<service>.jsonl by default):
+
+    {"journal": 1, "service": "marine", "base": "https://www.defensie.nl", "params": {...}}
+    {"page": "https://.../zr-ms-tromp", "title": "Zr.Ms. Tromp", "asset": "zr-ms-tromp",
+     "image": {"source_url": ..., "source_sha256": ..., "params": ..., "output_sha256": ...}}
+    ...
+
+The first line says what the crawl was (site root, image parameters); every
+other line is one finished page, with the image-manifest entry of its jpg
+(see image_store.py; null when the page had no image). A line is flushed and
+fsynced as soon as the page is written, so a crash, Ctrl-C or network
+failure loses at most the pages that were in flight.
+
+A run without --resume starts a new journal. With --resume the journal is
+read back (a torn last line from a crash is dropped) and finished pages whose
+jpg is still on disk with the journaled hash are not fetched again. When the
+header differs (other site, size or quality) the old journal is not used.
+"""
+import json, os, threading
+from pathlib import Path
+
+VERSION = 1
+JOURNAL_DIR = ".cache/scrape"
+
+class Journal:
+    def __init__(self, path, header: dict, resume: bool = False):
+        self.path = Path(path)
+        # as it reads back from disk (tuples become lists)
+        self.header = json.loads(json.dumps({"journal": VERSION, **header}))
+        self.done = {}      # page url -> record
+        self.resumed = False
+        self._lock = threading.Lock()
+        valid = self._load() if resume else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if valid is None:
+            self._f = self.path.open("w", encoding="utf-8")
+            self._append(self.header)
+        else:
+            with self.path.open("r+b") as f:
+                f.truncate(valid)  # drop a torn tail, so new lines start clean
+            self._f = self.path.open("a", encoding="utf-8")
+
+    def _load(self):
+        """Reads the journal; returns the length of its intact part, or None to start over."""
+        try:
+            raw = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        *lines, _tail = raw.split(b"\n")  # _tail: "" or an unterminated (torn) line
+        valid, records = 0, {}
+        for n, line in enumerate(lines):
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break
+            if n == 0 and rec != self.header:
+                print(f"⚠️ {self.path}: written by another crawl setup, starting over")
+                return None
+            if n > 0:
+                records[rec["page"]] = rec
+            valid += len(line) + 1
+        if not valid:
+            return None
+        self.done, self.resumed = records, True
+        return valid
+
+    def _append(self, rec: dict) -> None:
+        with self._lock:
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def add(self, page: str, title: str, asset: str, image) -> dict:
+        rec = {"page": page, "title": title, "asset": asset, "image": image}
+        self._append(rec)
+        with self._lock:
+            self.done[page] = rec
+        return rec
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Per-stage timings and per-URL counters for a scrape run (--metrics).
+
+Recorded:
+- a duration per item per stage: fetch (item page), parse, download (image),
+  decode / resize / encode (measured inside the image worker process), write,
+  and one sample each for the variants and placeholder passes
+- per URL: kind (topic/page/image), status, bytes, seconds, retries, errors
+- per skipped item: service, page, stage and the exception
+
+report() summarizes the stages as count / total / p50 / p95 / max; write()
+stores the report as JSON, or as CSV (one row per stage, then one per URL)
+when the path ends in .csv. With profile=True the run is also profiled with
+cProfile, worker threads included (before Python 3.12 with one profiler per
+thread, merged at the end).
+
+Usage:
+    metrics = Metrics(profile=True)
+    fetch = metrics.stage("fetch", fetch_fn)    # times (and profiles) each call
+    metrics.request(url, "page", status=200, nbytes=..., seconds=...)
+    metrics.write("metrics.json"); metrics.dump_profile("scrape.prof")
+"""
+import cProfile, csv, json, math, pstats, sys, threading, time
+from contextlib import contextmanager
+
+# Before 3.12 a profiler only sees the thread that enabled it; from 3.12 on (sys.monitoring)
+# the main profiler sees every thread and a second active one is an error.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+STAGE_ORDER = ("topic", "fetch", "parse", "download", "decode", "resize", "encode", "write", "variants", "placeholders")
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list: the value at rank ceil(p/100 * n)."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+class Metrics:
+    def __init__(self, profile: bool = False):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.t0 = time.perf_counter()
+        self.samples = {}   # stage -> [seconds]
+        self.urls = {}      # url -> entry
+        self.skipped = []
+        self._profiles = []
+        self.main_profile = cProfile.Profile() if profile else None
+        if self.main_profile:
+            self.main_profile.enable()
+
+    # --- recording ------------------------------------------------------------
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t)
+
+    def _thread_profile(self):
+        p = getattr(self._local, "profile", None)
+        if p is None:
+            p = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(p)
+        return p
+
+    def stage(self, name: str, fn):
+        """fn wrapped so every call is timed under `name` (and profiled when enabled)."""
+        def run(payload):
+            p = self._thread_profile() if self.main_profile and PER_THREAD_PROFILES else None
+            t = time.perf_counter()
+            if p:
+                p.enable()
+            try:
+                return fn(payload)
+            finally:
+                if p:
+                    p.disable()
+                self.add(name, time.perf_counter() - t)
+        return run
+
+    def _url(self, url: str, kind: str) -> dict:
+        e = self.urls.get(url)
+        if e is None:
+            e = self.urls[url] = {"url": url, "kind": kind, "status": None, "bytes": 0, "seconds": 0.0,
+                                  "requests": 0, "retries": 0, "errors": 0, "error": None}
+        return e
+
+    def request(self, url: str, kind: str, status=None, nbytes: int = 0, seconds: float = 0.0) -> None:
+        with self._lock:
+            e = self._url(url, kind)
+            e["requests"] += 1
+            e["status"] = status
+            e["bytes"] += nbytes
+            e["seconds"] += seconds
+
+    def failure(self, url: str, kind: str, exc: BaseException, retry: bool) -> None:
+        with self._lock:
+            e = self._url(url, kind)
+            e["errors"] += 1
+            e["retries"] += int(retry)
+            e["status"] = getattr(getattr(exc, "response", None), "status_code", None)
+            e["error"] = f"{type(exc).__name__}: {exc}"
+
+    def skip(self, service: str, job: dict, stage: str, exc: BaseException) -> None:
+        with self._lock:
+            self.skipped.append({"service": service, "i": job.get("i"), "page": job.get("page"),
+                                 "stage": stage, "error": f"{type(exc).__name__}: {exc}"})
+
+    # --- output ---------------------------------------------------------------
+
+    def report(self) -> dict:
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self.samples.items()}
+            urls = sorted(self.urls.values(), key=lambda e: (e["kind"], e["url"]))
+            skipped = list(self.skipped)
+        order = [s for s in STAGE_ORDER if s in samples] + sorted(set(samples) - set(STAGE_ORDER))
+        stages = {}
+        for name in order:
+            v = samples[name]
+            stages[name] = {
+                "count": len(v),
+                "total_s": round(sum(v), 4),
+                "p50_ms": round(percentile(v, 50) * 1000, 2),
+                "p95_ms": round(percentile(v, 95) * 1000, 2),
+                "max_ms": round(v[-1] * 1000, 2),
+            }
+        nbytes = {}
+        for e in urls:
+            nbytes[e["kind"]] = nbytes.get(e["kind"], 0) + e["bytes"]
+        return {
+            "wall_s": round(time.perf_counter() - self.t0, 3),
+            "stages": stages,
+            "bytes": nbytes,
+            "requests": sum(e["requests"] for e in urls),
+            "retries": sum(e["retries"] for e in urls),
+            "errors": sum(e["errors"] for e in urls),
+            "skipped": skipped,
+            "urls": urls,
+        }
+
+    def write(self, path) -> dict:
+        r = self.report()
+        path = str(path)
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["stage", "count", "total_s", "p50_ms", "p95_ms", "max_ms"])
+                for name, s in r["stages"].items():
+                    w.writerow([name, s["count"], s["total_s"], s["p50_ms"], s["p95_ms"], s["max_ms"]])
+                w.writerow([])
+                cols = ["url", "kind", "status", "bytes", "seconds", "requests", "retries", "errors", "error"]
+                w.writerow(cols)
+                for e in r["urls"]:
+                    w.writerow([e[c] if c != "seconds" else round(e[c], 4) for c in cols])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(r, f, indent=2, ensure_ascii=False)
+        return r
+
+    def dump_profile(self, path) -> None:
+        if not self.main_profile:
+            return
+        self.main_profile.disable()
+        stats = pstats.Stats(self.main_profile)
+        for p in self._profiles:
+            stats.add(p)
+        stats.dump_stats(str(path))
+
+def print_summary(r: dict) -> None:
+    print(f"{'stage':<14}{'count':>7}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, s in r["stages"].items():
+        print(f"{name:<14}{s['count']:>7}{s['total_s']:>10.2f}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    kib = ", ".join(f"{k} {v / 1024:.0f} KiB" for k, v in r["bytes"].items())
+    print(f"requests {r['requests']} ({kib}), retries {r['retries']}, errors {r['errors']}, "
+          f"skipped {len(r['skipped'])}, wall {r['wall_s']:.1f}s")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Staged scrape pipeline: every stage has its own worker threads and the
+stages are linked by bounded queues, so page fetches, image downloads and
+resizing overlap instead of running one item at a time.
+
+A HostLimiter caps the number of in-flight requests per host (optionally with
+a minimum spacing between request starts) and replaces a global sleep.
+
+Usage:
+    limiter = HostLimiter(per_host=4)
+    stages = [Stage("fetch", fetch_fn, workers=4), Stage("write", write_fn)]
+    results, errors = run_pipeline(jobs, stages, maxsize=16)
+"""
+import queue, threading, time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+_DONE = object()
+
+class HostLimiter:
+    def __init__(self, per_host: int = 4, delay: float = 0.0):
+        self.per_host = max(1, per_host)
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._sems = {}
+        self._next_start = {}
+
+    def _sem(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._sems:
+                self._sems[host] = threading.BoundedSemaphore(self.per_host)
+            return self._sems[host]
+
+    def _wait_turn(self, host: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlsplit(url).netloc
+        with self._sem(host):
+            if self.delay > 0:
+                self._wait_turn(host)
+            yield
+
+class Stage:
+    def __init__(self, name: str, fn, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+def run_pipeline(jobs, stages, maxsize: int = 16, on_error=None):
+    """
+    Push every job through all stages.
+    Returns (results, errors):
+    - results: [(index, output)] sorted by input index, so output order never
+      depends on thread scheduling
+    - errors: [(index, job, stage_name, exception)] sorted by input index
+    A job that raises in any stage is dropped from the rest of the pipeline.
+    """
+    queues = [queue.Queue(maxsize=max(1, maxsize)) for _ in stages]
+    out_q = queue.Queue()
+    errors = []
+    err_lock = threading.Lock()
+
+    def worker(si: int, stage: Stage, remaining: list):
+        in_q = queues[si]
+        nxt = queues[si + 1] if si + 1 < len(stages) else out_q
+        nxt_workers = stages[si + 1].workers if si + 1 < len(stages) else 1
+        while True:
+            item = in_q.get()
+            if item is _DONE:
+                break
+            idx, job, payload = item
+            try:
+                payload = stage.fn(payload)
+            except Exception as e:
+                with err_lock:
+                    errors.append((idx, job, stage.name, e))
+                if on_error:
+                    on_error(idx, job, stage.name, e)
+                continue
+            nxt.put((idx, job, payload))
+        # last worker of this stage closes the next queue
+        with err_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(nxt_workers):
+                nxt.put(_DONE)
+
+    threads = []
+    for si, stage in enumerate(stages):
+        remaining = [stage.workers]
+        for w in range(stage.workers):
+            t = threading.Thread(target=worker, args=(si, stage, remaining),
+                                 name=f"{stage.name}-{w}", daemon=True)
+            t.start()
+            threads.append(t)
+
+    def feed():
+        for idx, job in enumerate(jobs):
+            queues[0].put((idx, job, job))
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+
+    feeder = threading.Thread(target=feed, name="feed", daemon=True)
+    feeder.start()
+
+    results = []
+    while True:
+        item = out_q.get()
+        if item is _DONE:
+            break
+        idx, _job, payload = item
+        results.append((idx, payload))
+
+    feeder.join()
+    for t in threads:
+        t.join()
+    results.sort(key=lambda r: r[0])
+    errors.sort(key=lambda e: e[0])
+    return results, errors
@@ -1,60 +1,125 @@
 #!/usr/bin/env python3
 """
-Apply classifications from an Excel to app/data.json.
+Apply classifications from an Excel to the app datasets.
 
-Expected Excel headers (row 1):
+Expected Excel headers (row 1 of every sheet):
 - asset
 - answer
 - class
 
+The workbook is streamed (read-only mode) in one pass over all sheets. A sheet
+named after a service (landmacht / luchtmacht / marine) is applied to
+<app>/data/<service>.json; each data file is loaded and saved once. With
+--data only one file is updated, from the sheet named like that file (or the
+active sheet, as before).
+
+A data file is only rewritten when its bytes change; --dry-run prints the
+changes without writing.
+
 Run from repo root, e.g.:
-  python3 tools/apply_classifications.py --xlsx spreadsheets/vehicle_classification_template_filled.xlsx --data app/data.json
+  python3 tools/apply_classifications.py --xlsx spreadsheets/master.xlsx
+  python3 tools/apply_classifications.py --xlsx spreadsheets/vehicle_classification_template_filled.xlsx --data app/data/landmacht.json
 """
-import argparse, json
+import argparse
 from pathlib import Path
 from openpyxl import load_workbook
 
-def load_xlsx(path: Path):
-    wb = load_workbook(path)
-    ws = wb.active
-    headers = [c.value for c in ws[1]]
+from dataset import load as load_dataset
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+HEADERS = ("asset", "answer", "class")
+
+def _cell(row, i) -> str:
+    # in read-only mode rows can be shorter than the header, and cells can be numbers
+    v = row[i] if i < len(row) else None
+    return "" if v is None else str(v).strip()
+
+def read_sheet(ws):
+    """-> {asset: (answer, class)}; later rows win, like the old dict() over all rows."""
+    ws.reset_dimensions()  # don't trust the stored dimension, some writers get it wrong
+    rows = ws.iter_rows(values_only=True)
+    headers = list(next(rows, ()))
     idx = {h:i for i,h in enumerate(headers)}
-    for h in ("asset","answer","class"):
+    for h in HEADERS:
         if h not in idx:
-            raise SystemExit(f"Excel missing header '{h}'. Found: {headers}")
-    rows = []
-    for r in ws.iter_rows(min_row=2, values_only=True):
-        asset = (r[idx["asset"]] or "").strip()
+            raise SystemExit(f"Excel sheet '{ws.title}' missing header '{h}'. Found: {headers}")
+    ia, ians, ik = (idx[h] for h in HEADERS)
+    mapping = {}
+    for r in rows:
+        asset = _cell(r, ia)
         if not asset:
             continue
-        answer = (r[idx["answer"]] or "").strip()
-        klass = (r[idx["class"]] or "").strip()
-        rows.append((asset, answer, klass))
-    return rows
-
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--xlsx", required=True)
-    ap.add_argument("--data", required=True)
-    args = ap.parse_args()
-
-    xlsx = Path(args.xlsx)
-    data_path = Path(args.data)
+        mapping[asset] = (_cell(r, ians), _cell(r, ik))
+    return mapping
 
-    data = json.loads(data_path.read_text(encoding="utf-8"))
-    mapping = {a: (ans, k) for a, ans, k in load_xlsx(xlsx)}
+def load_xlsx(path: Path, titles=None, fallback_active=False):
+    """
+    One streaming pass -> {sheet title: {asset: (answer, class)}}.
+    titles: lower-case sheet titles to read (None = all); other sheets are
+    skipped unread. fallback_active: read the active sheet when none matches.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        wanted = [ws for ws in wb.worksheets if titles is None or ws.title.strip().lower() in titles]
+        if not wanted and fallback_active:
+            wanted = [wb.active]
+        return {ws.title: read_sheet(ws) for ws in wanted}
+    finally:
+        wb.close()
 
+def apply(questions, mapping):
+    """-> (matched, [(asset, (answer, class) before, after)])"""
     updated = 0
-    for q in data.get("questions", []):
+    changes = []
+    for q in questions:
         a = q.get("asset","")
         if a in mapping:
             ans, k = mapping[a]
+            before = (q.get("answer"), q.get("class"))
             if ans: q["answer"] = ans
             if k: q["class"] = k
             updated += 1
+            if (q.get("answer"), q.get("class")) != before:
+                changes.append((a, before, (q.get("answer"), q.get("class"))))
+    return updated, changes
+
+def targets(xlsx: Path, app: Path, data_arg):
+    """-> [(data path, mapping)]"""
+    if data_arg:
+        data_path = Path(data_arg)
+        ((title, mapping),) = load_xlsx(xlsx, {data_path.stem.lower()}, fallback_active=True).items()
+        print(f"Sheet '{title}' -> {data_path}")
+        return [(data_path, mapping)]
+    sheets = load_xlsx(xlsx, set(SERVICES))
+    if not sheets:
+        raise SystemExit(f"No sheet named {' / '.join(SERVICES)} in {xlsx} (use --data for a single file)")
+    return [(app / "data" / f"{title.strip().lower()}.json", mapping) for title, mapping in sheets.items()]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--xlsx", required=True)
+    ap.add_argument("--app", default="app", help="App folder (sheet <service> -> <app>/data/<service>.json)")
+    ap.add_argument("--data", default=None, help="Update only this file")
+    ap.add_argument("--dry-run", action="store_true", help="Only print what would change")
+    args = ap.parse_args()
+
+    for data_path, mapping in targets(Path(args.xlsx), Path(args.app), args.data):
+        if not data_path.exists():
+            print("⚠️ Missing:", data_path)
+            continue
+        data = load_dataset(data_path)
+        updated, changes = apply(data.questions, mapping)
+
+        if args.dry_run:
+            print(f"{data_path}: {len(changes)} of {updated} matched questions would change")
+            for a, (ans0, k0), (ans1, k1) in changes:
+                print(f"  {a}: {ans0!r}/{k0!r} -> {ans1!r}/{k1!r}")
+            continue
 
-    data_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-    print(f"✅ Updated {updated} questions in {data_path}")
+        if data.save():
+            print(f"✅ Updated {updated} questions in {data_path} ({len(changes)} changed)")
+        else:
+            print(f"✔ No changes for {data_path} ({updated} questions matched)")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,35 @@
 #!/usr/bin/env python3
-import json
+"""
+Step 1 ("what is it?"): give every question an allowed category, inferred from
+its name when missing or not in app/data/classification_options.json.
+
+By default each data file is loaded whole (tools/dataset.py) and the report is
+one JSON object. --stream rewrites the files item by item instead
+(tools/json_stream.py: flat memory for very large catalogs) and streams the
+report as JSONL, one {"kind": ..., "service": ..., "id": ...} object per line.
+Both also take the older layouts (iter_items()): a top-level list, a list
+under "items"/"vehicles"/"data"/"records"/"entries", and nested
+{"categories": {bucket: [...]}} buckets.
+
+--jobs N runs the services in a process pool; without --stream large services
+are also cut into --chunk sized pieces (checked, categorized and rendered in
+the workers, put back together in order). The data files and the report are
+the same bytes as with --jobs 1, whatever order the workers finish in.
+
+Run from repo root:
+  python3 tools/apply_step1_categories.py [--services landmacht]
+  python3 tools/apply_step1_categories.py --stream [--report step1.jsonl]
+  python3 tools/apply_step1_categories.py --jobs 0            # one worker per core
+"""
+import argparse, json, os, shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from classify_rules import AIR_CATEGORY_RULES, LAND_CATEGORY_RULES, SEA_CATEGORY_RULES
+from dataset import DatasetError, dumps_parts, from_obj, parse, question_text, records, split
+from jsonio import dumps, write_if_changed
+from json_stream import LIST_KEYS, rewrite_items
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -25,10 +53,6 @@ def load_json(path: Path) -> Any:
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_json(path: Path, obj: Any) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-
 def find_data_dir() -> Path:
     for d in POSSIBLE_DATA_DIRS:
         if d.exists():
@@ -41,91 +65,17 @@ def find_options() -> Dict[str, List[str]]:
             return load_json(p)
     raise FileNotFoundError("classification_options.json not found (looked in data/ and app/data/)")
 
-def get_str_list(item: Dict[str, Any], keys: List[str]) -> List[str]:
-    for k in keys:
-        if k in item and item[k] is not None:
-            v = item[k]
-            if isinstance(v, list):
-                return [str(x) for x in v]
-            if isinstance(v, str):
-                return [s.strip() for s in v.split(",") if s.strip()]
-    return []
-
-def get_str(item: Dict[str, Any], keys: List[str]) -> str:
-    for k in keys:
-        if k in item and isinstance(item[k], str):
-            return item[k]
-    return ""
-
 # --- Heuristics -----------------------------------------------------------
-
-LAND_ARMOURED = {"tank", "ifv", "afv", "armoured", "armored", "tracked", "mbt"}
-LAND_TROOP    = {"apc", "troop", "infantry", "carrier", "transport", "personnel"}
-
-AIR_COMBAT    = {"strike", "air superiority", "cas", "sead", "dead", "fighter", "bomber", "attack"}
-AIR_TRANSPORT = {"airlift", "transport", "medevac", "utility", "cargo", "tanker"}
-AIR_RECON     = {"isr", "recon", "reconnaissance", "ew", "elint", "sigint", "aew", "awacs", "mpa", "maritime patrol"}
-
-SEA_FIGHTING  = {"asuw", "aaw", "asw", "strike", "frigate", "destroyer", "corvette", "submarine"}
-SEA_PATROL    = {"patrol", "mcm", "mine countermeasures", "security", "coast", "interdiction"}
-SEA_SUPPORT   = {"support", "auxiliary", "replenishment", "logistics", "amphib", "lpd", "jss", "tender", "survey", "salvage"}
-
-def normalize_tokens(*parts: List[str]) -> List[str]:
-    tokens: List[str] = []
-    for p in parts:
-        for s in p:
-            tokens.append(str(s).lower().strip())
-    return tokens
+# Keyword tables and the compiled matcher live in classify_rules.py.
 
 def infer_land(item: Dict[str, Any]) -> Tuple[str, str]:
-    type_str = get_str(item, ["type", "vehicleType", "platformType", "class"])
-    roles = get_str_list(item, ["roles", "nato_roles", "natoRoles", "role"])
-    tags  = get_str_list(item, ["tags", "keywords"])
-
-    blob = " ".join(normalize_tokens([type_str], roles, tags))
-
-    if any(k in blob for k in LAND_ARMOURED):
-        return ("Combat vehicle", "high")
-    if any(k in blob for k in LAND_TROOP):
-        return ("Infantry / Troop transport", "high")
-    return ("Support vehicle", "low")
+    return LAND_CATEGORY_RULES.classify(item)
 
 def infer_air(item: Dict[str, Any]) -> Tuple[str, str]:
-    type_str = get_str(item, ["type", "aircraftType", "platformType", "class"])
-    roles = get_str_list(item, ["roles", "nato_roles", "natoRoles", "role"])
-    tags  = get_str_list(item, ["tags", "keywords"])
-
-    blob = " ".join(normalize_tokens([type_str], roles, tags))
-
-    if any(k in blob for k in AIR_COMBAT):
-        return ("Combat", "high")
-    if any(k in blob for k in AIR_TRANSPORT):
-        return ("Transport", "high")
-    if any(k in blob for k in AIR_RECON):
-        return ("Reconnaissance", "high")
-
-    if "fighter" in blob or "attack" in blob or "bomber" in blob:
-        return ("Combat", "medium")
-    if "helicopter" in blob and ("transport" in blob or "utility" in blob):
-        return ("Transport", "medium")
-
-    return ("Reconnaissance", "low")
+    return AIR_CATEGORY_RULES.classify(item)
 
 def infer_sea(item: Dict[str, Any]) -> Tuple[str, str]:
-    type_str = get_str(item, ["type", "shipType", "platformType", "class"])
-    roles = get_str_list(item, ["roles", "nato_roles", "natoRoles", "role"])
-    tags  = get_str_list(item, ["tags", "keywords"])
-
-    blob = " ".join(normalize_tokens([type_str], roles, tags))
-
-    if any(k in blob for k in SEA_FIGHTING):
-        return ("Fighting ship", "high")
-    if any(k in blob for k in SEA_PATROL):
-        return ("Patrol ship", "high")
-    if any(k in blob for k in SEA_SUPPORT):
-        return ("Support ship", "high")
-
-    return ("Support ship", "low")
+    return SEA_CATEGORY_RULES.classify(item)
 
 INFER = {
     "landmacht": infer_land,
@@ -141,13 +91,15 @@ def iter_items(data: Any) -> Tuple[List[Dict[str, Any]], Any, str]:
     - key: the key in owner containing the list, or "" if data is already a list
     Special case:
     - if data contains {"categories": { ... }} then returns ([], data, "categories")
-      and main() will iterate buckets.
+      and the caller iterates the buckets.
+    The datasets themselves ({"questions": [...], ...}) come out as key "questions".
+    tools/json_stream.py picks the list in the same order for --stream.
     """
     if isinstance(data, list):
         return data, data, ""
 
     if isinstance(data, dict):
-        for k in ["items", "vehicles", "data", "records", "entries"]:
+        for k in LIST_KEYS:
             if isinstance(data.get(k), list):
                 return data[k], data, k
 
@@ -161,66 +113,239 @@ def iter_items(data: Any) -> Tuple[List[Dict[str, Any]], Any, str]:
 
     raise ValueError(
         "Unsupported JSON format. Expected list, or dict containing a list under one of "
-        "['items','vehicles','data','records','entries'] or a domain-keyed list."
+        f"{list(LIST_KEYS)} or a domain-keyed list."
     )
 
+REPORT_PATH = ROOT / "tools" / "apply_step1_categories_report.json"
+
+# report section -> the fields of one entry (JSON: a list per entry, JSONL: an object per line)
+REPORT_FIELDS = {
+    "updated": ("service", "id", "category", "confidence"),
+    "already_ok": ("service", "id"),
+    "invalid_fixed": ("service", "id", "old", "category", "confidence"),
+    "low_confidence": ("service", "id", "category"),
+}
+
+class Report:
+    """
+    Collected into one JSON object, or streamed line by line when the path ends
+    in .jsonl. Without a path (in a --jobs worker) the entries are kept in order
+    for the main process to add.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries = [] if path is None else None
+        self.lines = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.lines = path.open("w", encoding="utf-8") if path.suffix == ".jsonl" else None
+        self.sections = {k: [] for k in REPORT_FIELDS}
+
+    def add(self, kind: str, *entry) -> None:
+        if self.entries is not None:
+            self.entries.append((kind, entry))
+        elif self.lines:
+            row = {"kind": kind, **dict(zip(REPORT_FIELDS[kind], entry))}
+            self.lines.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self.sections[kind].append(entry)
+
+    def add_jsonl(self, part: Path) -> None:
+        """Appends the entries of another (.jsonl) report."""
+        with part.open("r", encoding="utf-8") as f:
+            if self.lines:
+                shutil.copyfileobj(f, self.lines)
+                return
+            for line in f:
+                row = json.loads(line)
+                self.add(row["kind"], *(row[k] for k in REPORT_FIELDS[row["kind"]]))
+
+    def close(self) -> None:
+        if self.lines:
+            self.lines.close()
+        else:
+            write_if_changed(self.path, dumps(self.sections))
+
+def categorize(domain: str, allowed: set, it, report: Report) -> bool:
+    """Sets it["category"] unless it already holds an allowed one; True when it changed."""
+    cat = it.get("category")
+    ident = it.get("id", it.get("name", "unknown"))
+
+    if isinstance(cat, str) and cat in allowed:
+        report.add("already_ok", domain, ident)
+        return False
+
+    inferred, conf = INFER[domain](it)
+    it["category"] = inferred
+
+    if isinstance(cat, str) and cat not in allowed:
+        report.add("invalid_fixed", domain, ident, cat, inferred, conf)
+    else:
+        report.add("updated", domain, ident, inferred, conf)
+
+    if conf == "low":
+        report.add("low_confidence", domain, ident, inferred)
+    return True
+
+def process_other(path: Path, data: Any, owner: Any, key: str, domain: str, allowed: set, report: Report) -> bool:
+    """A file in one of the older layouts (see iter_items()): plain objects, written back with jsonio."""
+    lists = [owner] if key == "" else [owner[key]]
+    if key == "categories" and isinstance(owner.get("categories"), dict):
+        lists = [b for b in owner["categories"].values() if isinstance(b, list)]
+    changed = False
+    for items in lists:
+        for it in items:
+            if isinstance(it, dict):
+                changed |= categorize(domain, allowed, it, report)
+    if changed:
+        write_if_changed(path, dumps(data))
+    return changed
+
+def process_loaded(path: Path, domain: str, allowed: set, report: Report) -> bool:
+    data = parse(path.read_bytes())
+    _items, owner, key = iter_items(data)
+    if key != "questions":
+        return process_other(path, data, owner, key, domain, allowed, report)
+    data = from_obj(data, str(path))
+    changed = False
+    for it in data.questions:
+        changed |= categorize(domain, allowed, it, report)
+    if changed:
+        data.save(path)
+    return changed
+
+def process_stream(path: Path, domain: str, allowed: set, report: Report) -> bool:
+    """Item by item into <file>.tmp, renamed over the file when something changed."""
+    changed = False
+
+    def on_item(it: Dict[str, Any]):
+        nonlocal changed
+        if categorize(domain, allowed, it, report):
+            changed = True
+            return it
+        return None
+
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with path.open("r", encoding="utf-8", newline="") as src, \
+             tmp.open("w", encoding="utf-8", newline="") as out:
+            rewrite_items(src, out, on_item)
+        if changed:
+            os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return changed
+
+# --- --jobs: services, and chunks of large ones, in a process pool ---------
+
+CHUNK_ITEMS = 5000
+
+def _categorize_chunk(task) -> tuple:
+    """Worker: check, categorize and render questions[start:start + len(items)] of one service."""
+    domain, allowed, start, items = task
+    report, problems, texts, changed = Report(), [], [], False
+    for q in records(items, start, problems):
+        changed |= categorize(domain, allowed, q, report)
+        texts.append(question_text(q))
+    return texts, changed, report.entries, problems
+
+def process_chunked(pool, targets, report: Report, chunk: int):
+    """Yields (path, changed) per service, in order; results are merged in item order."""
+    loaded, tasks = [], []
+    for domain, path, allowed in targets:
+        data = parse(path.read_bytes())
+        _items, owner, key = iter_items(data)
+        if key != "questions":  # older layouts: small, done here when their turn comes
+            loaded.append((path, (data, owner, key, domain, allowed), 0))
+            continue
+        meta, items = split(data, str(path))
+        starts = range(0, len(items), chunk)
+        tasks += [(domain, allowed, start, items[start:start + chunk]) for start in starts]
+        loaded.append((path, meta, len(starts)))
+    results = pool.map(_categorize_chunk, tasks)
+    for path, meta, n in loaded:
+        if isinstance(meta, tuple):
+            data, owner, key, domain, allowed = meta
+            yield path, process_other(path, data, owner, key, domain, allowed, report)
+            continue
+        parts = [next(results) for _ in range(n)]
+        problems = [p for part in parts for p in part[3]]
+        if problems:
+            raise DatasetError(str(path), problems)
+        for _texts, _changed, entries, _problems in parts:
+            for kind, entry in entries:
+                report.add(kind, *entry)
+        changed = any(part[1] for part in parts)
+        if changed:
+            write_if_changed(path, dumps_parts(meta, [t for part in parts for t in part[0]]))
+        yield path, changed
+
+def _stream_service(task) -> bool:
+    """Worker (--stream --jobs): one whole service, its report entries into a .jsonl part."""
+    domain, path, allowed, part = task
+    report = Report(part)
+    try:
+        return process_stream(path, domain, allowed, report)
+    finally:
+        report.close()
+
+def process_streamed(pool, targets, report: Report):
+    """Yields (path, changed) per service, in order; the parts are appended in that order."""
+    base = report.path or REPORT_PATH
+    tasks = [(domain, path, allowed, base.with_name(f"{base.name}.{domain}.part.jsonl"))
+             for domain, path, allowed in targets]
+    for (domain, path, allowed, part), changed in zip(tasks, pool.map(_stream_service, tasks)):
+        report.add_jsonl(part)
+        part.unlink()
+        yield path, changed
+
 def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--services", nargs="+", choices=list(FILES), default=list(FILES))
+    ap.add_argument("--report", default=None,
+                    help=f"Report path; .jsonl streams it (default: {REPORT_PATH.name}, .jsonl with --stream)")
+    ap.add_argument("--stream", action="store_true",
+                    help="Rewrite the data files item by item in flat memory (for very large files)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Worker processes (0 = one per core); services, and chunks of large ones, run in parallel")
+    ap.add_argument("--chunk", type=int, default=CHUNK_ITEMS, help="Questions per task with --jobs (not with --stream)")
+    args = ap.parse_args()
+
     data_dir = find_data_dir()
     options = find_options()
+    report_path = Path(args.report) if args.report else REPORT_PATH.with_suffix(".jsonl") if args.stream else REPORT_PATH
+    report = Report(report_path)
+    process = process_stream if args.stream else process_loaded
 
-    report = {"updated": [], "already_ok": [], "invalid_fixed": [], "low_confidence": []}
-
+    targets = []
     for domain, fname in FILES.items():
+        if domain not in args.services:
+            continue
         path = data_dir / fname
         if not path.exists():
             print(f"[WARN] Missing file: {path}")
             continue
-
-        data = load_json(path)
-        items, owner, key = iter_items(data)
-
-        allowed = set(options[domain])
-        changed = False
-
-        def process_items(items_list: List[Dict[str, Any]]) -> None:
-            nonlocal changed
-            for it in items_list:
-                cat = it.get("category")
-                ident = it.get("id", it.get("name", "unknown"))
-
-                if isinstance(cat, str) and cat in allowed:
-                    report["already_ok"].append((domain, ident))
-                    continue
-
-                inferred, conf = INFER[domain](it)
-                it["category"] = inferred
-                changed = True
-
-                if isinstance(cat, str) and cat not in allowed:
-                    report["invalid_fixed"].append((domain, ident, cat, inferred, conf))
-                else:
-                    report["updated"].append((domain, ident, inferred, conf))
-
-                if conf == "low":
-                    report["low_confidence"].append((domain, ident, inferred))
-
-        # Special case: nested buckets under "categories"
-        if key == "categories" and isinstance(owner.get("categories"), dict):
-            for bucket_name, bucket_items in owner["categories"].items():
-                if isinstance(bucket_items, list) and (not bucket_items or isinstance(bucket_items[0], dict)):
-                    process_items(bucket_items)
-        else:
-            process_items(items)
-
-        if changed:
-            save_json(path, data)
-            print(f"[OK] Wrote updated categories to {path}")
-        else:
-            print(f"[OK] No changes needed for {path}")
-
-    report_path = ROOT / "tools" / "apply_step1_categories_report.json"
-    save_json(report_path, report)
+        targets.append((domain, path, set(options[domain])))
+
+    if args.jobs == 1:
+        results = ((path, process(path, domain, allowed, report)) for domain, path, allowed in targets)
+    else:
+        pool = ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count() or 1)
+        results = process_streamed(pool, targets, report) if args.stream \
+            else process_chunked(pool, targets, report, max(1, args.chunk))
+    try:
+        for path, changed in results:
+            if changed:
+                print(f"[OK] Wrote updated categories to {path}")
+            else:
+                print(f"[OK] No changes needed for {path}")
+    finally:
+        if args.jobs != 1:
+            pool.shutdown()
+
+    report.close()
     print(f"[DONE] Report written to {report_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
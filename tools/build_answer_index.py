@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Alias variants and a trigram index for free-text / spoken answers.
+
+Aliases: from each question's answer and its aliases (the scraped and
+hand-written ones, which this tool never edits) this makes normalized
+variants, all lower case ASCII with only letters, digits and single spaces:
+- the part before "(...)", and the part inside when it is a code  ("ah 64", "lpd")
+- without the Dutch type word, and with it in English
+  ("apache gevechtshelikopter" -> "apache", "apache attack helicopter")
+- model numbers written together and alone  ("f 35" -> "f35")
+They are written to "aliasVariants" on the questions in
+app/data/<service>.json, from scratch on every run, so a variant that stops
+qualifying disappears again. A variant is dropped when
+- it would point at two different questions, or
+- it is not distinctive: what is left of it without its name words (type
+  words, generic words such as "amfibisch", and words shared by the answers
+  of several questions, such as "leopard") matches it with a score of
+  MIN_SCORE or more, so a generic query like "helicopter" cannot land on
+  "apache attack helicopter", nor "leopard" on "leopard 1"
+
+Index: compile_index() turns the answers, aliases and variants of a dataset into
+
+    {"v": 1, "aliases": [...], "owner": [question index, ...],
+     "size": [trigram count, ...], "grams": {"f35": [alias index, ...], ...}}
+
+which tools/publish_bundles.py ships in the bundle as "answerIndex".
+matchAnswer() in app.js normalizes the typed or transcribed text the same
+way and scores aliases by shared trigrams (Dice), so matching is a handful
+of dictionary lookups, not a scan over every alias.
+
+Run from repo root:
+  python3 tools/build_answer_index.py [--services landmacht luchtmacht marine]
+"""
+import argparse, json, re, unicodedata
+from pathlib import Path
+
+from dataset import load as load_dataset
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+VERSION = 1  # bump when normalize()/trigrams() change (app.js must match)
+MIN_SCORE = 0.5  # matchAnswer() in app.js accepts from this score
+
+# Dutch type word -> English; longest first so compounds win over their parts
+TYPE_WORDS = {
+    "onbemand verkenningssysteem": "uav",
+    "infanteriegevechtsvoertuig": "infantry fighting vehicle",
+    "pantserwielvoertuig": "wheeled armoured vehicle",
+    "pantserrupsvoertuig": "tracked armoured vehicle",
+    "verkenningsvoertuig": "reconnaissance vehicle",
+    "transporthelikopter": "transport helicopter",
+    "gevechtshelikopter": "attack helicopter",
+    "transportvliegtuig": "transport aircraft",
+    "landingsvaartuig": "landing craft",
+    "transportvoertuig": "transport vehicle",
+    "pantservoertuig": "armoured vehicle",
+    "terreinvoertuig": "off road vehicle",
+    "brandweerwagen": "fire truck",
+    "jachtvliegtuig": "fighter",
+    "patrouilleschip": "patrol vessel",
+    "transportschip": "transport ship",
+    "rupsvoertuig": "tracked vehicle",
+    "bergingstank": "recovery tank",
+    "gevechtstank": "battle tank",
+    "terreinwagen": "off road vehicle",
+    "onderzeeboten": "submarines",
+    "takelwagens": "tow trucks",
+    "mijnenjagers": "minehunters",
+    "helikopter": "helicopter",
+    "motorfiets": "motorcycle",
+    "sleepboten": "tugs",
+    "motorboot": "motorboat",
+    "fregat": "frigate",
+}
+# descriptors that name no vehicle on their own
+GENERIC_WORDS = {
+    "amfibisch", "maritieme", "onbemand", "compact", "zware", "lichte", "uitvoering", "mobiele",
+    "multifunctionele", "speciaal", "zeilend", "en", "de", "op",
+}
+_TYPE_RE = re.compile(r"\b(" + "|".join(re.escape(w) for w in TYPE_WORDS) + r")\b")
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+_MODEL_RE = re.compile(r"\b([a-z]{1,3}) (\d+[a-z]*)\b")   # "f 35", "ah 64", "pc 7"
+_MODEL_TOKEN_RE = re.compile(r"^(?=.*[a-z])(?=.*\d)[a-z0-9]{3,}$")
+
+def normalize(text: str) -> str:
+    """Lower case, accents stripped, anything but [a-z0-9] becomes one space."""
+    t = unicodedata.normalize("NFKD", str(text).lower())
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", t).strip()
+
+def trigrams(norm: str) -> set:
+    p = f" {norm} "
+    return {p[i:i + 3] for i in range(len(p) - 2)}
+
+def _variants(text: str) -> set:
+    raw = str(text).lower()
+    parts = {normalize(raw), normalize(_PAREN_RE.sub(" ", raw))}
+    # "(AH-64)", "(LPD)" on their own; not "(uit dienst)", "(materieel)"
+    parts |= {n for n in map(normalize, _PAREN_RE.findall(raw))
+              if any(c.isdigit() for c in n) or (" " not in n and len(n) <= 5)}
+    out = set()
+    for v in parts:
+        typed = {v, _TYPE_RE.sub(" ", v), _TYPE_RE.sub(lambda m: TYPE_WORDS[m.group(1)], v)}
+        for t in typed:
+            t = " ".join(t.split())
+            out |= {t, _MODEL_RE.sub(r"\1\2", t)}
+    models = set()
+    for v in out:
+        models |= {tok for tok in v.split() if _MODEL_TOKEN_RE.match(tok)}
+    return {v for v in out | models if len(v) >= 2}
+
+def _dice(a: str, b: str) -> float:
+    ga, gb = trigrams(a), trigrams(b)
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+def generic_words(questions) -> set:
+    """Words that do not tell the questions apart: type and generic words, and
+    words in the answers of two or more questions."""
+    out = set(GENERIC_WORDS)
+    for dutch, english in TYPE_WORDS.items():
+        out |= set(dutch.split()) | set(english.split())
+    seen = {}
+    for q in questions:
+        for w in set(normalize(q.get("answer") or "").split()):
+            seen[w] = seen.get(w, 0) + 1
+    return out | {w for w, n in seen.items() if n > 1}
+
+def distinctive(variant: str, generic: set) -> bool:
+    """True when neither the variant without its name words, nor one of those
+    generic words alone, would match it."""
+    rest = [w for w in variant.split() if w in generic]
+    if not rest:
+        return True
+    return all(_dice(g, variant) < MIN_SCORE for g in {" ".join(rest), *rest})
+
+def question_aliases(q: dict) -> set:
+    out = set()
+    for text in [q.get("answer") or ""] + list(q.get("aliases") or []):
+        out |= _variants(text)
+    return out
+
+def build_aliases(questions) -> int:
+    """Set q["aliasVariants"] on every question (dropped when empty); returns how many changed."""
+    own = [question_aliases(q) for q in questions]
+    seen = {}
+    for i, aliases in enumerate(own):
+        for a in aliases:
+            seen.setdefault(a, set()).add(i)
+    generic = generic_words(questions)
+    changed = 0
+    for i, q in enumerate(questions):
+        given = {normalize(a) for a in [q.get("answer") or ""] + list(q.get("aliases") or [])}
+        new = sorted(a for a in own[i] - given if len(seen[a]) == 1 and distinctive(a, generic))
+        old = list(q.get("aliasVariants") or [])
+        if new:
+            q["aliasVariants"] = new
+        elif "aliasVariants" in q:
+            q.pop("aliasVariants")
+        changed += old != new
+    return changed
+
+def compile_index(questions) -> dict:
+    """Trigram index over the normalized aliases (and answers) of questions."""
+    aliases, owner, size, grams = [], [], [], {}
+    for qi, q in enumerate(questions):
+        seen = set()
+        for a in [q.get("answer") or ""] + list(q.get("aliases") or []) + list(q.get("aliasVariants") or []):
+            n = normalize(a)
+            if not n or n in seen:
+                continue
+            seen.add(n)
+            ai = len(aliases)
+            aliases.append(n)
+            owner.append(qi)
+            g = trigrams(n)
+            size.append(len(g))
+            for gram in sorted(g):
+                grams.setdefault(gram, []).append(ai)
+    return {"v": VERSION, "aliases": aliases, "owner": owner, "size": size, "grams": grams}
+
+def match(index: dict, text: str, min_score: float = MIN_SCORE):
+    """Python twin of matchAnswer() in app.js: (question index, alias, score) or None."""
+    q = trigrams(normalize(text))
+    if not q:
+        return None
+    hits = {}
+    for gram in q:
+        for ai in index["grams"].get(gram, ()):
+            hits[ai] = hits.get(ai, 0) + 1
+    best = max(hits.items(), key=lambda kv: 2 * kv[1] / (len(q) + index["size"][kv[0]]), default=None)
+    if best is None:
+        return None
+    score = 2 * best[1] / (len(q) + index["size"][best[0]])
+    return (index["owner"][best[0]], index["aliases"][best[0]], score) if score >= min_score else None
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    args = ap.parse_args()
+
+    for service in args.services:
+        data_path = Path(args.app) / "data" / f"{service}.json"
+        if not data_path.exists():
+            print("⚠️ Missing:", data_path)
+            continue
+        data = load_dataset(data_path)
+        n = build_aliases(data.questions)
+        index = compile_index(data.questions)
+        changed = data.save()
+        kib = len(json.dumps(index, separators=(",", ":"))) / 1024
+        print(f"{'✅ Updated' if changed else '✔ Unchanged'}: {data_path} ({n} questions with new variants, "
+              f"{len(index['aliases'])} aliases, {len(index['grams'])} trigrams, {kib:.1f} KiB index)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Precompute hard distractors for the naming step.
+
+For every question this ranks the other questions of the same service by how
+easily they are confused with it and stores the top ids on the record:
+
+    "distractors": ["af_c-130-hercules-transportvliegtuig_11", ...]
+
+score = name similarity (cosine over hashed character trigrams of the
+normalized answer, see tools/build_answer_index.py)
+      + W_CLASS if the class is the same + W_CATEGORY if the category is the same
+
+The similarity is one matrix product per block of rows (NumPy), so the whole
+dataset is scored at once instead of pair by pair. Questions marked
+duplicateOf and names equal to the right answer are never offered.
+
+app.js takes mcqOptions - 1 of these (shuffled) instead of shuffling every
+name in the dataset; --extra keeps a few more than needed so rounds still vary.
+
+Run from repo root:
+  python3 tools/build_distractors.py [--services landmacht luchtmacht marine] [--extra 3]
+"""
+import argparse, zlib
+from pathlib import Path
+import numpy as np
+
+from build_answer_index import normalize, trigrams
+from dataset import load as load_dataset
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+DIMS = 512           # hashed trigram features
+W_CLASS = 0.5
+W_CATEGORY = 0.25
+DEFAULT_OPTIONS = 6  # app.js default for mcqOptions
+
+def name_vectors(names) -> np.ndarray:
+    """Unit rows of hashed trigram counts."""
+    x = np.zeros((len(names), DIMS), dtype=np.float32)
+    for i, name in enumerate(names):
+        for g in trigrams(normalize(name)):
+            x[i, zlib.crc32(g.encode("utf-8")) % DIMS] += 1
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-9)
+
+def _codes(values) -> np.ndarray:
+    """Equal values -> equal ints; missing values never equal anything."""
+    seen, out = {}, []
+    for i, v in enumerate(values):
+        out.append(seen.setdefault(v, len(seen)) if v else -1 - i)
+    return np.array(out, dtype=np.int64)
+
+def rank_distractors(questions, k: int, max_cells: int = 1 << 22) -> list:
+    """Per question the ids of the k most confusable others (distinct answers), best first."""
+    n = len(questions)
+    answers = [q.get("answer") or "" for q in questions]
+    x = name_vectors(answers)
+    cls = _codes([q.get("class") for q in questions])
+    cat = _codes([q.get("category") for q in questions])
+    ans = _codes([normalize(a) for a in answers])
+    usable = np.array([bool(a and q.get("id")) and not q.get("duplicateOf") for q, a in zip(questions, answers)])
+
+    # a few spare candidates per row: equal answers among them are skipped below
+    take = min(n, 2 * k + 1)
+    block = max(1, min(n, max_cells // max(n, 1)))
+    out = []
+    for start in range(0, n, block):
+        rows = slice(start, min(n, start + block))
+        s = x[rows] @ x.T
+        s += W_CLASS * (cls[rows, None] == cls[None, :])
+        s += W_CATEGORY * (cat[rows, None] == cat[None, :])
+        s[:, ~usable] = -np.inf
+        s[ans[rows, None] == ans[None, :]] = -np.inf  # itself, and anything with the same name
+        top = np.argpartition(-s, take - 1, axis=1)[:, :take] if take < n else np.tile(np.arange(n), (s.shape[0], 1))
+        for r, cand in enumerate(top):
+            cand = cand[np.isfinite(s[r, cand])]
+            # best first; ties by position in the dataset so the output is stable
+            cand = cand[np.lexsort((cand, -s[r, cand]))]
+            ids, names = [], set()
+            for j in cand.tolist():
+                if ans[j] in names:
+                    continue
+                names.add(ans[j])
+                ids.append(questions[j].get("id"))
+                if len(ids) == k:
+                    break
+            out.append(ids)
+    return out
+
+def attach_distractors(questions, ranked) -> int:
+    changed = 0
+    for q, ids in zip(questions, ranked):
+        old = q.get("distractors")
+        if (None if old is None else list(old)) != ids:
+            if ids:
+                q["distractors"] = ids
+            else:
+                q.pop("distractors", None)
+            changed += 1
+    return changed
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--extra", type=int, default=3, help="Distractors kept beyond mcqOptions - 1")
+    args = ap.parse_args()
+
+    for service in args.services:
+        data_path = Path(args.app) / "data" / f"{service}.json"
+        if not data_path.exists():
+            print("⚠️ Missing:", data_path)
+            continue
+        data = load_dataset(data_path)
+        questions = data.questions
+        k = (data.get("mcqOptions") or DEFAULT_OPTIONS) - 1 + args.extra
+        n = attach_distractors(questions, rank_distractors(questions, k))
+        changed = data.save()
+        print(f"{'✅ Updated' if changed else '✔ Unchanged'}: {data_path} ({len(questions)} questions, "
+              f"{k} distractors each, {n} changed)")
+
+if __name__ == "__main__":
+    main()
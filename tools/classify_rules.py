@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Keyword rule data + a compiled rule engine, shared by
+reclassify_nato_air_navy_and_make_theory.py (NATO classes) and
+apply_step1_categories.py (step-1 categories).
+
+A RuleSet is an ordered list of (field, result, keywords). The first rule with
+any keyword occurring as a substring of its field wins, exactly like the old
+chains of `if any(k in t for k in [...])`. Consecutive rules on the same field
+are compiled once into a single prefix-trie regex over all their keywords, and
+the best rule that matches anywhere in the text is the winner.
+
+Usage:
+  from classify_rules import AIR_CLASS_RULES
+  AIR_CLASS_RULES.classify({"answer": "F-35 Lightning II"})   # "Fighter Aircraft"
+  AIR_CLASS_RULES.classify_many(questions)                     # list of results
+"""
+import hashlib, json, re
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+def norm(s: str) -> str:
+    # same result as re.sub(r"\s+", " ", s).strip().lower(), without the regex
+    return " ".join((s or "").split()).lower()
+
+def _trie_regex(rules: Sequence[Sequence[str]]) -> Tuple["re.Pattern", List[int]]:
+    """
+    One prefix trie over the keywords of all rules, as a regex. Every keyword
+    ends in an empty marker group; returns (pattern, rule index per group).
+    Below a keyword of rule r only keywords of better rules (< r) are kept,
+    so at any start position the match found is the best rule starting there.
+    """
+    trie: Dict[str, Any] = {}
+    for ri, kws in enumerate(rules):
+        for w in kws:
+            node = trie
+            for ch in w:
+                node = node.setdefault(ch, {})
+            node[""] = min(node.get("", ri), ri)
+
+    marks: List[int] = []
+
+    def walk(node: Dict[str, Any], limit: int):
+        end = node.get("")
+        if end is not None and end >= limit:
+            end = None
+        alts = []
+        for ch in sorted(k for k in node if k):
+            body = walk(node[ch], limit if end is None else end)
+            if body is not None:
+                alts.append(re.escape(ch) + body)
+        if end is not None:
+            marks.append(end)
+            alts.append("()")  # tried last: longer keywords of better rules win
+        if not alts:
+            return None
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return re.compile(walk(trie, len(rules)) or "(?!)"), marks
+
+class _Group:
+    """
+    Consecutive rules on one field. patterns[k] covers rules 0..k-1: a leftmost
+    search over all rules, then a search over only the rules above the current
+    best, until nothing better is left (usually one or two C-level scans).
+    """
+    def __init__(self, field: str, rules: List[Tuple[Any, Sequence[str]]]):
+        self.field = field
+        self.results = [r for r, _ in rules]
+        kws = [k for _, k in rules]
+        self.patterns = [None] + [_trie_regex(kws[:k]) for k in range(1, len(kws) + 1)]
+
+    def match(self, text: str):
+        best = len(self.results)
+        while best:
+            pattern, marks = self.patterns[best]
+            m = pattern.search(text)
+            if m is None:
+                break
+            best = marks[m.lastindex - 1]
+        return self.results[best] if best < len(self.results) else None
+
+class RuleSet:
+    def __init__(self, name: str, rules: Sequence[Tuple[str, Any, Sequence[str]]], default: Any,
+                 fields: Dict[str, Callable[[Dict[str, Any]], str]]):
+        """
+        rules: [(field, result, keywords)] in priority order
+        fields: {field: record -> normalized text}; only called once a rule on
+                that field is reached
+        """
+        self.name = name
+        self.default = default
+        self.fields = fields
+        # changes whenever the rule data does; part of every classification fingerprint
+        spec = json.dumps([name, [list(r) for r in rules], default], ensure_ascii=False, sort_keys=True)
+        self.version = hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+        runs: List[Tuple[str, list]] = []
+        for field, result, kws in rules:
+            if not runs or runs[-1][0] != field:
+                runs.append((field, []))
+            runs[-1][1].append((result, kws))
+        self.groups = [_Group(field, group_rules) for field, group_rules in runs]
+
+    def classify(self, record: Dict[str, Any]) -> Any:
+        for g in self.groups:
+            text = self.fields[g.field](record)
+            if text:
+                hit = g.match(text)
+                if hit is not None:
+                    return hit
+        return self.default
+
+    def classify_many(self, records) -> List[Any]:
+        classify = self.classify
+        return [classify(r) for r in records]
+
+# --- NATO classes (reclassify_nato_air_navy_and_make_theory.py) -----------
+
+_QUESTION_FIELDS = {
+    "answer": lambda q: norm(q.get("answer", "")),
+    "source_page": lambda q: norm(q.get("source_page", "")),
+}
+
+AIR_CLASS_RULES = RuleSet("air-class", [
+    ("answer", "Uncrewed Aerial System (UAS)", ["drone", "onbemand", "onbemande", "uav", "uas", "mq-9", "mq9", "reaper"]),
+    ("answer", "Helicopter", ["helikopter", "helicopter", "apache", "chinook", "nh90", "cougar"]),
+    ("answer", "Trainer Aircraft", ["lesvliegtuig", "trainer", "training", "pc-7", "pc7", "pilatus"]),
+    ("answer", "Fighter Aircraft", ["jachtvliegtuig", "fighter", "f-35", "f35", "f-16", "f16"]),
+    ("answer", "Transport Aircraft", ["transport", "transportvliegtuig", "tanker", "tankvliegtuig", "kdc-10", "kdc10", "a330", "mrt", "mrt t", "c-130", "c130", "hercules", "gulfstream"]),
+    ("source_page", "Fighter Aircraft", ["f-35", "f-16"]),
+    ("source_page", "Helicopter", ["apache", "chinook", "nh90", "helikopter"]),
+], "Other", _QUESTION_FIELDS)
+
+NAVY_CLASS_RULES = RuleSet("navy-class", [
+    ("answer", "Submarine", ["onderzeeboot", "submarine", "walrusklasse", "walrus-klasse", "walrus"]),
+    ("answer", "Frigate", ["fregat", "frigate", "zeven provinci", "zevenprovincien", "zeven provinciën", "lcf", "luchtverdedigings- en commandofregat", "m-fregat", "multipurpose fregat"]),
+    ("answer", "Patrol Vessel", ["patrouille", "patrol", "opv", "hollandklasse", "holland-klasse", "offshore patrol"]),
+    ("answer", "Amphibious Ship", ["amfib", "amphib", "landingsschip", "landing platform", "rotterdam", "johan de witt", "johan-de-witt"]),
+    ("answer", "Mine Countermeasures Vessel", ["mijnenjager", "mijnenbestr", "mine counter", "mcm", "alkmaar", "alkmaarklasse", "alkmaar-klasse"]),
+    ("answer", "Support Vessel", ["bevoorrad", "support", "ondersteun", "tanker", "logistiek", "karel doorman", "doorman", "combat support", "hydrograf", "sleepboot", "hulpvaartuig"]),
+    ("source_page", "Submarine", ["onderzeeboot"]),
+    ("source_page", "Frigate", ["fregat", "lcf"]),
+    ("source_page", "Patrol Vessel", ["opv", "patrouille"]),
+    ("source_page", "Mine Countermeasures Vessel", ["mijnen"]),
+], "Other", _QUESTION_FIELDS)
+
+# --- step-1 categories (apply_step1_categories.py) ------------------------
+
+LAND_ARMOURED = {"tank", "ifv", "afv", "armoured", "armored", "tracked", "mbt"}
+LAND_TROOP    = {"apc", "troop", "infantry", "carrier", "transport", "personnel"}
+
+AIR_COMBAT    = {"strike", "air superiority", "cas", "sead", "dead", "fighter", "bomber", "attack"}
+AIR_TRANSPORT = {"airlift", "transport", "medevac", "utility", "cargo", "tanker"}
+AIR_RECON     = {"isr", "recon", "reconnaissance", "ew", "elint", "sigint", "aew", "awacs", "mpa", "maritime patrol"}
+
+SEA_FIGHTING  = {"asuw", "aaw", "asw", "strike", "frigate", "destroyer", "corvette", "submarine"}
+SEA_PATROL    = {"patrol", "mcm", "mine countermeasures", "security", "coast", "interdiction"}
+SEA_SUPPORT   = {"support", "auxiliary", "replenishment", "logistics", "amphib", "lpd", "jss", "tender", "survey", "salvage"}
+
+def get_str_list(item: Dict[str, Any], keys: List[str]) -> List[str]:
+    for k in keys:
+        if k in item and item[k] is not None:
+            v = item[k]
+            if isinstance(v, list):
+                return [str(x) for x in v]
+            if isinstance(v, str):
+                return [s.strip() for s in v.split(",") if s.strip()]
+    return []
+
+def get_str(item: Dict[str, Any], keys: List[str]) -> str:
+    for k in keys:
+        if k in item and isinstance(item[k], str):
+            return item[k]
+    return ""
+
+def _blob(type_keys: List[str]) -> Dict[str, Callable[[Dict[str, Any]], str]]:
+    def blob(item: Dict[str, Any]) -> str:
+        parts = [get_str(item, type_keys)]
+        parts += get_str_list(item, ["roles", "nato_roles", "natoRoles", "role"])
+        parts += get_str_list(item, ["tags", "keywords"])
+        return " ".join(str(s).lower().strip() for s in parts)
+    return {"blob": blob}
+
+LAND_CATEGORY_RULES = RuleSet("land-category", [
+    ("blob", ("Combat vehicle", "high"), sorted(LAND_ARMOURED)),
+    ("blob", ("Infantry / Troop transport", "high"), sorted(LAND_TROOP)),
+], ("Support vehicle", "low"), _blob(["type", "vehicleType", "platformType", "class"]))
+
+AIR_CATEGORY_RULES = RuleSet("air-category", [
+    ("blob", ("Combat", "high"), sorted(AIR_COMBAT)),
+    ("blob", ("Transport", "high"), sorted(AIR_TRANSPORT)),
+    ("blob", ("Reconnaissance", "high"), sorted(AIR_RECON)),
+], ("Reconnaissance", "low"), _blob(["type", "aircraftType", "platformType", "class"]))
+
+SEA_CATEGORY_RULES = RuleSet("sea-category", [
+    ("blob", ("Fighting ship", "high"), sorted(SEA_FIGHTING)),
+    ("blob", ("Patrol ship", "high"), sorted(SEA_PATROL)),
+    ("blob", ("Support ship", "high"), sorted(SEA_SUPPORT)),
+], ("Support ship", "low"), _blob(["type", "shipType", "platformType", "class"]))
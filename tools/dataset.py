@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+The one loader for app/data/<service>.json, shared by the tools.
+
+load(path) parses a dataset once (orjson when it is installed, else json) and
+turns every question into a Question record in the same pass:
+- known fields live in __slots__ (no per-question dict); anything else is kept
+  in a small `extra` dict, so unknown keys survive
+- class and category strings are interned, so 100k questions share a handful
+  of str objects; distractors reuse the id strings of the questions they
+  point at; aliases and distractors are tuples
+- each record remembers its key order (one shared tuple per distinct order),
+  so save() writes the same bytes as jsonio.dumps() of the original dict
+- the schema is checked while the records are built (types of the known
+  fields, required id/asset, unique ids, the class list); problems raise
+  DatasetError, or are kept on .problems with strict=False
+
+Questions and the Dataset behave like the dicts the tools used before
+(q.get("class"), q["category"] = ..., data.get("mcqOptions"), ...), and
+Dataset.classes hides that landmacht calls its class list "vehicleClasses"
+where the other services use "classes".
+
+Run from repo root (validate, and check the round-trip is byte-identical):
+  python3 tools/dataset.py [--services landmacht luchtmacht marine]
+"""
+import argparse, json, sys
+from pathlib import Path
+
+from jsonio import dumps, write_if_changed
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib parser gives the same objects, slower
+    orjson = None
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+BACKEND = "orjson" if orjson else "json"
+MAX_REPORTED = 20
+
+STR, OPT_STR, STR_LIST, OBJECT = "string", "string or null", "list of strings", "object"
+
+# json key -> (slot, expected type, interned)
+FIELDS = {
+    "id": ("id", STR, False),
+    "asset": ("asset", STR, False),
+    "class": ("cls", STR, True),
+    "answer": ("answer", STR, False),
+    "aliases": ("aliases", STR_LIST, False),
+    "aliasVariants": ("alias_variants", STR_LIST, False),   # generated (tools/build_answer_index.py)
+    "category": ("category", OPT_STR, True),
+    "source_page": ("source_page", STR, False),
+    "lqip": ("lqip", OBJECT, False),   # {"src": data URI, "width", "height"}
+    "distractors": ("distractors", STR_LIST, False),
+    "duplicateOf": ("duplicate_of", STR, False),
+    "variants": ("variants", OBJECT, False),   # {"widths": [...], "formats": [...], "original"} (image_variants.py)
+}
+REQUIRED = ("id", "asset")
+CLASS_KEYS = ("vehicleClasses", "classes")
+INT_KEYS = ("quizLength", "mcqOptions")
+
+_ORDERS = {}  # key order tuple -> the shared instance
+
+def _order(keys: tuple) -> tuple:
+    return _ORDERS.setdefault(keys, keys)
+
+def _bad(value, kind: str) -> bool:
+    if kind == STR:
+        return not isinstance(value, str)
+    if kind == OPT_STR:
+        return value is not None and not isinstance(value, str)
+    if kind == OBJECT:
+        return not isinstance(value, dict)
+    return not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value)
+
+def _coerce(key: str, value):
+    if key in ("aliases", "aliasVariants", "distractors") and isinstance(value, list):
+        return tuple(value)
+    if key in ("class", "category") and isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+class DatasetError(ValueError):
+    def __init__(self, where, problems):
+        self.where, self.problems = where, problems
+        more = f"\n  ... and {len(problems) - MAX_REPORTED} more" if len(problems) > MAX_REPORTED else ""
+        super().__init__(f"{where}: {len(problems)} schema problem(s)\n  " + "\n  ".join(problems[:MAX_REPORTED]) + more)
+
+class Question:
+    __slots__ = tuple(slot for slot, _k, _i in FIELDS.values()) + ("extra", "_keys")
+
+    def __init__(self, fields=None):
+        self.extra = None
+        self._keys = ()
+        for k, v in (fields or {}).items():
+            self[k] = v
+
+    @classmethod
+    def from_dict(cls, d: dict, where: str, problems: list) -> "Question":
+        """Builds the record and checks the known fields on the way."""
+        q = cls.__new__(cls)
+        q.extra = None
+        for k, v in d.items():
+            f = FIELDS.get(k)
+            if f is None:
+                if q.extra is None:
+                    q.extra = {}
+                q.extra[k] = v
+                continue
+            slot, kind, interned = f
+            if _bad(v, kind):
+                problems.append(f"{where}.{k}: expected {kind}, got {type(v).__name__}")
+            elif kind == STR_LIST:
+                v = tuple(v)
+            elif interned and v is not None:
+                v = sys.intern(v)
+            setattr(q, slot, v)
+        for k in REQUIRED:
+            if not d.get(k):
+                problems.append(f"{where}: missing {k}")
+        q._keys = _order(tuple(d))
+        return q
+
+    # --- dict-style access (what the tools used before) ------------------------
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        f = FIELDS.get(key)
+        return getattr(self, f[0]) if f else self.extra[key]
+
+    def get(self, key, default=None):
+        return self[key] if key in self._keys else default
+
+    def __setitem__(self, key, value) -> None:
+        f = FIELDS.get(key)
+        if f:
+            setattr(self, f[0], _coerce(key, value))
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        if key not in self._keys:
+            self._keys = _order(self._keys + (key,))
+
+    def setdefault(self, key, default=None):
+        if key not in self._keys:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self._keys:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        f = FIELDS.get(key)
+        if f:
+            delattr(self, f[0])
+        else:
+            del self.extra[key]
+            self.extra = self.extra or None
+        self._keys = _order(tuple(k for k in self._keys if k != key))
+        return value
+
+    def keys(self):
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def items(self):
+        return [(k, self[k]) for k in self._keys]
+
+    def to_dict(self) -> dict:
+        return {k: self[k] for k in self._keys}
+
+    def __repr__(self) -> str:
+        return f"Question({self.get('id')!r})"
+
+class Dataset:
+    """Top-level keys in file order ("questions" marks where the list goes) + the records."""
+    __slots__ = ("path", "meta", "questions", "problems")
+
+    def __init__(self, meta: dict, questions: list, path=None, problems=None):
+        self.meta, self.questions, self.path = meta, questions, path
+        self.problems = problems or []
+
+    @property
+    def classes_key(self) -> str:
+        return next((k for k in CLASS_KEYS if k in self.meta), "classes")
+
+    @property
+    def classes(self) -> list:
+        return self.meta.get(self.classes_key) or []
+
+    def __contains__(self, key) -> bool:
+        return key in self.meta
+
+    def __getitem__(self, key):
+        return self.questions if key == "questions" and key in self.meta else self.meta[key]
+
+    def get(self, key, default=None):
+        return self[key] if key in self.meta else default
+
+    def __setitem__(self, key, value) -> None:
+        if key == "questions":
+            self.questions = [q if isinstance(q, Question) else Question(q) for q in value]
+            value = None
+        self.meta[key] = value
+
+    def to_dict(self) -> dict:
+        return {k: ([q.to_dict() for q in self.questions] if k == "questions" else v) for k, v in self.meta.items()}
+
+    def dumps(self) -> str:
+        return dumps(self.to_dict())
+
+    def save(self, path=None) -> bool:
+        """Writes only when the bytes change; returns True when written."""
+        return write_if_changed(Path(path or self.path), self.dumps())
+
+def parse(raw):
+    """bytes/str -> plain objects, with the fastest parser available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # NaN, huge ints, ...: let json decide (and word the error)
+    return json.loads(raw)
+
+def _share_ids(questions) -> None:
+    """Distractors point at ids of the same dataset: keep one str object per id."""
+    ids = {}
+    for q in questions:
+        if "id" in q._keys and isinstance(q.id, str):
+            ids[q.id] = q.id
+    for q in questions:
+        if "distractors" in q._keys and isinstance(q.distractors, tuple):
+            q.distractors = tuple(ids.get(d, d) for d in q.distractors)
+
+def _top(data, where: str, problems: list):
+    """Top level of a parsed dataset -> (meta with "questions" -> None, the raw question list)."""
+    if not isinstance(data, dict):
+        raise DatasetError(where, [f"expected an object at the top, got {type(data).__name__}"])
+    meta, items = {}, []
+    for k, v in data.items():
+        if k == "questions":
+            if isinstance(v, list):
+                items = v
+            else:
+                problems.append(f"questions: expected list, got {type(v).__name__}")
+            v = None
+        elif k in CLASS_KEYS:
+            if _bad(v, STR_LIST):
+                problems.append(f"{k}: expected {STR_LIST}")
+            else:
+                v = [sys.intern(c) for c in v]
+        elif k in INT_KEYS and (not isinstance(v, int) or isinstance(v, bool)):
+            problems.append(f"{k}: expected int, got {type(v).__name__}")
+        meta[k] = v
+    if "questions" not in meta:
+        problems.append("questions: missing")
+    return meta, items
+
+def _check_ids(items, problems: list) -> None:
+    seen = set()
+    for i, d in enumerate(items):
+        qid = d.get("id") if isinstance(d, dict) else None
+        if isinstance(qid, str) and qid:
+            if qid in seen:
+                problems.append(f"questions[{i}]: duplicate id {qid!r}")
+            seen.add(qid)
+
+def records(items, start: int, problems: list) -> list:
+    """Question records for items[...] that start at index `start` of the dataset."""
+    out = []
+    for i, d in enumerate(items, start):
+        if isinstance(d, dict):
+            out.append(Question.from_dict(d, f"questions[{i}]", problems))
+        else:
+            problems.append(f"questions[{i}]: expected object, got {type(d).__name__}")
+    return out
+
+def from_obj(data, where: str = "<data>", strict: bool = True) -> Dataset:
+    problems = []
+    meta, items = _top(data, where, problems)
+    questions = records(items, 0, problems)
+    _check_ids(items, problems)
+    _share_ids(questions)
+    if problems and strict:
+        raise DatasetError(where, problems)
+    return Dataset(meta, questions, problems=problems)
+
+def split(data, where: str = "<data>"):
+    """
+    (meta, raw question list) with everything but the questions themselves
+    checked; for tools that hand the questions to workers in chunks
+    (records() there, dumps_parts() to put the file back together).
+    """
+    problems = []
+    meta, items = _top(data, where, problems)
+    _check_ids(items, problems)
+    if problems:
+        raise DatasetError(where, problems)
+    return meta, items
+
+_PLACEHOLDER = "\0questions\0"
+
+def question_text(q) -> str:
+    """One question as jsonio.dumps() writes it inside a dataset."""
+    return "    " + dumps(q.to_dict() if isinstance(q, Question) else q).replace("\n", "\n    ")
+
+def dumps_parts(meta: dict, texts) -> str:
+    """Same as jsonio.dumps() of the dataset, with the questions already rendered by question_text()."""
+    text = dumps({k: (_PLACEHOLDER if k == "questions" else v) for k, v in meta.items()})
+    body = "[\n" + ",\n".join(texts) + "\n  ]" if texts else "[]"
+    return text.replace(dumps(_PLACEHOLDER), body, 1)
+
+def loads(raw, where: str = "<data>", strict: bool = True) -> Dataset:
+    return from_obj(parse(raw), where, strict)
+
+def load(path, strict: bool = True) -> Dataset:
+    path = Path(path)
+    ds = loads(path.read_bytes(), str(path), strict)
+    ds.path = path
+    return ds
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    args = ap.parse_args()
+
+    ok = True
+    for service in args.services:
+        path = Path(args.app) / "data" / f"{service}.json"
+        if not path.exists():
+            print("⚠️ Missing:", path)
+            continue
+        ds = load(path, strict=False)
+        for p in ds.problems[:MAX_REPORTED]:
+            print(f"❌ {path}: {p}")
+        same = ds.dumps().encode("utf-8") == path.read_bytes()
+        if not same:
+            print(f"⚠️ {path}: does not round-trip byte for byte (not written by jsonio.dumps?)")
+        ok &= not ds.problems
+        print(f"{'✅' if not ds.problems and same else '⚠️'} {path}: {len(ds.questions)} questions, "
+              f"{len(ds.classes)} {ds.classes_key}, {len(ds.problems)} problems ({BACKEND})")
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Find duplicate and near-duplicate photos across app/images/<service>/ with
+perceptual hashes, and report them as clusters.
+
+Per image three 64-bit hashes are computed (in a process pool, JPEG draft
+decode, cached in .cache/imagehash.json on size+mtime):
+- aHash: 8x8 grey, bit = pixel > mean
+- dHash: 9x8 grey, bit = pixel > right neighbour
+- pHash: 32x32 grey -> 2D DCT -> top-left 8x8, bit = coefficient > median
+
+Pairs within --threshold bits on the chosen hash (pHash by default) are found
+with a blocked NumPy search: a block of rows is XORed against all later
+hashes at once and popcounted, so there is no per-pair Python loop and memory
+stays at block x n. Pairs are joined into clusters (union-find); per cluster
+the largest image is the keeper.
+
+With --apply, each service keeps one image of a cluster: the cluster's keeper
+when it is in that service, else the largest of the service's own members.
+The other members in that service get "duplicateOf": "<that asset>" on their
+question (and stale marks are cleared); the app leaves those out of the quiz
+pool. A cluster's members in another service are never marked against it, as
+every service's quiz needs its own copy.
+
+Run from repo root:
+  python3 tools/find_near_duplicates.py [--threshold 10] [--hash phash] [--apply]
+"""
+import argparse, json, os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+from dataset import load as load_dataset
+from jsonio import dumps
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+HASHES = ("ahash", "dhash", "phash")
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+CACHE_PATH = Path(".cache/imagehash.json")
+REPORT_PATH = Path("tools/near_duplicates_report.json")
+VERSION = 1  # bump when a hash definition changes
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+_DCT32 = _dct_matrix(32)
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel().astype(np.uint8)).tobytes(), "big")
+
+def _grey(im: Image.Image, size) -> np.ndarray:
+    return np.asarray(im.resize(size, Image.Resampling.BILINEAR), dtype=np.float32)
+
+def image_hashes(path: str) -> dict:
+    """Runs in a worker process: {"ahash": int, "dhash": int, "phash": int, "pixels": w*h}."""
+    with Image.open(path) as im:
+        pixels = im.width * im.height
+        im.draft("L", (64, 64))
+        im = im.convert("L")
+        a = _grey(im, (8, 8))
+        d = _grey(im, (9, 8))
+        p = _grey(im, (32, 32))
+    coeffs = (_DCT32 @ p @ _DCT32.T)[:8, :8]
+    low = coeffs.ravel()[1:]  # the DC term says nothing about structure
+    return {
+        "ahash": _bits_to_int(a > a.mean()),
+        "dhash": _bits_to_int(d[:, 1:] > d[:, :-1]),
+        "phash": _bits_to_int(coeffs > np.median(low)),
+        "pixels": pixels,
+    }
+
+# --- search -------------------------------------------------------------------
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:  # NumPy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return _POP8[x.view(np.uint8)].reshape(*x.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+def near_pairs(hashes: np.ndarray, threshold: int, max_cells: int = 1 << 23):
+    """
+    All (i, j, distance) with i < j and Hamming distance <= threshold.
+    hashes: uint64 array. Work is O(n^2 / 2) popcounts, done block x n at a time in
+    NumPy; block is sized so one step touches at most max_cells hashes (~9 bytes each).
+    """
+    n = len(hashes)
+    block = max(1, min(n, max_cells // max(n, 1)))
+    ii, jj, dd = [], [], []
+    for start in range(0, n, block):
+        rows = hashes[start:start + block]
+        # only compare against later hashes: the upper triangle
+        rest = hashes[start:]
+        dist = popcount(rows[:, None] ^ rest[None, :])
+        r, c = np.nonzero(dist <= threshold)
+        keep = c > r  # drops self-pairs and pairs inside this block seen twice
+        r, c = r[keep], c[keep]
+        ii.append(r + start)
+        jj.append(c + start)
+        dd.append(dist[r, c])
+    if not ii:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.uint8)
+    return np.concatenate(ii), np.concatenate(jj), np.concatenate(dd)
+
+def clusters(n: int, ii, jj):
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(ii.tolist(), jj.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+# --- images -------------------------------------------------------------------
+
+def image_files(app: Path, services):
+    out = []
+    for service in services:
+        d = app / "images" / service
+        for p in sorted(d.glob("*")) if d.exists() else []:
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTS and not p.name.startswith("."):
+                out.append((service, p))
+    return out
+
+def hash_all(files, workers: int, cache_path: Path = CACHE_PATH) -> list:
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    results, todo = [None] * len(files), []
+    for i, (_service, p) in enumerate(files):
+        st = p.stat()
+        key = [VERSION, st.st_size, st.st_mtime_ns]
+        hit = cache.get(p.as_posix())
+        if hit and hit[0] == key:
+            results[i] = hit[1]
+        else:
+            todo.append((i, p, key))
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(1, len(todo) // (workers * 4))
+            for (i, p, key), h in zip(todo, pool.map(image_hashes, [str(p) for _i, p, _k in todo], chunksize=chunk)):
+                results[i] = h
+                cache[p.as_posix()] = [key, h]
+    live = {p.as_posix() for _s, p in files}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({k: v for k, v in cache.items() if k in live}), encoding="utf-8")
+    return results
+
+def pick_keeper(members: list) -> dict:
+    """The largest image (then the shortest asset name) of cluster members."""
+    return max(members, key=lambda m: (m["pixels"], -len(m["asset"])))
+
+def apply_marks(app: Path, report: dict, services) -> None:
+    """Set "duplicateOf" on the non-keepers, per service; clears marks that no longer hold."""
+    marks = {s: {} for s in services}
+    for c in report["clusters"]:
+        by_service = {}
+        for m in c["members"]:
+            by_service.setdefault(m["service"], []).append(m)
+        for service, members in by_service.items():
+            if service not in marks:
+                continue
+            # {landmacht/a, landmacht/b} with keeper marine/c still keeps one of a and b
+            keep = c["keep"] if c["keep"]["service"] == service else pick_keeper(members)
+            for m in members:
+                if m["asset"] != keep["asset"]:
+                    marks[service][m["asset"]] = keep["asset"]
+    for service in services:
+        data_path = app / "data" / f"{service}.json"
+        if not data_path.exists():
+            continue
+        data = load_dataset(data_path)
+        n = 0
+        for q in data.questions:
+            dup = marks[service].get(q.get("asset"))
+            if dup:
+                q["duplicateOf"] = dup
+                n += 1
+            else:
+                q.pop("duplicateOf", None)
+        changed = data.save()
+        print(f"{'✅ Updated' if changed else '✔ Unchanged'}: {data_path} ({n} marked as duplicate)")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--hash", choices=HASHES, default="phash", help="Hash used for the search")
+    ap.add_argument("--threshold", type=int, default=10, help="Max differing bits (of 64) for a near-duplicate")
+    ap.add_argument("--workers", type=int, default=0, help="Hashing processes (0 = one per core)")
+    ap.add_argument("--report", default=str(REPORT_PATH))
+    ap.add_argument("--apply", action="store_true", help="Mark duplicates in the datasets (duplicateOf)")
+    args = ap.parse_args()
+    app = Path(args.app)
+
+    files = image_files(app, args.services)
+    print("Images:", len(files))
+    hashes = hash_all(files, args.workers or os.cpu_count() or 1)
+    table = {h: np.array([r[h] for r in hashes], dtype=np.uint64) for h in HASHES}
+
+    ii, jj, _dd = near_pairs(table[args.hash], args.threshold)
+    groups = clusters(len(files), ii, jj)
+
+    def member(i):
+        service, p = files[i]
+        return {"service": service, "asset": p.stem, "path": p.relative_to(app).as_posix(),
+                "pixels": hashes[i]["pixels"]}
+
+    out = []
+    for g in groups:
+        sub = {h: table[h][g] for h in HASHES}
+        # all pairwise distances inside the cluster, per hash
+        dist = {h: popcount(v[:, None] ^ v[None, :]) for h, v in sub.items()}
+        members = [member(i) for i in g]
+        keep = pick_keeper(members)
+        out.append({
+            "keep": {"service": keep["service"], "asset": keep["asset"]},
+            "members": members,
+            "max_distance": {h: int(d.max()) for h, d in dist.items()},
+        })
+    out.sort(key=lambda c: (c["max_distance"][args.hash], c["members"][0]["path"]))
+
+    report = {"hash": args.hash, "threshold": args.threshold, "images": len(files), "clusters": out}
+    Path(args.report).write_text(dumps(report), encoding="utf-8")
+    for c in out:
+        print(f"[{args.hash} ≤ {c['max_distance'][args.hash]}] keep {c['keep']['service']}/{c['keep']['asset']}: "
+              + ", ".join(m["path"] for m in c["members"]))
+    print(f"DONE: {len(out)} clusters, {sum(len(c['members']) - 1 for c in out)} duplicates -> {args.report}")
+
+    if args.apply:
+        apply_marks(app, report, args.services)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Persistent index of the image trees under app/images/.
+
+One entry per image file, keyed by its path:
+
+    "app/images/marine/x.jpg": {"size": 81234, "mtime_ns": ..., "format": "JPEG",
+                                "width": 1200, "height": 800, "valid": true}
+
+Only files whose size or mtime changed since the last scan are opened again,
+and then only the header is read (Image.open is lazy) plus the last bytes of
+the file, so a truncated JPEG/PNG (no end marker) or a file Pillow cannot
+identify is flagged with "valid": false and an "error". --verify also decodes
+the new/changed files fully, which catches corrupt scan data too.
+
+The index lives in .cache/image_index.json; entries of deleted files are
+dropped on every scan.
+
+Run from repo root:
+  python3 tools/image_index.py [--services landmacht marine] [--verify]
+"""
+import argparse, json, os
+from pathlib import Path
+from PIL import Image
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".avif"}
+INDEX_PATH = Path(".cache/image_index.json")
+VERSION = 1  # bump when an entry's fields or the checks change
+
+# format -> marker the file must end with (trailing padding within TAIL bytes is fine)
+END_MARKERS = {"JPEG": b"\xff\xd9", "PNG": b"IEND\xaeB`\x82"}
+TAIL = 64
+
+def _walk(root: Path):
+    """Image files below root (recursive), skipping dot files and dot dirs."""
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except FileNotFoundError:
+        return
+    for e in entries:
+        if e.name.startswith("."):
+            continue
+        if e.is_dir(follow_symlinks=False):
+            yield from _walk(Path(e.path))
+        elif e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTS:
+            yield e
+
+def inspect(path: str, verify: bool = False) -> dict:
+    """Header-only look at one image: format, pixel size, and whether it looks complete."""
+    out = {"format": None, "width": None, "height": None, "valid": False}
+    try:
+        with Image.open(path) as im:
+            out.update(format=im.format, width=im.width, height=im.height)
+            if verify:
+                im.load()
+        marker = END_MARKERS.get(out["format"])
+        if marker:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - TAIL))
+                if marker not in f.read():
+                    raise ValueError(f"truncated {out['format']} (no end marker)")
+        out["valid"] = True
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+class ImageIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            raw = {}
+        self.entries = raw.get("files", {}) if raw.get("version") == VERSION else {}
+        self.checked = 0  # files (re)inspected by the last scan
+
+    def scan(self, roots, verify: bool = False) -> dict:
+        """
+        Bring the index up to date for every image below roots; returns
+        {path: entry} for those files. Entries of other roots are kept.
+        """
+        found, self.checked = {}, 0
+        roots = [Path(r) for r in roots]
+        for root in roots:
+            for e in _walk(root):
+                key = Path(e.path).as_posix()
+                st = e.stat()
+                old = self.entries.get(key)
+                if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    found[key] = old
+                    continue
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                entry.update(inspect(e.path, verify))
+                found[key] = self.entries[key] = entry
+                self.checked += 1
+        prefixes = tuple(r.as_posix().rstrip("/") + "/" for r in roots)
+        for key in [k for k in self.entries if k.startswith(prefixes) and k not in found]:
+            del self.entries[key]
+        return found
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        body = json.dumps({"version": VERSION, "files": self.entries}, sort_keys=True, separators=(",", ":"))
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(body, encoding="utf-8")
+        tmp.replace(self.path)
+
+def invalid(entries: dict) -> dict:
+    return {k: v for k, v in entries.items() if not v["valid"]}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--index", default=str(INDEX_PATH))
+    ap.add_argument("--verify", action="store_true", help="Fully decode new/changed images")
+    args = ap.parse_args()
+
+    index = ImageIndex(args.index)
+    entries = index.scan([Path(args.app) / "images" / s for s in args.services], verify=args.verify)
+    index.save()
+    bad = invalid(entries)
+    for path, e in sorted(bad.items()):
+        print(f"⚠️ Invalid image: {path} ({e.get('error')})")
+    print(f"Images: {len(entries)} ({index.checked} checked, {len(bad)} invalid) -> {args.index}")
+    raise SystemExit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
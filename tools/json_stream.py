@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Rewrite the items of a large JSON document without loading it whole.
+
+rewrite_items(src, out, on_item) reads src in chunks and copies it to out,
+except that every item (an object in an item list) is parsed on its own and
+handed to on_item(item). When on_item returns None the item's text is copied
+as it was; otherwise the returned object is written in its place, indented
+like the text around it (so a file written by jsonio.dumps stays exactly what
+jsonio.dumps would write for the changed document).
+
+Item lists are found the way the tools look for them (iter_items() in
+tools/apply_step1_categories.py), in this order:
+- the document itself, when it is a list (of objects; any other list is
+  copied as it is)
+- the list under "items", "vehicles", "data", "records" or "entries", the
+  first of these keys the document has
+- the first top-level key holding a list of objects ("questions", ...)
+- the buckets of a top-level "categories" object
+  ({"categories": {"Tanks": [...], ...}})
+For an object the keys are scanned once before the rewrite (a key earlier in
+this order may come later in the file), so src must be seekable. An object with none of these raises ValueError.
+
+Only one item plus one chunk is held at a time, so memory stays flat however
+large the file is. Parsing is json's C scanner (raw_decode), per value.
+"""
+import json
+
+CHUNK = 1 << 20
+WS = " \t\r\n"
+LIST_KEYS = ("items", "vehicles", "data", "records", "entries")
+
+class _Reader:
+    def __init__(self, src, out, chunk: int):
+        self.src, self.out, self.chunk = src, out, chunk
+        self.buf, self.pos, self.eof = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        data = self.src.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def ws(self) -> str:
+        """Copies whitespace to out; returns it."""
+        start, seen = self.pos, []
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WS:
+                self.pos += 1
+            seen.append(self.buf[start:self.pos])
+            self.out.write(self.buf[start:self.pos])
+            if self.pos < len(self.buf) or not self.more():
+                return "".join(seen)
+            start = self.pos
+
+    def peek(self) -> str:
+        if self.pos >= len(self.buf) and not self.more():
+            return ""
+        return self.buf[self.pos]
+
+    def punct(self, allowed: str) -> str:
+        c = self.peek()
+        if not c or c not in allowed:
+            raise ValueError(f"expected one of {allowed!r}, got {c!r}")
+        self.out.write(c)
+        self.pos += 1
+        return c
+
+    def value(self):
+        """Decodes the next value; returns (obj, its text)."""
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # a number cut by the chunk end ("2" of "20") decodes too: need a delimiter after it
+            if end < len(self.buf) or not self.more():
+                text = self.buf[self.pos:end]
+                self.pos = end
+                return obj, text
+
+    def copy_value(self):
+        obj, text = self.value()
+        self.out.write(text)
+        return obj
+
+def _reindent(obj, before: str) -> str:
+    if "\n" not in before:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    indent = before.rsplit("\n", 1)[1]
+    return json.dumps(obj, indent=2, ensure_ascii=False).replace("\n", "\n" + indent)
+
+def _items(r: _Reader, on_item) -> int:
+    """At "[" of an item list: copies it through on_item; returns the number of items."""
+    n = 0
+    r.punct("[")
+    before = r.ws()
+    if r.peek() == "]":
+        r.punct("]")
+        return 0
+    while True:
+        item, text = r.value()
+        new = on_item(item) if isinstance(item, dict) else None
+        r.out.write(text if new is None else _reindent(new, before))
+        n += 1
+        r.ws()
+        if r.punct(",]") == "]":
+            return n
+        before = r.ws()
+
+def _starts_item_list(r: _Reader) -> bool:
+    """At "[": is the first element an object? (looks ahead without consuming)"""
+    i = r.pos + 1
+    while True:
+        while i < len(r.buf) and r.buf[i] in WS:
+            i += 1
+        if i < len(r.buf):
+            return r.buf[i] == "{"
+        i -= r.pos
+        if not r.more():
+            return False
+        i += r.pos
+
+def _buckets(r: _Reader, on_item) -> int:
+    n = 0
+    r.punct("{")
+    r.ws()
+    if r.peek() == "}":
+        r.punct("}")
+        return 0
+    while True:
+        r.copy_value()  # bucket name
+        r.ws()
+        r.punct(":")
+        r.ws()
+        if r.peek() == "[" and _starts_item_list(r):
+            n += _items(r, on_item)
+        else:
+            r.copy_value()
+        r.ws()
+        if r.punct(",}") == "}":
+            return n
+        r.ws()
+
+class _Discard:
+    def write(self, text: str) -> None:
+        pass
+
+def _skip(r: _Reader, depth: int) -> None:
+    """Reads past the next value; the first `depth` levels of containers element by element."""
+    c = r.peek()
+    if depth <= 0 or c not in "[{":
+        r.value()
+        return
+    close = "]" if c == "[" else "}"
+    r.punct(c)
+    r.ws()
+    if r.peek() == close:
+        r.punct(close)
+        return
+    while True:
+        if c == "{":
+            r.value()
+            r.ws()
+            r.punct(":")
+            r.ws()
+        _skip(r, depth - 1)
+        r.ws()
+        if r.punct("," + close) == close:
+            return
+        r.ws()
+
+def _pick_key(src, chunk: int):
+    """At the top-level "{": the key whose value holds the items (None: none does)."""
+    r = _Reader(src, _Discard(), chunk)
+    r.ws()
+    r.punct("{")
+    r.ws()
+    if r.peek() == "}":
+        return None
+    named, listed, buckets = {}, None, False
+    while True:
+        key, _ = r.value()
+        r.ws()
+        r.punct(":")
+        r.ws()
+        c = r.peek()
+        if key in LIST_KEYS and c == "[":
+            named.setdefault(key, True)
+            if key == LIST_KEYS[0]:
+                return key
+        elif listed is None and c == "[" and _starts_item_list(r):
+            listed = key
+        elif key == "categories" and c == "{":
+            buckets = True
+        _skip(r, 2)  # categories -> bucket -> items
+        r.ws()
+        if r.punct(",}") == "}":
+            break
+        r.ws()
+    for key in LIST_KEYS:
+        if key in named:
+            return key
+    return listed if listed is not None else "categories" if buckets else None
+
+def rewrite_items(src, out, on_item, chunk: int = CHUNK) -> int:
+    """src/out: text files. Returns the number of items seen."""
+    start = src.tell()
+    r = _Reader(src, out, chunk)
+    r.ws()
+    c = r.peek()
+    if c == "[" and _starts_item_list(r):
+        n = _items(r, on_item)
+    elif c == "{":
+        src.seek(start)
+        pick = _pick_key(src, chunk)
+        if pick is None:
+            raise ValueError("no item list: expected a list under one of "
+                             f"{list(LIST_KEYS)}, a top-level key with a list of objects or a \"categories\" object")
+        src.seek(start)
+        r = _Reader(src, out, chunk)
+        r.ws()
+        n = 0
+        r.punct("{")
+        r.ws()
+        while True:
+            key = r.copy_value()
+            r.ws()
+            r.punct(":")
+            r.ws()
+            if key == pick:
+                n = _buckets(r, on_item) if r.peek() == "{" else _items(r, on_item)
+                pick = None  # a repeated key is copied as it is
+            else:
+                r.copy_value()
+            r.ws()
+            if r.punct(",}") == "}":
+                break
+            r.ws()
+    elif c == "[":
+        r.copy_value()
+        n = 0
+    else:
+        raise ValueError(f"expected a JSON object or list, got {c!r}")
+    r.ws()
+    if r.peek():
+        raise ValueError("extra data after the JSON document")
+    return n
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+JSON helpers shared by the tools: the one serialization every tool uses
+(indent=2, ensure_ascii=False) and a writer that leaves files alone when the
+bytes would not change (no mtime churn, no needless git diffs). A write goes
+to a temporary file next to the target that is then renamed over it, so an
+interrupted run never leaves a half-written file behind.
+"""
+import json, os, threading
+from pathlib import Path
+from typing import Any
+
+def dumps(obj: Any) -> str:
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text (utf-8) to path only if the bytes differ. Returns True when written."""
+    return write_bytes_if_changed(path, text.encode("utf-8"))
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return True
+
+def would_change(path: Path, text: str) -> bool:
+    try:
+        return path.read_bytes() != text.encode("utf-8")
+    except FileNotFoundError:
+        return True
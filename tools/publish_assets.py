@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Fingerprint the app's data files for cache busting.
+
+Every JSON file under app/ (bundles/, data/, theory/, and the patch index and
+patches of tools/publish_deltas.py under deltas/) is copied to a
+content-hashed name
+
+    app/assets/<dir>/<name>.<hash>.<ext>      e.g. assets/bundles/marine.3f2a9c1b0d.json
+
+(the .gz/.br siblings of a bundle go along as <hashed name>.gz/.br) and
+app/manifest.json maps logical names to them:
+
+    {"version": "...", "files": {"bundles/marine.json": "assets/bundles/marine.3f2a9c1b0d.json", ...},
+     "precache": ["assets/bundles/landmacht.….json", ...]}
+
+app.js looks every data URL up in the manifest, so a hashed URL never
+changes content and can be cached for good (by the browser and by sw.js);
+only manifest.json itself is revalidated. Images are not copied: they are
+most of the bytes, hardly ever change under the same name, and would be
+deployed twice. They keep their plain paths (app.js falls back to the path
+itself for anything the manifest does not list) and are revalidated like the
+page shell. "precache" is what the service worker stores up front for
+offline use: the bundles, plus every question image (plain path) with
+--precache-images (images are otherwise cached as they are shown).
+Hashed files no longer in the manifest are removed. Identical content keeps
+its name, so git stores each file once however often this runs.
+
+Run from repo root, after tools/publish_bundles.py (and tools/publish_deltas.py):
+  python3 tools/publish_assets.py [--app app] [--precache-images]
+"""
+import argparse, hashlib, json, shutil
+from pathlib import Path
+
+from jsonio import write_if_changed
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+ASSETS_DIR = "assets"
+SOURCES = ["bundles/*.json", "data/*.json", "theory/*.json", "deltas/*/index.json", "deltas/*/*-*.json"]
+SIBLINGS = (".gz", ".br")
+HASH_LEN = 10
+
+def content_hash(p: Path) -> str:
+    h = hashlib.sha1()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+def logical_files(app: Path):
+    """Sorted logical names ("bundles/marine.json") of everything that gets a hash."""
+    seen = set()
+    for pattern in SOURCES:
+        for p in app.glob(pattern):
+            if not p.is_file() or p.name.startswith(".") or p.suffix.lower() != ".json":
+                continue
+            seen.add(p.relative_to(app).as_posix())
+    return sorted(seen)
+
+def hashed_name(logical: str, digest: str) -> str:
+    path = Path(logical)
+    return (Path(ASSETS_DIR) / path.parent / f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+def place(app: Path, src: Path, rel: str) -> bool:
+    """Copy src to app/rel unless it is already there (same name = same content). True when copied."""
+    dst = app / rel
+    if dst.exists():
+        return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    shutil.copyfile(src, tmp)
+    tmp.replace(dst)
+    return True
+
+def precache_list(app: Path, files: dict, with_images: bool):
+    """The service bundles (data files when a service has no bundle) and, optionally, their images (plain paths)."""
+    out = []
+    for service in SERVICES:
+        key = f"bundles/{service}.json" if f"bundles/{service}.json" in files else f"data/{service}.json"
+        if key not in files:
+            continue
+        out.append(files[key])
+        if with_images:
+            data = json.loads((app / key).read_text(encoding="utf-8"))
+            questions = data.get("questions", []) if isinstance(data, dict) else []
+            for q in questions:
+                img = f"images/{service}/{q.get('asset')}.jpg"
+                if (app / img).is_file():
+                    out.append(img)
+    if (app / "images/missing.jpg").is_file():
+        out.append("images/missing.jpg")
+    return out
+
+def prune(app: Path, keep: set) -> int:
+    removed = 0
+    root = app / ASSETS_DIR
+    if not root.exists():
+        return 0
+    for p in sorted(root.rglob("*"), reverse=True):
+        rel = p.relative_to(app).as_posix()
+        if p.is_file() and rel not in keep:
+            p.unlink()
+            removed += 1
+        elif p.is_dir() and not any(p.iterdir()):
+            p.rmdir()
+    return removed
+
+def publish(app: Path, precache_images: bool = False) -> dict:
+    files, keep, copied = {}, set(), 0
+    for logical in logical_files(app):
+        src = app / logical
+        rel = hashed_name(logical, content_hash(src))
+        files[logical] = rel
+        keep.add(rel)
+        copied += place(app, src, rel)
+        for ext in SIBLINGS:
+            sib = src.with_name(src.name + ext)
+            if sib.exists():
+                # the sibling is derived from src, so it shares src's hash
+                keep.add(rel + ext)
+                copied += place(app, sib, rel + ext)
+    removed = prune(app, keep)
+
+    version = hashlib.sha1(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    manifest = {"version": version, "files": files, "precache": precache_list(app, files, precache_images)}
+    changed = write_if_changed(app / "manifest.json", json.dumps(manifest, ensure_ascii=False, separators=(",", ":")))
+    return {"files": len(files), "copied": copied, "removed": removed, "version": version, "changed": changed}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--precache-images", action="store_true",
+                    help="Let the service worker store every question image up front (full offline use)")
+    args = ap.parse_args()
+    r = publish(Path(args.app), precache_images=args.precache_images)
+    print(f"{'✅ Updated' if r['changed'] else '✔ Unchanged'}: {Path(args.app) / 'manifest.json'} "
+          f"(version {r['version']}, {r['files']} files, {r['copied']} copied, {r['removed']} removed)")
+
+if __name__ == "__main__":
+    main()
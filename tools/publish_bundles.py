@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Publish one minified bundle per service for the web app:
+
+    app/bundles/<service>.json     dataset (questions, classes, ...) + theory + answer index
+    app/bundles/<service>.json.gz
+    app/bundles/<service>.json.br  (only when the brotli module is installed)
+
+The bundle is the dataset from app/data/<service>.json with the theory files
+added under "theory" (app/theory/<service>.json) and "theoryStep1"
+(app/theory/<service>_step1_what.json), when they exist, and the trigram
+index of the answers under "answerIndex" (tools/build_answer_index.py).
+The .gz/.br siblings are for servers that serve precompressed files (nginx gzip_static /
+brotli_static, Caddy precompressed, ...); hosts that compress on the fly just
+use the .json. Compression is deterministic (no timestamps), and nothing is
+rewritten when the bytes are unchanged.
+
+Run from repo root:
+  python3 tools/publish_bundles.py [--services landmacht luchtmacht marine] [--app app]
+"""
+import argparse, gzip, json
+from pathlib import Path
+
+from build_answer_index import compile_index
+from dataset import load as load_dataset
+from jsonio import write_bytes_if_changed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+BUNDLES_DIR = "bundles"
+
+def minify(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def load_optional(p: Path):
+    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
+
+def bundle(app: Path, service: str) -> dict:
+    ds = load_dataset(app / "data" / f"{service}.json")
+    data = ds.to_dict()
+    data["service"] = data.get("service") or service
+    data["theory"] = load_optional(app / "theory" / f"{service}.json")
+    data["theoryStep1"] = load_optional(app / "theory" / f"{service}_step1_what.json")
+    data["answerIndex"] = compile_index(ds.questions)
+    return data
+
+def compressed(raw: bytes) -> dict:
+    out = {".gz": gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out[".br"] = brotli.compress(raw, quality=11)
+    return out
+
+def publish(app: Path, service: str) -> dict:
+    """Writes the bundle and its siblings; returns {file name: size}."""
+    out_dir = app / BUNDLES_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{service}.json"
+    raw = minify(bundle(app, service))
+    files = {path: raw}
+    for ext, blob in compressed(raw).items():
+        files[path.with_name(path.name + ext)] = blob
+    for p, blob in files.items():
+        write_bytes_if_changed(p, blob)
+    if brotli is None:
+        # don't leave an old .br next to a newer bundle
+        path.with_name(path.name + ".br").unlink(missing_ok=True)
+    return {p.name: len(blob) for p, blob in files.items()}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    args = ap.parse_args()
+    app = Path(args.app)
+
+    if brotli is None:
+        print("⚠️ brotli not installed (pip install brotli): writing .gz only")
+    for service in args.services:
+        if not (app / "data" / f"{service}.json").exists():
+            print("⚠️ Missing:", app / "data" / f"{service}.json")
+            continue
+        pretty = [app / "data" / f"{service}.json", *(app / "theory").glob(f"{service}*.json")]
+        before = sum(p.stat().st_size for p in pretty)
+        sizes = publish(app, service)
+        print(f"✅ {service}: " + ", ".join(f"{n} {s / 1024:.1f} KiB" for n, s in sizes.items())
+              + f" (pretty data+theory {before / 1024:.1f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Version the published service bundles and write patches between consecutive
+versions, so a returning client downloads only what changed:
+
+    app/deltas/<service>/index.json     {"service", "file": "bundles/<service>.json", "version": 7,
+                                         "hash", "bytes", "deltas": [{"from": 6, "to": 7, "base",
+                                         "hash", "file": "deltas/<service>/6-7.json", "bytes"}, ...]}
+    app/deltas/<service>/6-7.json       {"from": 6, "to": 7, "base", "hash", "ops": [...]}
+
+Each run compares the hash of app/bundles/<service>.json
+(tools/publish_bundles.py) with the one in index.json; when it differs the
+version goes up by one and a patch from the previous version is written.
+Hashes are of the minified bundle bytes, the same hash tools/publish_assets.py
+names the bundle's copy by, so the previous version is read from that copy
+(app/assets/bundles/<service>.<hash>.json, already deployed; the assets step
+runs after this one and only then drops it). Without it the new version gets
+no patch and clients on older versions fetch the full bundle once.
+
+Patches are JSON-patch style (RFC 6902 add/remove/replace with JSON
+pointers). Lists line up their elements by question id (or by value), so one
+changed classification is one replace op and an inserted question is one add,
+not a rewrite of every question after it. A patch is only written when
+applying it to the previous version gives back the new bundle byte for byte,
+and when it is smaller than the bundle.
+
+app.js keeps the last bundle it loaded, with its version, and follows the
+chain of patches from there (when the chain is complete and smaller than the
+bundle); otherwise it fetches the full bundle. Only the newest --keep patches
+are kept, and a patch is dropped once the chain from it is as large as the
+bundle itself.
+
+Run from repo root, after tools/publish_bundles.py and before tools/publish_assets.py:
+  python3 tools/publish_deltas.py [--services landmacht luchtmacht marine] [--app app] [--keep 20]
+  python3 tools/publish_deltas.py --prune-only --keep 5
+"""
+import argparse, copy, hashlib, json
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from jsonio import dumps, write_bytes_if_changed, write_if_changed
+from publish_assets import hashed_name
+
+SERVICES = ("landmacht", "luchtmacht", "marine")
+DELTAS_DIR = "deltas"
+KEEP = 20
+HASH_LEN = 10
+
+def minify(obj) -> bytes:
+    """The serialization of the bundles (tools/publish_bundles.py)."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()[:HASH_LEN]
+
+# --- patches ----------------------------------------------------------------------
+
+def _pointer(path: str, key) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+def _same(a, b) -> bool:
+    # 1 == 1.0 == True in Python, but not in the file
+    if type(a) is not type(b) or a != b:
+        return False
+    return not isinstance(a, (dict, list)) or minify(a) == minify(b)
+
+def _key(v):
+    """What lines list elements up: a question's id, else the element itself."""
+    if isinstance(v, dict) and isinstance(v.get("id"), str):
+        return "id:" + v["id"]
+    return minify(v)
+
+def _diff_list(a: list, b: list, path: str, ops: list) -> None:
+    matcher = SequenceMatcher(None, [_key(v) for v in a], [_key(v) for v in b], autojunk=False)
+    # from the end, so the indexes of everything before a change are still those of `a`
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            for t in range(i2 - i1):
+                _diff(a[i1 + t], b[j1 + t], _pointer(path, i1 + t), ops)
+            continue
+        for i in range(i2 - 1, i1 - 1, -1):
+            ops.append({"op": "remove", "path": _pointer(path, i)})
+        for t, j in enumerate(range(j1, j2)):
+            ops.append({"op": "add", "path": _pointer(path, i1 + t), "value": b[j]})
+
+def _diff_dict(a: dict, b: dict, path: str, ops: list) -> bool:
+    """False when the key order of b cannot be reached (new keys only ever go last)."""
+    kept = [k for k in a if k in b]
+    added = [k for k in b if k not in a]
+    if kept + added != list(b):
+        return False
+    for k in a:
+        if k not in b:
+            ops.append({"op": "remove", "path": _pointer(path, k)})
+    for k in kept:
+        _diff(a[k], b[k], _pointer(path, k), ops)
+    for k in added:
+        ops.append({"op": "add", "path": _pointer(path, k), "value": b[k]})
+    return True
+
+def _diff(a, b, path: str, ops: list) -> None:
+    if _same(a, b):
+        return
+    sub = []
+    if isinstance(a, dict) and isinstance(b, dict):
+        ok = _diff_dict(a, b, path, sub)
+    elif isinstance(a, list) and isinstance(b, list):
+        _diff_list(a, b, path, sub)
+        ok = True
+    else:
+        ok = False
+    replace = {"op": "replace", "path": path, "value": b}
+    # a container that changed all over is shorter as one replace
+    if ok and len(minify(sub)) < len(minify(replace)):
+        ops += sub
+    else:
+        ops.append(replace)
+
+def diff(a, b) -> list:
+    """Ops that turn a into b (both parsed JSON)."""
+    ops = []
+    _diff(a, b, "", ops)
+    return ops
+
+def apply_patch(doc, ops):
+    """doc with ops applied (in place where possible); the same steps as applyPatch() in app.js."""
+    for op in ops:
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in op["path"].split("/")[1:]]
+        if not parts:
+            doc = op["value"]
+            continue
+        parent = doc
+        for p in parts[:-1]:
+            parent = parent[int(p)] if isinstance(parent, list) else parent[p]
+        last = parts[-1]
+        if isinstance(parent, list):
+            i = int(last)
+            if op["op"] == "add":
+                parent.insert(i, op["value"])
+            elif op["op"] == "remove":
+                del parent[i]
+            else:
+                parent[i] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]  # an existing key keeps its place, a new one goes last
+    return doc
+
+# --- history ----------------------------------------------------------------------
+
+def delta_name(service: str, v_from: int, v_to: int) -> str:
+    return f"{DELTAS_DIR}/{service}/{v_from}-{v_to}.json"
+
+def previous_bundle(app: Path, index: dict):
+    """Bytes of the bundle the index is at (its hashed copy in app/assets/), or None."""
+    if not index["hash"]:
+        return None
+    p = app / hashed_name(index["file"], index["hash"])
+    raw = p.read_bytes() if p.exists() else None
+    return raw if raw is not None and content_hash(raw) == index["hash"] else None
+
+def load_index(app: Path, service: str) -> dict:
+    p = app / DELTAS_DIR / service / "index.json"
+    if p.exists():
+        return json.loads(p.read_text(encoding="utf-8"))
+    return {"service": service, "file": f"bundles/{service}.json", "version": 0, "hash": None, "bytes": 0, "deltas": []}
+
+def prune(app: Path, service: str, index: dict, keep: int) -> int:
+    """Keeps the newest `keep` patches that lead to the latest version and save bytes; returns the number removed."""
+    by_to = {d["to"]: d for d in index["deltas"]}
+    chain, v, total = [], index["version"], 0
+    while v in by_to and len(chain) < keep:
+        d = by_to[v]
+        total += d["bytes"]
+        if total >= index["bytes"]:
+            break
+        chain.append(d)
+        v = d["from"]
+    index["deltas"] = sorted(chain, key=lambda d: d["from"])
+    wanted = {Path(d["file"]).name for d in index["deltas"]}
+    removed = 0
+    for p in (app / DELTAS_DIR / service).glob("*-*.json"):
+        if p.name not in wanted:
+            p.unlink()
+            removed += 1
+    return removed
+
+def publish(app: Path, service: str, keep: int = KEEP) -> dict:
+    """Records a new version when the bundle changed; returns what was done."""
+    out_dir = app / DELTAS_DIR / service
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = load_index(app, service)
+    raw = (app / index["file"]).read_bytes()
+    new_hash = content_hash(raw)
+    result = {"version": index["version"], "changed": False, "delta": None, "bytes": len(raw)}
+
+    if new_hash != index["hash"]:
+        old_raw = previous_bundle(app, index)
+        new = json.loads(raw)
+        v_from, v_to = index["version"], index["version"] + 1
+        entry = None
+        if old_raw is not None:
+            old = json.loads(old_raw)
+            ops = diff(old, new)
+            delta = {"from": v_from, "to": v_to, "base": index["hash"], "hash": new_hash, "ops": ops}
+            text = minify(delta)
+            # written only when it gives back the exact bundle and is worth fetching
+            if minify(apply_patch(copy.deepcopy(old), ops)) == raw and len(text) < len(raw):
+                name = delta_name(service, v_from, v_to)
+                write_bytes_if_changed(app / name, text)
+                entry = {"from": v_from, "to": v_to, "base": index["hash"], "hash": new_hash, "file": name,
+                         "bytes": len(text)}
+                index["deltas"].append(entry)
+        index.update(version=v_to, hash=new_hash)
+        result.update(version=v_to, changed=True, delta=entry)
+
+    index["bytes"] = len(raw)
+    (out_dir / "latest.json").unlink(missing_ok=True)  # the snapshot older versions of this tool kept
+    result["removed"] = prune(app, service, index, keep)
+    result["kept"] = len(index["deltas"])
+    write_if_changed(out_dir / "index.json", dumps(index))
+    return result
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--keep", type=int, default=KEEP, help="Patches kept per service (the newest)")
+    ap.add_argument("--prune-only", action="store_true", help="Only drop old patches, record no new version")
+    args = ap.parse_args()
+    app = Path(args.app)
+
+    for service in args.services:
+        if args.prune_only:
+            index = load_index(app, service)
+            if not index["version"]:
+                continue
+            removed = prune(app, service, index, args.keep)
+            write_if_changed(app / DELTAS_DIR / service / "index.json", dumps(index))
+            print(f"✔ {service}: {len(index['deltas'])} patches kept, {removed} removed")
+            continue
+        if not (app / "bundles" / f"{service}.json").exists():
+            print("⚠️ Missing:", app / "bundles" / f"{service}.json", "(run tools/publish_bundles.py first)")
+            continue
+        r = publish(app, service, args.keep)
+        if not r["changed"]:
+            print(f"✔ {service}: unchanged (version {r['version']}, {r['kept']} patches)")
+            continue
+        d = r["delta"]
+        how = (f"patch {d['from']}→{d['to']} {d['bytes'] / 1024:.1f} KiB" if d
+               else "no patch (first version, or the patch would not be smaller)")
+        print(f"✅ {service}: version {r['version']}, {how}, bundle {r['bytes'] / 1024:.1f} KiB, "
+              f"{r['kept']} patches kept, {r['removed']} removed")
+
+if __name__ == "__main__":
+    main()
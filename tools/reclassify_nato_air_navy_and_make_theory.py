@@ -14,7 +14,16 @@ Assumptions:
 What it does:
 - Updates "classes" list to NATO role-based set (full names).
 - Auto-classifies each question based on keywords in the "answer" (and "source_page" if present).
-- Writes backups:
+- Incremental: a fingerprint of (answer, source_page, rule-set version) per
+  question, and the class written for it, are kept in
+  .cache/reclassify_state.json; only questions whose fingerprint changed or
+  whose class was changed since are reclassified (use --full to redo
+  everything). Entries of older state files just count as changed.
+- Files are only written when their bytes actually change.
+- --jobs N: the services, and chunks of --chunk questions of large ones, are
+  reclassified and rendered in a process pool and put back together in order,
+  so the files are the same bytes as with --jobs 1.
+- Writes backups (before the first real change):
     app/data/luchtmacht.json.bak
     app/data/marine.json.bak
 - Creates:
@@ -23,14 +32,22 @@ What it does:
 
 Run (from repo root):
     source .venv/bin/activate   # if you use venv
-    python3 tools/reclassify_nato_air_navy_and_make_theory.py
+    python3 tools/reclassify_nato_air_navy_and_make_theory.py [--dry-run] [--full]
+        [--services luchtmacht marine] [--state .cache/reclassify_state.json] [--jobs 0]
 """
 
-import json, re
+import argparse, hashlib, json, os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from classify_rules import AIR_CLASS_RULES, NAVY_CLASS_RULES
+from dataset import DatasetError, dumps_parts, parse, question_text, records, split
+from dataset import load as load_dataset
+from jsonio import dumps, would_change, write_if_changed
+
 AIR_PATH = Path("app/data/luchtmacht.json")
 NAVY_PATH = Path("app/data/marine.json")
+STATE_PATH = Path(".cache/reclassify_state.json")
 
 AIR_CLASSES = [
   "Fighter Aircraft",
@@ -55,9 +72,9 @@ def load(p: Path):
   with p.open("r", encoding="utf-8") as f:
     return json.load(f)
 
-def save(p: Path, obj):
-  with p.open("w", encoding="utf-8") as f:
-    json.dump(obj, f, indent=2, ensure_ascii=False)
+def save(p: Path, obj) -> bool:
+  """Returns True when the file was (re)written."""
+  return write_if_changed(p, dumps(obj))
 
 def backup(p: Path):
   b = p.with_suffix(p.suffix + ".bak")
@@ -65,58 +82,11 @@ def backup(p: Path):
     b.write_text(p.read_text(encoding="utf-8"), encoding="utf-8")
   return b
 
-def norm(s: str) -> str:
-  return re.sub(r"\s+", " ", (s or "")).strip().lower()
-
 def classify_air(answer: str, source_page: str = "") -> str:
-  t = norm(answer)
-  u = norm(source_page)
-
-  if any(k in t for k in ["drone", "onbemand", "onbemande", "uav", "uas", "mq-9", "mq9", "reaper"]):
-    return "Uncrewed Aerial System (UAS)"
-  if any(k in t for k in ["helikopter", "helicopter", "apache", "chinook", "nh90", "cougar"]):
-    return "Helicopter"
-  if any(k in t for k in ["lesvliegtuig", "trainer", "training", "pc-7", "pc7", "pilatus"]):
-    return "Trainer Aircraft"
-  if any(k in t for k in ["jachtvliegtuig", "fighter", "f-35", "f35", "f-16", "f16"]):
-    return "Fighter Aircraft"
-  if any(k in t for k in ["transport", "transportvliegtuig", "tanker", "tankvliegtuig", "kdc-10", "kdc10", "a330", "mrt", "mrt t", "c-130", "c130", "hercules", "gulfstream"]):
-    return "Transport Aircraft"
-
-  if any(k in u for k in ["f-35", "f-16"]):
-    return "Fighter Aircraft"
-  if any(k in u for k in ["apache", "chinook", "nh90", "helikopter"]):
-    return "Helicopter"
-
-  return "Other"
+  return AIR_CLASS_RULES.classify({"answer": answer, "source_page": source_page})
 
 def classify_ship(answer: str, source_page: str = "") -> str:
-  t = norm(answer)
-  u = norm(source_page)
-
-  if any(k in t for k in ["onderzeeboot", "submarine", "walrusklasse", "walrus-klasse", "walrus"]):
-    return "Submarine"
-  if any(k in t for k in ["fregat", "frigate", "zeven provinci", "zevenprovincien", "zeven provinciën", "lcf", "luchtverdedigings- en commandofregat", "m-fregat", "multipurpose fregat"]):
-    return "Frigate"
-  if any(k in t for k in ["patrouille", "patrol", "opv", "hollandklasse", "holland-klasse", "offshore patrol"]):
-    return "Patrol Vessel"
-  if any(k in t for k in ["amfib", "amphib", "landingsschip", "landing platform", "rotterdam", "johan de witt", "johan-de-witt"]):
-    return "Amphibious Ship"
-  if any(k in t for k in ["mijnenjager", "mijnenbestr", "mine counter", "mcm", "alkmaar", "alkmaarklasse", "alkmaar-klasse"]):
-    return "Mine Countermeasures Vessel"
-  if any(k in t for k in ["bevoorrad", "support", "ondersteun", "tanker", "logistiek", "karel doorman", "doorman", "combat support", "hydrograf", "sleepboot", "hulpvaartuig"]):
-    return "Support Vessel"
-
-  if "onderzeeboot" in u:
-    return "Submarine"
-  if "fregat" in u or "lcf" in u:
-    return "Frigate"
-  if "opv" in u or "patrouille" in u:
-    return "Patrol Vessel"
-  if "mijnen" in u:
-    return "Mine Countermeasures Vessel"
-
-  return "Other"
+  return NAVY_CLASS_RULES.classify({"answer": answer, "source_page": source_page})
 
 def make_theory_air():
   return {
@@ -253,47 +223,152 @@ def attach_examples(theory: dict, questions: list):
     item["example_asset"] = ex[0]["asset"] if ex else None
     item["example_answer"] = ex[0].get("answer") if ex else None
 
+def fingerprint(rules, q: dict) -> str:
+  h = hashlib.sha1(rules.version.encode("utf-8"))
+  for part in (q.get("answer") or "", q.get("source_page") or ""):
+    h.update(b"\0" + part.encode("utf-8"))
+  return h.hexdigest()[:16]
+
+def reclassify(rules, questions: list, prev: dict, full: bool = False):
+  """
+  Reclassify questions whose fingerprint changed, that have no class yet, or
+  whose class is no longer the one this tool wrote (edited by hand or by
+  apply_classifications.py in the meantime).
+  Returns (state entries, changes): entries are key -> [fingerprint, class
+  written], changes = [(key, old_class, new_class)].
+  """
+  fps, todo = {}, []
+  for q in questions:
+    key = q.get("id") or q.get("asset")
+    fp = fingerprint(rules, q)
+    fps[key] = [fp, q.get("class")]
+    if full or prev.get(key) != [fp, q.get("class")] or "class" not in q:
+      todo.append((key, q))
+  changes = []
+  for (key, q), cls in zip(todo, rules.classify_many([q for _, q in todo])):
+    fps[key][1] = cls
+    if q.get("class") != cls:
+      changes.append((key, q.get("class"), cls))
+      q["class"] = cls
+  return fps, changes
+
+SERVICES = [
+  # (state key, data path, classes, rules, theory maker, theory path)
+  ("luchtmacht", AIR_PATH, AIR_CLASSES, AIR_CLASS_RULES, make_theory_air, Path("app/theory/luchtmacht.json")),
+  ("marine", NAVY_PATH, NAVY_CLASSES, NAVY_CLASS_RULES, make_theory_navy, Path("app/theory/marine.json")),
+]
+RULES = {key: rules for key, _p, _c, rules, _m, _t in SERVICES}
+CHUNK_ITEMS = 5000
+
+def results_serial(targets, state: dict, full: bool):
+  """Per service: (fingerprints, changes, data text, questions for the examples, question count)."""
+  for key, data_path, classes, rules, _make_theory, _theory_path in targets:
+    data = load_dataset(data_path)
+    data["classes"] = classes
+    fps, changes = reclassify(rules, data.questions, state.get(key, {}), full)
+    yield fps, changes, data.dumps(), data.questions, len(data.questions)
+
+def _reclassify_chunk(task):
+  """Worker (--jobs): check, reclassify and render questions[start:start + len(items)] of one service."""
+  key, start, items, prev, full = task
+  problems = []
+  questions = records(items, start, problems)
+  fps, changes = reclassify(RULES[key], questions, prev, full)
+  # attach_examples() only looks at the first question of each class
+  firsts = {}
+  for q in questions:
+    firsts.setdefault(q.get("class", "Other"), {"class": q.get("class", "Other"), "asset": q.get("asset"), "answer": q.get("answer")})
+  return fps, changes, [question_text(q) for q in questions], list(firsts.values()), problems
+
+def results_chunked(pool, targets, state: dict, full: bool, chunk: int):
+  """Same as results_serial(), with the services and chunks of chunk questions in a process pool."""
+  loaded, tasks = [], []
+  for key, data_path, classes, _rules, _make_theory, _theory_path in targets:
+    meta, items = split(parse(data_path.read_bytes()), str(data_path))
+    meta["classes"] = classes
+    prev = state.get(key, {})
+    starts = range(0, len(items), chunk)
+    for start in starts:
+      part = items[start:start + chunk]
+      keys = [q.get("id") or q.get("asset") for q in part if isinstance(q, dict)]
+      tasks.append((key, start, part, {k: prev[k] for k in keys if k in prev}, full))
+    loaded.append((data_path, meta, len(starts), len(items)))
+  results = pool.map(_reclassify_chunk, tasks)  # in task order, however the workers finish
+  for data_path, meta, n, count in loaded:
+    parts = [next(results) for _ in range(n)]
+    problems = [p for part in parts for p in part[4]]
+    if problems:
+      raise DatasetError(str(data_path), problems)
+    fps, changes, texts, examples = {}, [], [], []
+    for f, c, t, e, _p in parts:
+      fps.update(f)
+      changes += c
+      texts += t
+      examples += e
+    yield fps, changes, dumps_parts(meta, texts), examples, count
+
 def main():
+  ap = argparse.ArgumentParser()
+  ap.add_argument("--dry-run", action="store_true", help="Only print what would change")
+  ap.add_argument("--full", action="store_true", help="Ignore fingerprints and reclassify everything")
+  ap.add_argument("--services", nargs="+", choices=[s[0] for s in SERVICES], default=[s[0] for s in SERVICES])
+  ap.add_argument("--state", default=str(STATE_PATH), help="Fingerprint file (one per process when run in parallel)")
+  ap.add_argument("--jobs", type=int, default=1,
+                  help="Worker processes (0 = one per core); services, and chunks of large ones, run in parallel")
+  ap.add_argument("--chunk", type=int, default=CHUNK_ITEMS, help="Questions per task with --jobs")
+  args = ap.parse_args()
+
+  state_path = Path(args.state)
+  state = load(state_path) if state_path.exists() else {}
   updated = 0
 
-  # Air
-  if AIR_PATH.exists():
-    air = load(AIR_PATH)
-    backup(AIR_PATH)
-    air["classes"] = AIR_CLASSES
-    for q in air.get("questions", []):
-      q["class"] = classify_air(q.get("answer",""), q.get("source_page",""))
-      updated += 1
-    save(AIR_PATH, air)
-
-    Path("app/theory").mkdir(parents=True, exist_ok=True)
-    th = make_theory_air()
-    attach_examples(th, air.get("questions", []))
-    save(Path("app/theory/luchtmacht.json"), th)
-    print("✅ Updated:", AIR_PATH, "questions:", len(air.get("questions", [])))
-  else:
-    print("⚠️ Missing:", AIR_PATH)
-
-  # Navy
-  if NAVY_PATH.exists():
-    nav = load(NAVY_PATH)
-    backup(NAVY_PATH)
-    nav["classes"] = NAVY_CLASSES
-    for q in nav.get("questions", []):
-      q["class"] = classify_ship(q.get("answer",""), q.get("source_page",""))
-      updated += 1
-    save(NAVY_PATH, nav)
-
-    Path("app/theory").mkdir(parents=True, exist_ok=True)
-    th = make_theory_navy()
-    attach_examples(th, nav.get("questions", []))
-    save(Path("app/theory/marine.json"), th)
-    print("✅ Updated:", NAVY_PATH, "questions:", len(nav.get("questions", [])))
+  targets = []
+  for target in SERVICES:
+    if target[0] not in args.services:
+      continue
+    if not target[1].exists():
+      print("⚠️ Missing:", target[1])
+      continue
+    targets.append(target)
+
+  pool = ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count() or 1) if args.jobs != 1 else None
+  if pool:
+    results = results_chunked(pool, targets, state, args.full, max(1, args.chunk))
   else:
-    print("⚠️ Missing:", NAVY_PATH)
+    results = results_serial(targets, state, args.full)
+
+  for (key, data_path, _classes, _rules, make_theory, theory_path), result in zip(targets, results):
+    fps, changes, data_text, examples, count = result
+    updated += len(changes)
+
+    th = make_theory()
+    attach_examples(th, examples)
+    outputs = [(data_path, data_text), (theory_path, dumps(th))]
+
+    if args.dry_run:
+      print(f"{data_path}: {len(changes)} of {count} questions would change class")
+      for qkey, old, new in changes:
+        print(f"  {qkey}: {old} -> {new}")
+      for p, text in outputs:
+        print(f"  {'would write' if would_change(p, text) else 'unchanged'}: {p}")
+      continue
+
+    if would_change(data_path, outputs[0][1]):
+      backup(data_path)
+    theory_path.parent.mkdir(parents=True, exist_ok=True)
+    for p, text in outputs:
+      print(("✅ Updated:" if write_if_changed(p, text) else "✔ Unchanged:"), p)
+    print(f"   {data_path}: {len(changes)} of {count} questions changed class")
+    state[key] = fps
+
+  if pool:
+    pool.shutdown()
+
+  if not args.dry_run:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(state_path, json.dumps(state, sort_keys=True))
 
-  print("DONE. Updated question records:", updated)
-  print("Theory files created in: app/theory/")
+  print("DONE. Changed question records:", updated, "(dry run)" if args.dry_run else "")
 
 if __name__ == "__main__":
   main()
@@ -1,49 +1,132 @@
 #!/usr/bin/env python3
 """
-Sync app/data.json questions to whatever is in app/images/*.jpg
+Sync app/data/<service>.json questions to whatever is in app/images/<service>/*.jpg
 
-- Keeps existing class/answer if an entry already exists for that asset.
-- Creates new entries for new images.
+- Keeps existing entries (id, class, answer, category, lqip, ...) as they are,
+  in their order.
+- Creates new entries for new images (appended), with an id that never
+  shifts: the next free number for the service, not the image's position.
 - Removes entries for deleted images.
+- Images come from tools/image_index.py, so only new/changed files are opened
+  (header only); invalid ones (unreadable, truncated) get no question and are
+  reported, and --strict makes that an error.
 
 Run from repo root:
-  python3 tools/sync_datajson_from_images.py --images app/images --data app/data.json
+  python3 tools/sync_datajson_from_images.py                        # all services
+  python3 tools/sync_datajson_from_images.py --services landmacht --strict
+  python3 tools/sync_datajson_from_images.py --images app/images/landmacht --data app/data/landmacht.json
 """
-import argparse, json
+import argparse, re
 from pathlib import Path
 
+from dataset import load as load_dataset
+from image_index import INDEX_PATH, SERVICES, ImageIndex, invalid
+
+# service -> (id format, default class); the same shapes as scrape_engine.py
+ID_FORMATS = {
+    "landmacht": ("lm_{asset}_{i}", "Unarmoured Vehicle"),
+    "luchtmacht": ("af_{asset}_{i}", "UNKNOWN"),
+    "marine": ("nav_{asset}", "Naval Vessel"),
+}
+NUM_SUFFIX = re.compile(r"_(\d+)$")
+
+def question_images(entries: dict, img_dir: Path) -> dict:
+    """{asset: entry} for the *.jpg files directly in img_dir."""
+    out = {}
+    for key, e in entries.items():
+        p = Path(key)
+        if p.parent == img_dir and p.suffix == ".jpg":
+            out[p.stem] = e
+    return out
+
+def sync(data: dict, images: dict, service: str) -> tuple:
+    """Returns (questions, added, removed); images is {asset: index entry} of valid images."""
+    id_format, default_class = ID_FORMATS.get(service, ID_FORMATS["landmacht"])
+    old = data.get("questions", [])
+    existing = {q.get("asset"): q for q in old if q.get("asset")}
+    used = {q.get("id") for q in old}
+    nums = [int(m.group(1)) for q in old if (m := NUM_SUFFIX.search(q.get("id") or ""))]
+    next_i = max(nums, default=0) + 1
+
+    # existing entries keep their order (scraped services follow the site); new ones go last
+    order = [a for a in existing if a in images] + sorted(a for a in images if a not in existing)
+    questions, added = [], 0
+    for asset in order:
+        q = existing.get(asset)
+        if q is None:
+            answer = asset.replace("-", " ").title()
+            qid = id_format.format(asset=asset, i=next_i)
+            while qid in used:
+                next_i += 1
+                qid = id_format.format(asset=asset, i=next_i) if "{i}" in id_format else f"{qid}_{next_i}"
+            used.add(qid)
+            next_i += 1
+            q = {
+                "id": qid,
+                "asset": asset,
+                "class": default_class,
+                "answer": answer,
+                "aliases": sorted({answer.lower(), asset.replace("-", " ").lower()}),
+            }
+            added += 1
+        else:
+            q.setdefault("answer", asset.replace("-", " ").title())
+            q.setdefault("class", default_class)
+        questions.append(q)
+    removed = len(existing) - (len(questions) - added)
+    return questions, added, removed
+
+def sync_file(data_path: Path, img_dir: Path, entries: dict, service: str) -> bool:
+    """Returns False when the service has invalid images."""
+    images = question_images(entries, img_dir)
+    bad = invalid(images)
+    for asset, e in sorted(bad.items()):
+        print(f"⚠️ Invalid image, not synced: {img_dir / (asset + '.jpg')} ({e.get('error')})")
+    good = {a: e for a, e in images.items() if a not in bad}
+
+    data = load_dataset(data_path)
+    questions, added, removed = sync(data, good, service)
+    data["questions"] = questions
+    if data.save():
+        print(f"✅ Synced {data_path} to {img_dir}/ (+{added} -{removed})")
+    else:
+        print(f"✔ {data_path} already in sync with {img_dir}/")
+    print(f"Images found (jpg): {len(images)} ({len(bad)} invalid), questions written: {len(questions)}")
+    return not bad
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--images", required=True)
-    ap.add_argument("--data", required=True)
+    ap.add_argument("--app", default="app", help="App folder")
+    ap.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    ap.add_argument("--images", default=None, help="One image folder (with --data)")
+    ap.add_argument("--data", default=None, help="One dataset (with --images)")
+    ap.add_argument("--service", default=None, help="Id format/default class for --data (default: from the file name)")
+    ap.add_argument("--index", default=str(INDEX_PATH))
+    ap.add_argument("--strict", action="store_true", help="Exit 1 when an image is invalid")
     args = ap.parse_args()
 
-    img_dir = Path(args.images)
-    data_path = Path(args.data)
-
-    data = json.loads(data_path.read_text(encoding="utf-8"))
-    existing = {q.get("asset"): q for q in data.get("questions", []) if q.get("asset")}
-
-    assets = sorted([p.stem for p in img_dir.glob("*.jpg")])
-    questions = []
-    for i, asset in enumerate(assets, 1):
-        base = existing.get(asset, {})
-        answer = base.get("answer") or asset.replace("-", " ").title()
-        klass = base.get("class") or "Unarmoured Vehicle"
-        q = {
-            "id": base.get("id") or f"lm_{asset}_{i}",
-            "asset": asset,
-            "class": klass,
-            "answer": answer,
-            "aliases": sorted({answer.lower(), asset.replace("-", " ").lower()}),
-        }
-        questions.append(q)
+    if bool(args.images) != bool(args.data):
+        ap.error("--images and --data go together")
+    if args.images:
+        jobs = [(args.service or Path(args.data).stem, Path(args.images), Path(args.data))]
+    else:
+        app = Path(args.app)
+        jobs = [(s, app / "images" / s, app / "data" / f"{s}.json") for s in args.services]
 
-    data["questions"] = questions
-    data_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-    print("✅ Synced data.json to images/")
-    print("Images found (jpg):", len(assets))
-    print("Questions written:", len(questions))
+    # one scan over all image folders; unchanged files are not opened
+    index = ImageIndex(args.index)
+    entries = index.scan([img_dir for _s, img_dir, _d in jobs])
+    index.save()
+    print(f"Image index: {len(entries)} files, {index.checked} checked")
+
+    ok = True
+    for service, img_dir, data_path in jobs:
+        if not data_path.exists():
+            print("⚠️ Missing:", data_path)
+            continue
+        ok &= sync_file(data_path, img_dir, entries, service)
+    if args.strict and not ok:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()